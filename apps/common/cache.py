@@ -0,0 +1,146 @@
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+_missing = object()
+
+
+def _tag_key(tag):
+    return f"cache-tag:{tag}"
+
+
+def get_tag_versions(tags):
+    """
+    Current version token of each tag.
+
+    Tags never seen before get a fresh token. Every key cached under a tag embeds its
+    version, so bumping the version (see `invalidate_tags`) orphans all of them at once.
+    """
+    keys = {_tag_key(tag): tag for tag in tags}
+    versions = cache.get_many(keys)
+
+    missing = {key: uuid.uuid4().hex for key in keys if key not in versions}
+    if missing:
+        # `add` keeps a version another process set in the meantime
+        for key, version in missing.items():
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+            versions[key] = version
+
+    return [versions[key] for key in sorted(keys)]
+
+
+def invalidate_tags(*tags):
+    """Expire every value cached under any of `tags`"""
+    cache.set_many({_tag_key(tag): uuid.uuid4().hex for tag in tags}, timeout=None)
+
+
+def make_key(key, tags=()):
+    if not tags:
+        return key
+
+    versions = ":".join(get_tag_versions(tags))
+    return f"{key}:{hashlib.md5(versions.encode()).hexdigest()}"
+
+
+def get_or_set(key, func, timeout=None, tags=()):
+    """
+    Return the cached value of `key`, computing it with `func` on a miss.
+
+    Only one caller recomputes a missing value, others wait up to
+    `CACHE_LOCK_WAIT` seconds for it to be stored instead of all hitting the
+    database at once, then fall back to computing it themselves.
+
+    Params:
+        key: cache key
+        func: callable returning the value
+        timeout: [optional] ttl in seconds. default: `CACHE_DEFAULT_TIMEOUT`
+        tags: [optional] tags the value can be invalidated by
+    """
+    timeout = settings.CACHE_DEFAULT_TIMEOUT if timeout is None else timeout
+    key = make_key(key, tags)
+
+    value = cache.get(key, _missing)
+    if value is not _missing:
+        return value
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, timeout=settings.CACHE_LOCK_TIMEOUT):
+        try:
+            value = func()
+            cache.set(key, value, timeout=timeout)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        value = cache.get(key, _missing)
+        if value is not _missing:
+            return value
+
+    return func()
+
+
+def conditional_response(request, model, get_response, max_age=None):
+    """
+    Conditional GET for a listing of `model`.
+
+    The ETag is built from `max(updated_at)` and the row count of the whole table
+    (one aggregate query) plus the request path, so any create, update or delete
+    changes it. A matching `If-None-Match` or `If-Modified-Since` returns
+    `304 Not Modified` without calling `get_response`.
+    Deletes don't move `max(updated_at)`, clients should prefer the ETag.
+    """
+    state = model._default_manager.aggregate(
+        last_modified=Max("updated_at"), count=Count("pk")
+    )
+    fingerprint = f"{state['last_modified']}:{state['count']}:{request.get_full_path()}"
+    etag = quote_etag(hashlib.md5(fingerprint.encode()).hexdigest())
+    last_modified = state["last_modified"] and int(state["last_modified"].timestamp())
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = get_response()
+
+    if response.status_code in (200, 304):
+        response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified)
+        max_age = settings.CATALOG_CACHE_MAX_AGE if max_age is None else max_age
+        patch_cache_control(response, public=True, max_age=max_age)
+    return response
+
+
+class CachedListMixin:
+    """
+    Cache list responses of a viewset.
+
+    Set `cache_tags` to the tags invalidated when the listed model changes. Responses
+    are keyed by the full path so search, filters and pages are cached separately,
+    and support conditional GET (see `conditional_response`).
+    """
+
+    cache_tags = ()
+    cache_timeout = None
+
+    def list(self, request, *args, **kwargs):
+        def get_data():
+            return super(CachedListMixin, self).list(request, *args, **kwargs).data
+
+        def get_response():
+            key = f"view:{self.basename}:list:{request.get_full_path()}"
+            data = get_or_set(
+                key, get_data, timeout=self.cache_timeout, tags=self.cache_tags
+            )
+            return Response(data)
+
+        return conditional_response(request, self.queryset.model, get_response)
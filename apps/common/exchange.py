@@ -5,6 +5,8 @@ from djmoney.contrib.exchange.backends import OpenExchangeRatesBackend
 from djmoney.contrib.exchange.exceptions import MissingRate
 from djmoney.contrib.exchange.models import get_rate as rates
 
+from apps.common.cache import get_or_set, invalidate_tags
+
 
 # update rates
 def update_rates(currency=None):
@@ -12,14 +14,24 @@ def update_rates(currency=None):
     if currency and currency not in settings.SYMBOLS:
         settings.SYMBOLS += f",{currency}"
     backend.update_rates(symbols=settings.SYMBOLS)
+    invalidate_tags("exchange-rates")
 
 
 def get_rate(currency="GHS", base_currency=settings.BASE_CURRENCY):
+    return get_or_set(
+        f"exchange-rate:{base_currency}:{currency}",
+        lambda: get_stored_rate(currency=currency, base_currency=base_currency),
+        timeout=settings.EXCHANGE_RATE_CACHE_TIMEOUT,
+        tags=("exchange-rates",),
+    )
+
+
+def get_stored_rate(currency="GHS", base_currency=settings.BASE_CURRENCY):
     try:
         return rates(base_currency, currency, backend=OpenExchangeRatesBackend.name)
     except MissingRate:
         update_rates(currency=currency)
-        return get_rate(currency=currency, base_currency=base_currency)
+        return get_stored_rate(currency=currency, base_currency=base_currency)
 
 
 # This is kind of reversed because base currency is constant (USD)
@@ -0,0 +1,548 @@
+"""
+Local stand-in for a rippled JSON-RPC server, used in tests and benchmarks.
+
+Keeps accounts, escrows and transactions in memory and speaks enough of the API
+(v2) for the xrpl-py helpers used here: autofill, submit, reliable submission,
+account, escrow and history lookups. Signatures are not verified.
+
+Submitted transactions are applied to an open ledger straight away and validated
+when the ledger closes, which happens on the next read of validated data. A burst
+of submissions without reads in between therefore lands in one ledger.
+"""
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptoconditions import Fulfillment
+from xrpl.core.binarycodec import decode
+from xrpl.models.transactions.transaction import Transaction
+from xrpl.utils import datetime_to_ripple_time, xrp_to_drops
+from xrpl.wallet import Wallet
+
+BASE_RESERVE = 10_000_000
+OWNER_RESERVE = 2_000_000
+BASE_FEE = 10
+FIRST_LEDGER = 1000
+
+ERRORS = {
+    "actNotFound": (19, "Account not found."),
+    "txnNotFound": (29, "Transaction not found."),
+    "invalidParams": (31, "Invalid parameters."),
+    "unknownCmd": (32, "Unknown method."),
+}
+
+
+class RPCError(Exception):
+    def __init__(self, error):
+        self.error = error
+
+
+class FakeLedger:
+    """In memory ledger state, thread safe"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.accounts = {}
+        # (owner, sequence) -> escrow ledger object
+        self.escrows = {}
+        # hash -> {"tx_json", "meta", "ledger_index"}
+        self.transactions = {}
+        # account -> {sequence: tx_json} submitted ahead of their turn
+        self.queued = {}
+        self.validated_index = FIRST_LEDGER
+        self.open_count = 0
+        self.touched = []
+        # seconds added to the clock, to reach an escrow's FinishAfter
+        self.time_offset = 0
+
+    @property
+    def open_index(self):
+        return self.validated_index + 1
+
+    def ripple_time(self):
+        return datetime_to_ripple_time(datetime.now()) + self.time_offset
+
+    def fund(self, address, xrp):
+        """Create or top up `address` with `xrp`"""
+        with self.lock:
+            account = self.accounts.setdefault(
+                address,
+                {
+                    "Account": address,
+                    "Balance": 0,
+                    "Sequence": self.open_index,
+                    "OwnerCount": 0,
+                    "Flags": 0,
+                },
+            )
+            account["Balance"] += int(xrp_to_drops(xrp))
+
+    def wallet(self, xrp=1000):
+        """New wallet funded with `xrp`"""
+        wallet = Wallet.create()
+        self.fund(wallet.address, xrp)
+        return wallet
+
+    def balance(self, address):
+        """Balance of `address` in drops"""
+        with self.lock:
+            return self.accounts[address]["Balance"]
+
+    def close(self):
+        """Validate the open ledger when it has transactions"""
+        with self.lock:
+            if self.open_count:
+                self.validated_index += 1
+                self.open_count = 0
+
+    def handle(self, method, params):
+        handler = getattr(self, f"rpc_{method}", None)
+        if handler is None:
+            raise RPCError("unknownCmd")
+        with self.lock:
+            return handler(params)
+
+    # ledger info
+
+    def ledger_index(self, params):
+        index = params.get("ledger_index", "current")
+        if index in ("current", "open"):
+            return self.open_index, False
+        self.close()
+        return self.validated_index, True
+
+    def rpc_server_info(self, params):
+        self.close()
+        return {
+            "info": {
+                "build_version": "2.0.0",
+                "complete_ledgers": f"{FIRST_LEDGER}-{self.validated_index}",
+                "server_state": "full",
+                "validated_ledger": {
+                    "seq": self.validated_index,
+                    "base_fee_xrp": BASE_FEE / 1_000_000,
+                    "reserve_base_xrp": BASE_RESERVE / 1_000_000,
+                    "reserve_inc_xrp": OWNER_RESERVE / 1_000_000,
+                },
+            }
+        }
+
+    def rpc_server_state(self, params):
+        self.close()
+        return {
+            "state": {
+                "build_version": "2.0.0",
+                "validated_ledger": {
+                    "seq": self.validated_index,
+                    "base_fee": BASE_FEE,
+                    "reserve_base": BASE_RESERVE,
+                    "reserve_inc": OWNER_RESERVE,
+                },
+            }
+        }
+
+    def rpc_fee(self, params):
+        fee = str(BASE_FEE)
+        return {
+            "current_ledger_size": str(self.open_count),
+            "current_queue_size": "0",
+            "drops": {
+                "base_fee": fee,
+                "median_fee": "5000",
+                "minimum_fee": fee,
+                "open_ledger_fee": fee,
+            },
+            "expected_ledger_size": "1000",
+            "ledger_current_index": self.open_index,
+            "levels": {
+                "median_level": "128000",
+                "minimum_level": "256",
+                "open_ledger_level": "256",
+                "reference_level": "256",
+            },
+            "max_queue_size": "2000",
+        }
+
+    def rpc_ledger(self, params):
+        index, validated = self.ledger_index(params)
+        ledger_hash = hashlib.sha256(str(index).encode()).hexdigest().upper()
+        return {
+            "ledger": {"ledger_index": str(index), "closed": validated},
+            "ledger_hash": ledger_hash,
+            "ledger_index": index,
+            "validated": validated,
+        }
+
+    # accounts
+
+    def get_account(self, address):
+        if address not in self.accounts:
+            raise RPCError("actNotFound")
+        return self.accounts[address]
+
+    def rpc_account_info(self, params):
+        index, validated = self.ledger_index(params)
+        account = self.get_account(params.get("account"))
+        data = {
+            **account,
+            "Balance": str(account["Balance"]),
+            "LedgerEntryType": "AccountRoot",
+        }
+        key = "ledger_index" if validated else "ledger_current_index"
+        return {"account_data": data, key: index, "validated": validated}
+
+    def rpc_account_objects(self, params):
+        index, validated = self.ledger_index(params)
+        address = params.get("account")
+        self.get_account(address)
+        if params.get("type") not in (None, "escrow"):
+            objects = []
+        else:
+            objects = [
+                escrow
+                for (owner, _), escrow in sorted(self.escrows.items())
+                if owner == address or escrow["Destination"] == address
+            ]
+
+        limit = int(params.get("limit") or 200)
+        start = int(params.get("marker") or 0)
+        end = start + limit
+        result = {
+            "account": address,
+            "account_objects": objects[start:end],
+            "ledger_index": index,
+            "validated": validated,
+            "limit": limit,
+        }
+        if end < len(objects):
+            result["marker"] = str(end)
+        return result
+
+    # transactions
+
+    def rpc_submit(self, params):
+        blob = params.get("tx_blob")
+        if not blob:
+            raise RPCError("invalidParams")
+
+        tx_json = decode(blob)
+        tx_json["hash"] = Transaction.from_blob(blob).get_hash()
+        result = self.submit(tx_json)
+        return {
+            "accepted": result in ("tesSUCCESS", "terQUEUED") or result[:3] == "tec",
+            "applied": result == "tesSUCCESS" or result[:3] == "tec",
+            "engine_result": result,
+            "engine_result_code": 0 if result == "tesSUCCESS" else -1,
+            "engine_result_message": result,
+            "tx_blob": blob,
+            "tx_json": tx_json,
+        }
+
+    def submit(self, tx_json):
+        address = tx_json["Account"]
+        if address not in self.accounts:
+            return "terNO_ACCOUNT"
+        if tx_json["hash"] in self.transactions:
+            return "tefALREADY"
+        if tx_json.get("LastLedgerSequence", self.open_index) < self.open_index:
+            return "tefMAX_LEDGER"
+
+        account = self.accounts[address]
+        sequence = tx_json["Sequence"]
+        if sequence < account["Sequence"]:
+            return "tefPAST_SEQ"
+        if sequence > account["Sequence"]:
+            # held until the transactions before it arrive, like rippled's queue
+            self.queued.setdefault(address, {})[sequence] = tx_json
+            return "terQUEUED"
+
+        result = self.apply(tx_json)
+        queued = self.queued.get(address, {})
+        while account["Sequence"] in queued:
+            self.apply(queued.pop(account["Sequence"]))
+        return result
+
+    def apply(self, tx_json):
+        account = self.accounts[tx_json["Account"]]
+        fee = int(tx_json.get("Fee", BASE_FEE))
+        if account["Balance"] < fee:
+            return "terINSUF_FEE_B"
+
+        account["Balance"] -= fee
+        account["Sequence"] += 1
+        # accounts modified by the transaction, reported in the metadata
+        self.touched = [tx_json["Account"]]
+        handler = getattr(self, f"apply_{tx_json['TransactionType']}", None)
+        result = handler(tx_json) if handler else "temUNKNOWN"
+
+        self.transactions[tx_json["hash"]] = {
+            "tx_json": tx_json,
+            "meta": {
+                "AffectedNodes": [
+                    {
+                        "ModifiedNode": {
+                            "LedgerEntryType": "AccountRoot",
+                            "FinalFields": {
+                                "Account": address,
+                                "Balance": str(self.accounts[address]["Balance"]),
+                            },
+                        }
+                    }
+                    for address in dict.fromkeys(self.touched)
+                ],
+                "TransactionIndex": self.open_count,
+                "TransactionResult": result,
+            },
+            "ledger_index": self.open_index,
+        }
+        self.open_count += 1
+        return result
+
+    def spendable(self, account):
+        reserve = BASE_RESERVE + OWNER_RESERVE * account["OwnerCount"]
+        return account["Balance"] - reserve
+
+    def apply_Payment(self, tx_json):
+        amount = tx_json["Amount"]
+        if not isinstance(amount, str):
+            return "tecPATH_DRY"
+
+        amount = int(amount)
+        account = self.accounts[tx_json["Account"]]
+        if self.spendable(account) < amount:
+            return "tecUNFUNDED_PAYMENT"
+
+        destination = tx_json["Destination"]
+        if destination not in self.accounts:
+            if amount < BASE_RESERVE:
+                return "tecNO_DST_INSUF_XRP"
+            self.fund(destination, 0)
+
+        account["Balance"] -= amount
+        self.accounts[destination]["Balance"] += amount
+        self.touched.append(destination)
+        return "tesSUCCESS"
+
+    def apply_EscrowCreate(self, tx_json):
+        amount = int(tx_json["Amount"])
+        account = self.accounts[tx_json["Account"]]
+        if tx_json["Destination"] not in self.accounts:
+            return "tecNO_DST"
+        if self.spendable(account) - OWNER_RESERVE < amount:
+            return "tecUNFUNDED"
+
+        account["Balance"] -= amount
+        account["OwnerCount"] += 1
+        escrow = {
+            field: tx_json[field]
+            for field in ("Account", "Destination", "Amount", "Condition")
+            + ("FinishAfter", "CancelAfter", "SourceTag", "DestinationTag")
+            if field in tx_json
+        }
+        escrow["LedgerEntryType"] = "Escrow"
+        escrow["PreviousTxnID"] = tx_json["hash"]
+        escrow["index"] = hashlib.sha256(tx_json["hash"].encode()).hexdigest().upper()
+        self.escrows[(tx_json["Account"], tx_json["Sequence"])] = escrow
+        return "tesSUCCESS"
+
+    def apply_EscrowFinish(self, tx_json):
+        key = (tx_json["Owner"], tx_json["OfferSequence"])
+        escrow = self.escrows.get(key)
+        if escrow is None:
+            return "tecNO_TARGET"
+        if escrow.get("FinishAfter", 0) > self.ripple_time():
+            return "tecNO_PERMISSION"
+        if "Condition" in escrow:
+            try:
+                fulfillment = Fulfillment.from_binary(
+                    bytes.fromhex(tx_json.get("Fulfillment", ""))
+                )
+                condition = fulfillment.condition_binary.hex().upper()
+            except Exception:
+                condition = None
+            if condition != escrow["Condition"]:
+                return "tecCRYPTOCONDITION_ERROR"
+
+        del self.escrows[key]
+        self.accounts[escrow["Account"]]["OwnerCount"] -= 1
+        self.accounts[escrow["Destination"]]["Balance"] += int(escrow["Amount"])
+        self.touched += [escrow["Account"], escrow["Destination"]]
+        return "tesSUCCESS"
+
+    def apply_EscrowCancel(self, tx_json):
+        key = (tx_json["Owner"], tx_json["OfferSequence"])
+        escrow = self.escrows.get(key)
+        if escrow is None:
+            return "tecNO_TARGET"
+        if escrow.get("CancelAfter", float("inf")) > self.ripple_time():
+            return "tecNO_PERMISSION"
+
+        del self.escrows[key]
+        self.accounts[escrow["Account"]]["OwnerCount"] -= 1
+        self.accounts[escrow["Account"]]["Balance"] += int(escrow["Amount"])
+        self.touched.append(escrow["Account"])
+        return "tesSUCCESS"
+
+    def rpc_tx(self, params):
+        self.close()
+        record = self.transactions.get(params.get("transaction"))
+        if record is None:
+            raise RPCError("txnNotFound")
+        return {
+            "hash": record["tx_json"]["hash"],
+            "tx_json": record["tx_json"],
+            "meta": record["meta"],
+            "ledger_index": record["ledger_index"],
+            "validated": record["ledger_index"] <= self.validated_index,
+        }
+
+    def rpc_account_tx(self, params):
+        self.close()
+        address = params.get("account")
+        self.get_account(address)
+        ledger_min = params.get("ledger_index_min", -1)
+        ledger_min = FIRST_LEDGER if ledger_min == -1 else ledger_min
+        ledger_max = params.get("ledger_index_max", -1)
+        ledger_max = self.validated_index if ledger_max == -1 else ledger_max
+
+        # transactions are kept in the order they were applied
+        records = [
+            record
+            for record in self.transactions.values()
+            if ledger_min <= record["ledger_index"] <= ledger_max
+            and address
+            in (
+                record["tx_json"]["Account"],
+                record["tx_json"].get("Destination"),
+                record["tx_json"].get("Owner"),
+            )
+        ]
+        if not params.get("forward"):
+            records.reverse()
+
+        limit = int(params.get("limit") or 200)
+        start = int(params.get("marker") or 0)
+        end = start + limit
+        result = {
+            "account": address,
+            "ledger_index_min": ledger_min,
+            "ledger_index_max": ledger_max,
+            "limit": limit,
+            "transactions": [
+                {
+                    "hash": record["tx_json"]["hash"],
+                    "tx_json": record["tx_json"],
+                    "meta": record["meta"],
+                    "ledger_index": record["ledger_index"],
+                    "validated": True,
+                }
+                for record in records[start:end]
+            ],
+            "validated": True,
+        }
+        if end < len(records):
+            result["marker"] = str(end)
+        return result
+
+
+class FakeRippledHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server.rippled
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server.record(self.client_address)
+
+        if server.delay:
+            time.sleep(server.delay)
+
+        status = server.pop_failure()
+        if status:
+            return self.reply(status, b"Service Unavailable", "text/plain")
+
+        payload = json.loads(body)
+        params = (payload.get("params") or [{}])[0]
+        try:
+            result = server.ledger.handle(payload["method"], params)
+            result["status"] = "success"
+        except RPCError as e:
+            code, message = ERRORS.get(e.error, (-1, e.error))
+            result = {
+                "error": e.error,
+                "error_code": code,
+                "error_message": message,
+                "request": params,
+                "status": "error",
+            }
+        self.reply(200, json.dumps({"result": result}).encode(), "application/json")
+
+    def reply(self, status, content, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeRippled:
+    """
+    Fake rippled listening on a local port.
+
+    Usage:
+        with FakeRippled() as server:
+            wallet = server.ledger.wallet(xrp=100)
+            client = JsonRpcClient(server.url)
+    """
+
+    def __init__(self, ledger=None, delay=0):
+        self.ledger = ledger or FakeLedger()
+        # seconds to wait before answering, to mimic network latency
+        self.delay = delay
+        self.requests = 0
+        self.connections = set()
+        self.failures = []
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeRippledHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.rippled = self
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}/"
+
+    def fail_next(self, count=1, status=503):
+        """Answer the next `count` requests with an HTTP error"""
+        with self.lock:
+            self.failures += [status] * count
+
+    def pop_failure(self):
+        with self.lock:
+            return self.failures.pop(0) if self.failures else None
+
+    def record(self, client_address):
+        with self.lock:
+            self.requests += 1
+            self.connections.add(client_address)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
@@ -1,13 +1,178 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+import uuid
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on `(created_at, id)`.
+
+    Each page is fetched with a `WHERE (created_at, id) > cursor` range instead of an
+    `OFFSET`, so deep pages cost the same as the first one, and no `COUNT(*)` is run.
+    Results are always ordered by `ordering` then `id` in the same direction.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    ordering = "created_at"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.descending = self.ordering.startswith("-")
+        self.field = self.ordering.lstrip("-")
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor["reverse"])
+
+        queryset = queryset.order_by(*self.get_ordering(reverse))
+        if cursor:
+            queryset = queryset.filter(self.get_range(cursor, reverse))
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+
+        # walking backwards the extra row tells if there is a previous page and
+        # the cursor we came from always has a next page, and vice versa
+        if reverse:
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = cursor is not None, has_more
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_ordering(self, reverse=False):
+        descending = self.descending != reverse
+        prefix = "-" if descending else ""
+        return (f"{prefix}{self.field}", f"{prefix}id")
+
+    def get_range(self, cursor, reverse=False):
+        lookup = "lt" if self.descending != reverse else "gt"
+        position, pk = cursor["position"], cursor["id"]
+        return Q(**{f"{self.field}__{lookup}": position}) | Q(
+            **{self.field: position, f"id__{lookup}": pk}
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            position = parse_datetime(data["p"])
+            if position is None:
+                raise ValueError
+            pk = uuid.UUID(data["i"])
+            return {"position": position, "id": pk, "reverse": bool(data["r"])}
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def make_cursor(self, instance, reverse=False):
+        data = {
+            "p": getattr(instance, self.ordering.lstrip("-")).isoformat(),
+            "i": str(instance.pk),
+            "r": reverse,
+        }
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+    def encode_cursor(self, instance, reverse=False):
+        url = self.request.build_absolute_uri()
+        cursor = self.make_cursor(instance, reverse=reverse)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            url = self.request.build_absolute_uri()
+            return remove_query_param(url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
 
 
 class DefaultPagination(PageNumberPagination):
+    """
+    Page number pagination which switches to `KeysetPagination` when the client
+    asks for it with `?pagination=cursor` or sends a `cursor`.
+    """
+
     page_size = 20
     page_size_query_param = "page_size"
     max_page_size = 100
+    mode_query_param = "pagination"
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_keyset(request):
+            self.keyset = self.keyset_class()
+            self.keyset.page_size = self.page_size
+            self.keyset.max_page_size = self.max_page_size
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def use_keyset(self, request):
+        params = request.query_params
+        return (
+            params.get(self.mode_query_param) == "cursor"
+            or self.keyset_class.cursor_query_param in params
+        )
+
+    def get_paginated_response(self, data):
+        if getattr(self, "keyset", None):
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
 
 
-class LargePagination(PageNumberPagination):
+class LargePagination(DefaultPagination):
     page_size = 1000
     page_size_query_param = "page_size"
     max_page_size = 10000
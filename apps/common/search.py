@@ -0,0 +1,136 @@
+import re
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import Lookup, OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+from rest_framework.filters import SearchFilter
+
+TERM_RE = re.compile(r"\w+")
+
+# whether pg_trgm is installed, looked up on first use
+_trigram = {"enabled": None}
+
+
+class ILike(Lookup):
+    """
+    Case insensitive `LIKE` on the raw column.
+
+    Django's `istartswith` and `icontains` compare `UPPER(column)`, which a
+    `gin_trgm_ops` index on the column can't serve. `ILIKE` can.
+    """
+
+    lookup_name = "ilike"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} ILIKE {rhs}", lhs_params + rhs_params
+
+
+def like_escape(text):
+    """Escape the `LIKE` wildcards in `text`"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_enabled():
+    """Full text search needs Postgres, other databases fall back to icontains"""
+    return connection.vendor == "postgresql"
+
+
+def trigram_available(connection=connection):
+    """True when the `pg_trgm` extension can be installed on the database"""
+    if connection.vendor != "postgresql":
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def trigram_enabled():
+    """True when the `pg_trgm` extension is installed, checked once per process"""
+    if _trigram["enabled"] is None:
+        enabled = False
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                enabled = cursor.fetchone() is not None
+        _trigram["enabled"] = enabled
+    return _trigram["enabled"]
+
+
+def search_document(*parts):
+    """
+    Weighted `tsvector` expression.
+
+    Params:
+        parts: `(expression, weight)` pairs, weight is one of "A", "B", "C", "D"
+    """
+    vectors = [
+        SearchVector(
+            Coalesce(expression, Value(""), output_field=TextField()),
+            weight=weight,
+            config=settings.SEARCH_CONFIG,
+        )
+        for expression, weight in parts
+    ]
+    document = vectors[0]
+    for vector in vectors[1:]:
+        document = document + vector
+    return document
+
+
+def joined_names(through, field, name):
+    """Subquery joining the `name`s of the m2m rows of the outer object"""
+
+    names = (
+        through.objects.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(names=StringAgg(name, " "))
+        .values("names")
+    )
+    return Subquery(names)
+
+
+def search_query(text):
+    """
+    Prefix `tsquery` matching every word of `text` e.g "pyth dev" -> "pyth:* & dev:*"
+
+    Returns None when `text` has no searchable words.
+    """
+    terms = TERM_RE.findall(text)
+    if not terms:
+        return None
+    raw = " & ".join(f"{term}:*" for term in terms)
+    return SearchQuery(raw, search_type="raw", config=settings.SEARCH_CONFIG)
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    Search filter backed by a maintained `tsvector` column.
+
+    Views opt in with `search_vector_field`. Matches are ranked best first and,
+    unlike `icontains` across joins, never duplicated. Views without it, or
+    databases other than Postgres, use the regular `search_fields` lookups.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        field = getattr(view, "search_vector_field", None)
+        if not field or not search_enabled():
+            return super().filter_queryset(request, queryset, view)
+
+        text = " ".join(self.get_search_terms(request))
+        query = search_query(text)
+        if query is None:
+            return queryset
+
+        ordering = queryset.query.order_by
+        return (
+            queryset.filter(**{field: query})
+            .annotate(search_rank=SearchRank(field, query))
+            .order_by("-search_rank", *ordering)
+        )
@@ -3,18 +3,60 @@ from rest_framework import serializers
 
 from apps.companies.models import Company, CompanyIndustry, CompanyManager, CompanyValue
 from apps.freelancers.models import Freelancer, PortfolioItem, Service, WorkExperience
-from apps.jobs.models import JobSubmission
+from apps.jobs.models import JobSubmission, Tag
 from apps.users.models import Category, Skill
 
 User = get_user_model()
 
 
+def get_query_list(request, param):
+    """Comma separated values of a query param"""
+
+    value = request.query_params.get(param, "")
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class DynamicFieldsMixin:
+    """
+    Let clients shape the response of the top level serializer.
+
+    `?fields=id,title` only returns the listed fields.
+    `?expand=company` swaps a compact relation for its full representation. The
+    relations that can be expanded are declared in `Meta.expandable_fields` as
+    `{name: (serializer_class, kwargs)}`.
+    Nested serializers are left as is.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        if request is None or not (self.root is self or self.root is self.parent):
+            return fields
+
+        expandable = getattr(self.Meta, "expandable_fields", {})
+        for name in get_query_list(request, "expand"):
+            if name in expandable:
+                serializer_class, kwargs = expandable[name]
+                fields[name] = serializer_class(read_only=True, **kwargs)
+
+        only = get_query_list(request, "fields")
+        if only:
+            fields = {name: field for name, field in fields.items() if name in only}
+        return fields
+
+
 class SkillBaseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Skill
         fields = ["id", "name"]
 
 
+class TagBaseSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tag
+        fields = ["id", "name"]
+
+
 class CategoryBaseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
@@ -183,6 +225,12 @@ class CompanyIndustryBaseSerializer(serializers.ModelSerializer):
         ]
 
 
+class CompanyMiniSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Company
+        fields = ["id", "name", "logo"]
+
+
 class CompanyBaseSerializer(serializers.ModelSerializer):
     managers = CompanyManagerBaseSerializer(many=True)
     values = CompanyValueBaseSerializer(many=True)
@@ -40,7 +40,12 @@ def create_task(
     handler = {
         "send-email": reverse("api:notifications-send-email"),
         "send-notification": reverse("api:notifications-send-notification"),
-        "send-sms": reverse("api:notifications-send-sms"),
+        "notify-application": reverse("api:notifications-notify-application"),
+        # "send-sms": reverse("api:notifications-send-sms"),
+        "compute-job-score": reverse("api:recommendations-compute-job-score"),
+        "submit-escrow": reverse("api:escrow-transactions-submit"),
+        "confirm-escrow": reverse("api:escrow-transactions-confirm"),
+        "refill-wallet-pool": reverse("api:misc-refill-wallet-pool"),
     }
 
     # print("url: ", reverse("api:notifications-send-notification"))
@@ -0,0 +1,175 @@
+import threading
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from apps.common import cache
+from apps.common.exchange import get_rate, update_rates
+from apps.extras.models import Country
+
+
+class Counter:
+    def __init__(self, value="value"):
+        self.calls = 0
+        self.value = value
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+class TestGetOrSet:
+    def test_cached(self):
+        func = Counter()
+
+        assert cache.get_or_set("key", func) == "value"
+        assert cache.get_or_set("key", func) == "value"
+        assert func.calls == 1
+
+    def test_ttl(self):
+        func = Counter()
+
+        cache.get_or_set("key", func, timeout=0)
+        cache.get_or_set("key", func, timeout=0)
+        assert func.calls == 2
+
+    def test_invalidate_tags(self):
+        func = Counter()
+
+        cache.get_or_set("one", func, tags=("a",))
+        cache.get_or_set("two", func, tags=("a", "b"))
+        cache.get_or_set("three", func, tags=("c",))
+        assert func.calls == 3
+
+        cache.invalidate_tags("a")
+
+        cache.get_or_set("one", func, tags=("a",))
+        cache.get_or_set("two", func, tags=("a", "b"))
+        cache.get_or_set("three", func, tags=("c",))
+        assert func.calls == 5
+
+    def test_waits_for_recompute(self):
+        key = cache.make_key("key")
+        cache.cache.add(f"{key}:lock", 1)
+        func = Counter("mine")
+
+        # another caller holds the lock and stores the value shortly after
+        timer = threading.Timer(0.1, cache.cache.set, args=(key, "theirs"))
+        timer.start()
+
+        assert cache.get_or_set("key", func) == "theirs"
+        assert func.calls == 0
+
+    def test_lock_wait_timeout(self, settings):
+        settings.CACHE_LOCK_WAIT = 0.1
+        key = cache.make_key("key")
+        cache.cache.add(f"{key}:lock", 1)
+        func = Counter()
+
+        assert cache.get_or_set("key", func) == "value"
+        assert func.calls == 1
+
+
+class TestExchangeRate:
+    def test_rate_cached(self, monkeypatch):
+        rates = Counter(10)
+        monkeypatch.setattr(
+            "apps.common.exchange.rates", lambda base, currency, backend: rates()
+        )
+
+        assert get_rate("GHS") == 10
+        assert get_rate("GHS") == 10
+        assert rates.calls == 1
+
+    @pytest.mark.django_db
+    def test_update_rates_invalidates(self, monkeypatch):
+        rates = Counter(10)
+        monkeypatch.setattr(
+            "apps.common.exchange.rates", lambda base, currency, backend: rates()
+        )
+        monkeypatch.setattr(
+            "apps.common.exchange.OpenExchangeRatesBackend.update_rates",
+            lambda self, **kwargs: None,
+        )
+
+        get_rate("GHS")
+        update_rates()
+        get_rate("GHS")
+        assert rates.calls == 2
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    def test_not_modified(self, api_client, skill_factory, capture_queries):
+        url = reverse("api:skill-list")
+        skill_factory.create_batch(2)
+
+        resp = api_client.get(url)
+        etag = resp["ETag"]
+        assert resp.status_code == status.HTTP_200_OK
+        assert "public" in resp["Cache-Control"]
+        assert resp["Last-Modified"]
+
+        queries = capture_queries(lambda: api_client.get(url, HTTP_IF_NONE_MATCH=etag))
+        resp = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+        assert resp["ETag"] == etag
+        assert len([sql for sql in queries if sql.startswith("SELECT")]) == 1
+
+    def test_modified(
+        self, api_client, skill_factory, django_capture_on_commit_callbacks
+    ):
+        url = reverse("api:skill-list")
+        skill = skill_factory()
+        etag = api_client.get(url)["ETag"]
+
+        skill.name = "Updated"
+        with django_capture_on_commit_callbacks(execute=True):
+            skill.save()
+        resp = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp["ETag"] != etag
+
+        etag = resp["ETag"]
+        with django_capture_on_commit_callbacks(execute=True):
+            skill.delete()
+        resp = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.json()["data"]["results"] == []
+
+    def test_invalidated_on_commit(
+        self, api_client, skill_factory, django_capture_on_commit_callbacks
+    ):
+        url = reverse("api:skill-list")
+        skill = skill_factory(name="Old")
+        api_client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            skill.name = "New"
+            skill.save()
+            # a reader before the commit can only cache under the current version
+            resp = api_client.get(url)
+            assert [s["name"] for s in resp.json()["data"]["results"]] == ["Old"]
+
+        resp = api_client.get(url)
+        assert [s["name"] for s in resp.json()["data"]["results"]] == ["New"]
+
+    def test_etag_per_query(self, api_client, skill_factory):
+        url = reverse("api:skill-list")
+        skill_factory()
+        etag = api_client.get(url)["ETag"]
+
+        resp = api_client.get(url, {"search": "x"}, HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == status.HTTP_200_OK
+
+    def test_countries(self, api_client):
+        url = reverse("api:misc-countries")
+        Country.objects.create(code="233", iso="GH", name="Ghana")
+
+        resp = api_client.get(url)
+        assert resp.status_code == status.HTTP_200_OK
+        assert len(resp.json()["data"]) == 1
+
+        resp = api_client.get(url, HTTP_IF_NONE_MATCH=resp["ETag"])
+        assert resp.status_code == status.HTTP_304_NOT_MODIFIED
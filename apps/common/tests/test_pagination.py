@@ -0,0 +1,75 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+pytestmark = pytest.mark.django_db
+
+
+def walk(client, url, params=None):
+    """Follow `next` links collecting result ids"""
+    ids, pages = [], 0
+    resp = client.get(url, params)
+    while True:
+        data = resp.json()["data"]
+        ids += [item["id"] for item in data["results"]]
+        pages += 1
+        if not data["next"]:
+            return ids, pages, data
+        resp = client.get(data["next"])
+
+
+class TestKeysetPagination:
+    def test_walk(self, api_client_auth, user, job_factory):
+        client = api_client_auth(user=user)
+        url = reverse("api:jobs-list")
+        jobs = job_factory.create_batch(5)
+
+        ids, pages, _ = walk(client, url, {"pagination": "cursor", "page_size": 2})
+        assert ids == [str(job.id) for job in jobs]
+        assert pages == 3
+
+    def test_previous(self, api_client_auth, user, job_factory):
+        client = api_client_auth(user=user)
+        url = reverse("api:jobs-list")
+        jobs = job_factory.create_batch(5)
+
+        first = client.get(url, {"pagination": "cursor", "page_size": 2}).json()
+        assert first["data"]["previous"] is None
+
+        second = client.get(first["data"]["next"]).json()
+        assert [item["id"] for item in second["data"]["results"]] == [
+            str(job.id) for job in jobs[2:4]
+        ]
+
+        back = client.get(second["data"]["previous"]).json()
+        assert back["data"]["results"] == first["data"]["results"]
+        assert back["data"]["next"]
+
+    def test_no_count_or_offset(
+        self, api_client_auth, user, job_factory, capture_queries
+    ):
+        client = api_client_auth(user=user)
+        url = reverse("api:jobs-list")
+        job_factory.create_batch(3)
+        next_url = client.get(url, {"pagination": "cursor", "page_size": 1}).json()[
+            "data"
+        ]["next"]
+
+        queries = capture_queries(client.get, next_url)
+        assert not [sql for sql in queries if "COUNT(" in sql]
+        assert not [sql for sql in queries if "OFFSET" in sql]
+
+    def test_invalid_cursor(self, api_client_auth, user):
+        client = api_client_auth(user=user)
+        url = reverse("api:jobs-list")
+
+        resp = client.get(url, {"cursor": "nope"})
+        assert resp.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_page_number_default(self, api_client_auth, user, job_factory):
+        client = api_client_auth(user=user)
+        url = reverse("api:jobs-list")
+        job_factory.create_batch(3)
+
+        data = client.get(url, {"page_size": 2}).json()["data"]
+        assert data["count"] == 3
@@ -0,0 +1,151 @@
+"""
+Query count budget of the router registered list and retrieve endpoints.
+
+Every endpoint is requested with seeded data at two sizes and must run the same
+number of queries at both, so an N+1 regression fails here instead of in
+production. Set `QUERY_COUNT_REPORT` to a file path to write the queries per
+endpoint as JSON for CI to diff between runs:
+
+    QUERY_COUNT_REPORT=query-counts.json pytest apps/common/tests/test_query_counts.py
+"""
+import json
+import os
+
+import pytest
+from django.urls.base import reverse
+from fcm_django.models import FCMDevice
+
+from apps.companies.models import CompanyIndustry, CompanyValue
+from apps.companies.urls import router as companies_router
+from apps.freelancers.urls import router as freelancers_router
+from apps.jobs.models import EscrowTransaction, JobBookmark, JobSubmission
+from apps.jobs.urls import router as jobs_router
+from apps.notifications.urls import router as notifications_router
+from apps.users.urls import router as users_router
+
+pytestmark = pytest.mark.django_db
+
+SMALL, LARGE = 2, 6
+
+ROUTERS = [
+    jobs_router,
+    companies_router,
+    freelancers_router,
+    notifications_router,
+    users_router,
+]
+
+
+def get_endpoints():
+    """`(url name, model)` of every list and retrieve route"""
+
+    endpoints = []
+    for router in ROUTERS:
+        for _, viewset, basename in router.registry:
+            basename = basename or router.get_default_basename(viewset)
+            queryset = getattr(viewset, "queryset", None)
+            model = queryset.model if queryset is not None else None
+            if hasattr(viewset, "list"):
+                endpoints.append((f"{basename}-list", None))
+            if hasattr(viewset, "retrieve") and model:
+                endpoints.append((f"{basename}-detail", model))
+    return endpoints
+
+
+report = {}
+
+ENDPOINTS = [pytest.param(name, model, id=name) for name, model in get_endpoints()]
+
+
+@pytest.fixture
+def seed(
+    user_factory,
+    address_factory,
+    skill_factory,
+    category_factory,
+    company_factory,
+    company_manager_factory,
+    tag_factory,
+    job_factory,
+    freelancer_factory,
+    work_experience_factory,
+    portfolio_item_factory,
+    service_factory,
+    application_factory,
+    monkeypatch,
+    django_capture_on_commit_callbacks,
+):
+    """Create `size` rows of every model exposed by the endpoints"""
+
+    # new applications queue a notification task
+    monkeypatch.setattr("apps.common.tasks.create_task", lambda *a, **k: None)
+
+    def create(size):
+        # committed, so the cached catalog lists are invalidated
+        with django_capture_on_commit_callbacks(execute=True):
+            for _ in range(size):
+                skill = skill_factory()
+                company = company_factory()
+                company_manager_factory(company=company)
+                company.values.add(CompanyValue.objects.create(name="value"))
+                company.industry = CompanyIndustry.objects.create(name="industry")
+                company.save(update_fields=["industry"])
+
+                job = job_factory(company=company)
+                job.skills.add(skill)
+                job.tags.add(tag_factory())
+
+                freelancer = freelancer_factory()
+                freelancer.skills.add(skill)
+                address_factory(user=freelancer.user)
+                work_experience_factory(freelancer=freelancer, user=freelancer.user)
+                portfolio_item_factory(freelancer=freelancer, user=freelancer.user)
+                service_factory(freelancer=freelancer, user=freelancer.user)
+                category_factory()
+                FCMDevice.objects.create(
+                    user=freelancer.user, registration_id=str(freelancer.pk)
+                )
+
+                application = application_factory(freelancer=freelancer, job=job)
+                JobSubmission.objects.create(
+                    application=application, freelancer=freelancer
+                )
+                JobBookmark.objects.create(freelancer=freelancer, job=job)
+                EscrowTransaction.objects.create(job=job, kind="create")
+                user_factory()
+
+    return create
+
+
+def request(client, name, model):
+    if model is None:
+        url = reverse(f"api:{name}")
+    else:
+        url = reverse(f"api:{name}", args=(model.objects.last().pk,))
+    return client.get(url)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def write_report():
+    yield
+
+    path = os.environ.get("QUERY_COUNT_REPORT")
+    if path:
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+
+@pytest.mark.parametrize("name,model", ENDPOINTS)
+def test_query_count_is_constant(
+    name, model, api_client_auth, admin, seed, capture_queries
+):
+    client = api_client_auth(user=admin)
+
+    seed(SMALL)
+    small = capture_queries(request, client, name, model)
+    seed(LARGE - SMALL)
+    large = capture_queries(request, client, name, model)
+
+    report[name] = {"small": len(small), "large": len(large)}
+    assert len(large) == len(small), "\n\n".join(large)
@@ -0,0 +1,113 @@
+import time
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from apps.common.search import trigram_enabled
+from apps.common.typeahead import PrefixIndex
+from apps.users.models import Skill
+from apps.users.views import SkillView
+
+pytestmark = pytest.mark.django_db
+
+
+def names(resp):
+    return [item["name"] for item in resp.json()["data"]]
+
+
+class TestPrefixIndex:
+    def test_search(self):
+        index = PrefixIndex(
+            [
+                (1, "React", 2),
+                (2, "React Native", 5),
+                (3, "Redux", 9),
+                (4, "Python", 1),
+            ]
+        )
+
+        assert [item["name"] for item in index.search("re", 10)] == [
+            "Redux",
+            "React Native",
+            "React",
+        ]
+        assert [item["name"] for item in index.search("nat", 10)] == ["React Native"]
+        assert [item["name"] for item in index.search("re", 1)] == ["Redux"]
+        assert index.search("go", 10) == []
+
+
+@pytest.fixture
+def skills(skill_factory, freelancer_factory, job_factory):
+    python = skill_factory(name="Python")
+    pytorch = skill_factory(name="PyTorch")
+    skill_factory(name="Java")
+    for freelancer in freelancer_factory.create_batch(2):
+        freelancer.skills.add(pytorch)
+    job_factory().skills.add(pytorch)
+    job_factory().skills.add(python)
+    return python, pytorch
+
+
+class TestAutocomplete:
+    def test_trigram(self, api_client, skills):
+        if not trigram_enabled():
+            pytest.skip("pg_trgm is not available on this database")
+        url = reverse("api:skill-autocomplete")
+
+        # ranked by how many freelancers and jobs use the skill
+        assert names(api_client.get(url, {"q": "py"})) == ["PyTorch", "Python"]
+        # close spellings match too
+        assert names(api_client.get(url, {"q": "pyhton"})) == ["Python"]
+        assert api_client.get(url, {"q": ""}).json()["data"] == []
+
+        resp = api_client.get(url, {"q": "py", "limit": 1})
+        assert resp.json()["data"][0]["popularity"] == 3
+
+    def test_trigram_index_used(self):
+        if not trigram_enabled():
+            pytest.skip("pg_trgm is not available on this database")
+        Skill.objects.bulk_create([Skill(name=f"Skill {i}") for i in range(2000)])
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE users_skill")
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+        # prefix, word start and similarity terms all served by the index
+        plan = SkillView().get_trigram_queryset("pyt").explain()
+
+        assert "users_skill_name_trgm" in plan
+        assert "Seq Scan on users_skill" not in plan
+
+    def test_prefix_index(
+        self,
+        api_client,
+        skills,
+        skill_factory,
+        monkeypatch,
+        django_capture_on_commit_callbacks,
+    ):
+        monkeypatch.setattr("apps.common.typeahead.trigram_enabled", lambda: False)
+        url = reverse("api:skill-autocomplete")
+
+        assert names(api_client.get(url, {"q": "py"})) == ["PyTorch", "Python"]
+
+        # new skills invalidate the process index once committed
+        with django_capture_on_commit_callbacks(execute=True):
+            skill_factory(name="Pygame")
+        assert names(api_client.get(url, {"q": "pyg"})) == ["Pygame"]
+
+    def test_latency(self, api_client, skills):
+        url = reverse("api:skill-autocomplete")
+        api_client.get(url, {"q": "py"})
+
+        start = time.perf_counter()
+        api_client.get(url, {"q": "py"})
+        assert time.perf_counter() - start < 0.1
+
+    def test_tags(self, api_client, tag_factory, job_factory):
+        url = reverse("api:tags-autocomplete")
+        remote = tag_factory(name="Remote")
+        tag_factory(name="Relocation")
+        job_factory().tags.add(remote)
+
+        assert names(api_client.get(url, {"q": "re"}))[0] == "Remote"
@@ -0,0 +1,364 @@
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+from django.urls.base import reverse
+from rest_framework import status
+from xrpl.clients import XRPLRequestFailureException
+from xrpl.utils import xrp_to_drops
+from xrpl.wallet import Wallet
+
+from apps.common.fake_rippled import FakeRippled
+from apps.common.xrp import (
+    PaymentQueue,
+    escrow_create_tx,
+    escrow_finish_tx,
+    generate_condition,
+    get_acc_info,
+    get_account_transactions,
+    get_balances,
+    invalidate_balances,
+    reserve_sequences,
+    send_xrp,
+    submit,
+)
+from apps.common.xrp_client import PooledJsonRpcClient, get_client
+
+
+def unused_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/"
+
+
+class TestXRPClient:
+    def test_shared_client_reuses_connection(self, fake_rippled):
+        wallets = [fake_rippled.ledger.wallet(xrp=50) for _ in range(5)]
+
+        for wallet in wallets:
+            info = get_acc_info(wallet.address)
+
+        assert info["Balance"] == xrp_to_drops(50)
+        assert get_client() is get_client()
+        assert fake_rippled.requests == 5
+        assert len(fake_rippled.connections) == 1
+
+    def test_retry_transient_errors(self, fake_rippled):
+        wallet = fake_rippled.ledger.wallet()
+        fake_rippled.fail_next(2, status=503)
+
+        get_acc_info(wallet.address)
+
+        assert fake_rippled.requests == 3
+
+    def test_give_up_after_max_retries(self, fake_rippled, settings):
+        wallet = fake_rippled.ledger.wallet()
+        fake_rippled.fail_next(settings.XRPL_MAX_RETRIES + 1, status=502)
+
+        with pytest.raises(XRPLRequestFailureException):
+            get_acc_info(wallet.address)
+
+    def test_failover(self, fake_rippled, settings):
+        wallet = fake_rippled.ledger.wallet()
+        settings.XRPL_ENDPOINTS = [unused_url(), fake_rippled.url]
+
+        get_acc_info(wallet.address)
+
+        assert get_client().url == fake_rippled.url
+
+    def test_all_endpoints_down(self):
+        client = PooledJsonRpcClient(
+            [unused_url(), unused_url()], max_retries=1, backoff=0
+        )
+
+        with pytest.raises(httpx.ConnectError):
+            client.post({"method": "server_info", "params": [{}]})
+
+
+class TestXRP:
+    def test_send_xrp(self, fake_rippled):
+        ledger = fake_rippled.ledger
+        sender = ledger.wallet(xrp=100)
+        receiver = ledger.wallet(xrp=20)
+
+        response = send_xrp(sender.seed, 30, receiver.address)
+
+        assert response.result["meta"]["TransactionResult"] == "tesSUCCESS"
+        assert ledger.balance(receiver.address) == int(xrp_to_drops(50))
+
+    def test_conditional_escrow(self, fake_rippled):
+        ledger = fake_rippled.ledger
+        company = ledger.wallet(xrp=100)
+        freelancer = ledger.wallet(xrp=20)
+        condition, fulfillment = generate_condition()
+
+        escrow = submit(
+            escrow_create_tx(
+                company.address, xrp_to_drops(40), freelancer.address, 60, condition
+            ),
+            company,
+        ).result
+        sequence = escrow["tx_json"]["Sequence"]
+
+        assert [e["Condition"] for e in ledger.escrows.values()] == [condition]
+
+        ledger.time_offset = 120
+        submit(
+            escrow_finish_tx(
+                company.address, company.address, sequence, condition, fulfillment
+            ),
+            company,
+        )
+
+        assert ledger.escrows == {}
+        assert ledger.balance(freelancer.address) == int(xrp_to_drops(60))
+
+    def test_fake_rippled_pipelined_submits_share_a_ledger(self):
+        with FakeRippled() as server:
+            ledger = server.ledger
+            wallet = ledger.wallet()
+            start = ledger.validated_index
+            sequence = ledger.accounts[wallet.address]["Sequence"]
+
+            # the second payment arrives first and waits for its turn
+            for offset in (1, 0):
+                tx = {
+                    "Account": wallet.address,
+                    "TransactionType": "Payment",
+                    "Amount": "1000000",
+                    "Destination": wallet.address,
+                    "Sequence": sequence + offset,
+                    "Fee": "10",
+                    "hash": f"HASH{offset}",
+                }
+                ledger.submit(tx)
+            ledger.close()
+
+        assert ledger.validated_index == start + 1
+        assert {record["ledger_index"] for record in ledger.transactions.values()} == {
+            start + 1
+        }
+
+
+@pytest.mark.django_db
+class TestBalances:
+    def test_balance_cached(self, fake_rippled):
+        wallet = fake_rippled.ledger.wallet(xrp=50)
+
+        first = get_acc_info(wallet.address)
+        second = get_acc_info(wallet.address)
+
+        assert first == second
+        assert first["ledger_index"] == fake_rippled.ledger.validated_index
+        assert fake_rippled.requests == 1
+
+    def test_submit_invalidates_balances(self, fake_rippled):
+        ledger = fake_rippled.ledger
+        company = ledger.wallet(xrp=100)
+        freelancer = ledger.wallet(xrp=20)
+        get_balances([company.address, freelancer.address])
+
+        condition, fulfillment = generate_condition()
+        escrow = submit(
+            escrow_create_tx(
+                company.address, xrp_to_drops(40), freelancer.address, 60, condition
+            ),
+            company,
+        ).result
+        assert get_acc_info(company.address)["Balance"] == str(
+            ledger.balance(company.address)
+        )
+
+        # only the company signs, the freelancer is credited through the escrow
+        get_acc_info(freelancer.address)
+        ledger.time_offset = 120
+        submit(
+            escrow_finish_tx(
+                company.address,
+                company.address,
+                escrow["tx_json"]["Sequence"],
+                condition,
+                fulfillment,
+            ),
+            company,
+        )
+
+        assert get_acc_info(freelancer.address)["Balance"] == xrp_to_drops(60)
+
+    def test_bulk_balances(self, fake_rippled):
+        ledger = fake_rippled.ledger
+        wallets = [ledger.wallet(xrp=10 + i) for i in range(3)]
+        get_acc_info(wallets[0].address)
+        requests = fake_rippled.requests
+
+        balances = get_balances([w.address for w in wallets] + ["rUnknown"])
+
+        assert fake_rippled.requests - requests == 3
+        assert list(balances) == [w.address for w in wallets]
+        assert [b["Balance"] for b in balances.values()] == [
+            xrp_to_drops(10 + i) for i in range(3)
+        ]
+
+    def test_stale_ledger_not_cached(self, fake_rippled):
+        wallet = fake_rippled.ledger.wallet()
+        # as if our last transaction validated in a ledger this server hasn't seen
+        invalidate_balances([wallet.address], ledger_index=10**6)
+
+        get_acc_info(wallet.address)
+        get_acc_info(wallet.address)
+
+        assert fake_rippled.requests == 2
+
+    def test_get_balances_endpoint(self, api_client, fake_rippled):
+        wallet = fake_rippled.ledger.wallet(xrp=25)
+
+        resp = api_client.post(
+            reverse("api:misc-get-balances"),
+            {"xrp_addresses": [wallet.address, "rUnknown"]},
+            format="json",
+        )
+        data = resp.json()["data"]
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert data[0]["account"] == wallet.address
+        assert float(data[0]["xrp_balance"]) == 25
+        assert data[1]["xrp_balance"] is None
+
+    def test_account_transactions_paged(self, fake_rippled):
+        ledger = fake_rippled.ledger
+        sender = ledger.wallet(xrp=100)
+        receiver = ledger.wallet(xrp=20)
+        for _ in range(3):
+            send_xrp(sender.seed, 1, receiver.address)
+
+        transactions, ledger_index = get_account_transactions(sender.address, limit=2)
+        requests = fake_rippled.requests
+        later, _ = get_account_transactions(sender.address, ledger_index + 1)
+
+        assert len(transactions) == 3
+        assert ledger_index == ledger.validated_index
+        assert [t["tx_json"]["Sequence"] for t in transactions] == sorted(
+            t["tx_json"]["Sequence"] for t in transactions
+        )
+        assert later == []
+        assert fake_rippled.requests == requests + 1
+        assert get_account_transactions("rUnknown") == ([], None)
+
+
+@pytest.mark.django_db
+class TestPaymentQueue:
+    def test_payments_share_a_ledger(self, fake_rippled):
+        ledger = fake_rippled.ledger
+        sender = ledger.wallet(xrp=500)
+        receivers = [ledger.wallet(xrp=20) for _ in range(5)]
+        queue = PaymentQueue(sender.seed)
+        for receiver in receivers:
+            queue.add(10, receiver.address)
+
+        payments = queue.send()
+
+        assert [p["result"] for p in payments] == ["tesSUCCESS"] * 5
+        assert len({p["ledger_index"] for p in payments}) == 1
+        assert [ledger.balance(r.address) for r in receivers] == [30_000_000] * 5
+        # fee, ledger and sequence reads, the submits, then one ledger read and a
+        # lookup per payment once the last one validated
+        assert fake_rippled.requests == 3 + 5 + 1 + 5
+
+    def test_failed_payment_keeps_the_others(self, fake_rippled):
+        ledger = fake_rippled.ledger
+        sender = ledger.wallet(xrp=500)
+        receiver = ledger.wallet(xrp=20)
+        queue = PaymentQueue(sender.seed)
+        queue.add(10, receiver.address)
+        # below the reserve needed to create the account
+        queue.add(1, Wallet.create().address)
+        queue.add(10, receiver.address)
+
+        payments = queue.send()
+
+        assert [p["result"] for p in payments] == [
+            "tesSUCCESS",
+            "tecNO_DST_INSUF_XRP",
+            "tesSUCCESS",
+        ]
+        assert payments[1]["error"] == "tecNO_DST_INSUF_XRP"
+        assert ledger.balance(receiver.address) == 40_000_000
+
+    def test_last_payment_dropped(self, fake_rippled, settings, monkeypatch):
+        settings.XRP_PAYMENT_LEDGER_OFFSET = 1
+        ledger = fake_rippled.ledger
+        sender = ledger.wallet(xrp=500)
+        receiver = ledger.wallet(xrp=20)
+        submit = ledger.submit
+        submitted = []
+
+        def drop_last(tx_json):
+            submitted.append(tx_json)
+            # accepted, then lost before it made it into a ledger
+            if len(submitted) == 3:
+                return "tesSUCCESS"
+            return submit(tx_json)
+
+        monkeypatch.setattr(ledger, "submit", drop_last)
+        queue = PaymentQueue(sender.seed)
+        for _ in range(3):
+            queue.add(10, receiver.address)
+
+        payments = queue.send()
+
+        # the validated payments are reported as such, only the lost one expired
+        assert [p["result"] for p in payments] == [
+            "tesSUCCESS",
+            "tesSUCCESS",
+            "tefMAX_LEDGER",
+        ]
+        assert ledger.balance(receiver.address) == 40_000_000
+
+    def test_concurrent_queues_from_one_account(self, fake_rippled):
+        ledger = fake_rippled.ledger
+        sender = ledger.wallet(xrp=500)
+        receiver = ledger.wallet(xrp=20)
+
+        def send(_):
+            queue = PaymentQueue(sender.seed)
+            for _ in range(3):
+                queue.add(1, receiver.address)
+            return [p["result"] for p in queue.send()]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(send, range(4)))
+
+        assert results == [["tesSUCCESS"] * 3] * 4
+        assert ledger.balance(receiver.address) == 32_000_000
+
+    def test_stale_sequence_resynced(self, fake_rippled):
+        ledger = fake_rippled.ledger
+        sender = ledger.wallet(xrp=500)
+        receiver = ledger.wallet(xrp=20)
+        reserve_sequences(get_client(), sender.address, 1)
+        # sent without the queue, the cached sequence is now taken
+        send_xrp(sender.seed, 1, receiver.address)
+        send_xrp(sender.seed, 1, receiver.address)
+
+        queue = PaymentQueue(sender.seed)
+        queue.add(1, receiver.address)
+
+        assert queue.send()[0]["result"] == "tesSUCCESS"
+
+    def test_withdraw_xrp(self, api_client_auth, fake_rippled, company_factory):
+        ledger = fake_rippled.ledger
+        wallet = ledger.wallet(xrp=100)
+        receiver = ledger.wallet(xrp=20)
+        company = company_factory(xrp_address=wallet.address, xrp_seed=wallet.seed)
+        client = api_client_auth(user=company.user)
+        url = reverse("api:misc-withdraw-xrp")
+        data = {"xrp_address": receiver.address, "company": str(company.pk)}
+
+        resp = client.post(url, {**data, "xrp_amount": "30"}, format="json")
+        assert resp.status_code == status.HTTP_200_OK
+        assert ledger.balance(receiver.address) == 50_000_000
+
+        resp = client.post(url, {**data, "xrp_amount": "1000"}, format="json")
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,205 @@
+import bisect
+import heapq
+import time
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from .cache import get_tag_versions
+from .search import ILike, like_escape, trigram_enabled
+
+# per process prefix indexes, keyed by view
+_indexes = {}
+
+query_param = openapi.Parameter(
+    "q", openapi.IN_QUERY, description="Text typed so far", type=openapi.TYPE_STRING
+)
+limit_param = openapi.Parameter(
+    "limit",
+    openapi.IN_QUERY,
+    description="Max results. default: 10",
+    type=openapi.TYPE_INTEGER,
+)
+suggestion_schema = openapi.Schema(
+    type=openapi.TYPE_ARRAY,
+    items=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            "id": openapi.Schema(type=openapi.TYPE_STRING),
+            "name": openapi.Schema(type=openapi.TYPE_STRING),
+            "popularity": openapi.Schema(type=openapi.TYPE_INTEGER),
+        },
+    ),
+)
+
+
+def count_usages(model, field):
+    """Subquery counting the `model` rows pointing at the outer object via `field`"""
+
+    rows = (
+        model.objects.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
+class PrefixIndex:
+    """
+    In memory typeahead index.
+
+    Keeps the lowercased name and every word start of it in a sorted list so a
+    prefix lookup is a binary search, e.g "react native" is found by "re" and "na".
+    """
+
+    def __init__(self, rows):
+        entries = []
+        for pk, name, popularity in rows:
+            words = name.lower().split()
+            for position in range(len(words)):
+                key = " ".join(words[position:])
+                entries.append((key, str(pk), name, popularity))
+        entries.sort()
+        self.keys = [entry[0] for entry in entries]
+        self.entries = entries
+
+    def search(self, text, limit):
+        text = text.lower()
+        start = bisect.bisect_left(self.keys, text)
+        end = bisect.bisect_left(self.keys, text + "\uffff")
+
+        matches = {}
+        for _, pk, name, popularity in self.entries[start:end]:
+            matches[pk] = (pk, name, popularity)
+
+        best = heapq.nsmallest(
+            limit, matches.values(), key=lambda item: (-item[2], item[1].lower())
+        )
+        return [
+            {"id": pk, "name": name, "popularity": popularity}
+            for pk, name, popularity in best
+        ]
+
+
+class TypeaheadMixin:
+    """
+    Adds an `autocomplete` action ranking names by popularity.
+
+    Set `typeahead_usages` to the `(model, field)` pairs whose rows count as a use,
+    e.g `(Job.skills.through, "skill")`, and `cache_tags` to the tags invalidated
+    when the model changes. Lookups use the `pg_trgm` index on `name` when the
+    extension is installed, otherwise an in memory `PrefixIndex` built once per process.
+    """
+
+    typeahead_usages = ()
+    typeahead_limit = 10
+    typeahead_max_limit = 50
+
+    def get_popularity(self):
+        usages = [count_usages(model, field) for model, field in self.typeahead_usages]
+        if not usages:
+            return Value(0, output_field=IntegerField())
+
+        popularity = usages[0]
+        for usage in usages[1:]:
+            popularity = popularity + usage
+        return popularity
+
+    def get_typeahead_limit(self, request):
+        try:
+            limit = int(request.query_params["limit"])
+        except (KeyError, ValueError):
+            return self.typeahead_limit
+        return min(max(limit, 1), self.typeahead_max_limit)
+
+    @swagger_auto_schema(
+        method="GET",
+        manual_parameters=[query_param, limit_param],
+        responses={200: suggestion_schema},
+    )
+    @action(detail=False, permission_classes=[AllowAny], methods=["GET"])
+    def autocomplete(self, request):
+        text = request.query_params.get("q", "").strip()
+        if not text:
+            return Response([])
+
+        limit = self.get_typeahead_limit(request)
+        if trigram_enabled():
+            return Response(self.trigram_search(text, limit))
+        return Response(self.get_prefix_index().search(text, limit))
+
+    def get_trigram_queryset(self, text):
+        """
+        Prefix matches first, then close spellings, ranked by popularity.
+
+        Every term is one the `pg_trgm` index on `name` serves: `ILIKE` for the
+        prefix and word starts, `%` for similarity.
+        """
+        escaped = like_escape(text)
+        prefix = Q(ILike(F("name"), Value(f"{escaped}%"))) | Q(
+            ILike(F("name"), Value(f"% {escaped}%"))
+        )
+        return (
+            self.queryset.model.objects.filter(prefix | Q(name__trigram_similar=text))
+            .annotate(
+                prefix=Case(When(prefix, then=1), default=0),
+                popularity=self.get_popularity(),
+                similarity=TrigramSimilarity("name", text),
+            )
+            .order_by("-prefix", "-popularity", "-similarity", "name")
+        )
+
+    def trigram_search(self, text, limit):
+        queryset = self.get_trigram_queryset(text)
+        return [
+            {"id": str(pk), "name": name, "popularity": popularity}
+            for pk, name, popularity in queryset.values_list(
+                "pk", "name", "popularity"
+            )[:limit]
+        ]
+
+    def get_prefix_index(self):
+        """
+        Process wide index of the model.
+
+        Rebuilt when one of `cache_tags` is invalidated or after
+        `TYPEAHEAD_INDEX_TTL` seconds, so popularity changes show up eventually.
+        """
+        version = get_tag_versions(self.cache_tags)
+        cached = _indexes.get(self.basename)
+        if (
+            cached
+            and cached["version"] == version
+            and time.monotonic() - cached["built_at"] < settings.TYPEAHEAD_INDEX_TTL
+        ):
+            return cached["index"]
+
+        rows = self.queryset.model.objects.annotate(
+            popularity=self.get_popularity()
+        ).values_list("pk", "name", "popularity")
+        index = PrefixIndex(rows)
+        _indexes[self.basename] = {
+            "version": version,
+            "built_at": time.monotonic(),
+            "index": index,
+        }
+        return index
@@ -0,0 +1,25 @@
+class NonAtomicActionsMixin:
+    """
+    Honours `transaction.non_atomic_requests` on viewset actions.
+
+    With `ATOMIC_REQUESTS` Django looks for the marker on the view function of
+    the route, which DRF builds in `as_view` from the actions it serves.
+
+    Usage:
+        class EscrowView(NonAtomicActionsMixin, GenericViewSet):
+            @action(detail=False)
+            @transaction.non_atomic_requests
+            def reconcile(self, request):
+                ...
+    """
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        for name in (actions or {}).values():
+            using = getattr(getattr(cls, name, None), "_non_atomic_requests", set())
+            if using:
+                view._non_atomic_requests = (
+                    getattr(view, "_non_atomic_requests", set()) | using
+                )
+        return view
@@ -1,39 +1,26 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from os import urandom
 
 import xrpl
 from cryptoconditions import PreimageSha256
 from django.conf import settings
+from django.core.cache import cache
 from rest_framework.exceptions import ValidationError
-from xrpl.clients import JsonRpcClient
-from xrpl.models.requests import AccountObjects
-from xrpl.models.transactions import EscrowCreate, EscrowFinish
+from xrpl.account import get_next_valid_seq_number
+from xrpl.clients import XRPLRequestFailureException
+from xrpl.ledger import get_fee, get_latest_validated_ledger_sequence
+from xrpl.models.requests import AccountInfo, AccountTx, Tx
+from xrpl.models.transactions import EscrowCreate, EscrowFinish, Payment
 from xrpl.wallet import Wallet
 
-XRP_LIVE = settings.XRP_LIVE
-if XRP_LIVE:
-    xrp_url = "https://xrplcluster.com/"
-else:
-    xrp_url = "https://s.devnet.rippletest.net:51234/"
-    # xrp_url = "https://s.altnet.rippletest.net:51234"
-
-
-def get_account(seed):
-    """get_account"""
-    client = xrpl.clients.JsonRpcClient(xrp_url)
-    if seed == "":
-        if XRP_LIVE:
-            new_wallet = xrpl.wallet.Wallet.create()
-        else:
-            new_wallet = xrpl.wallet.generate_faucet_wallet(client)
-    else:
-        new_wallet = xrpl.wallet.Wallet.from_seed(seed)
-    return new_wallet
+from .xrp_client import get_client
 
 
 def get_account_info(accountId):
     """get_account_info"""
-    client = xrpl.clients.JsonRpcClient(xrp_url)
+    client = get_client()
     acct_info = xrpl.models.requests.account_info.AccountInfo(
         account=accountId, ledger_index="validated"
     )
@@ -42,21 +29,134 @@ def get_account_info(accountId):
     return response
 
 
+def _balance_key(address):
+    return f"xrp-balance:{address}"
+
+
+def _balance_floor_key(address):
+    return f"xrp-balance-ledger:{address}"
+
+
+def _fetch_account_root(client, address):
+    """Validated account root of `address`, None when the account doesn't exist"""
+
+    response = client.request(AccountInfo(account=address, ledger_index="validated"))
+    if not response.is_successful():
+        if response.result.get("error") == "actNotFound":
+            return None
+        raise XRPLRequestFailureException(response.result)
+
+    return {
+        **response.result["account_data"],
+        "ledger_index": response.result["ledger_index"],
+    }
+
+
+def get_balances(addresses):
+    """
+    Account roots of `addresses` keyed by address, cached for a few seconds.
+
+    Each entry carries the validated `ledger_index` it was read at. Misses are
+    fetched concurrently. Accounts not found on the ledger are left out.
+    See `invalidate_balances` for how entries expire early.
+    """
+    addresses = list(dict.fromkeys(addresses))
+    cached = cache.get_many([_balance_key(address) for address in addresses])
+    balances = {
+        address: cached[_balance_key(address)]
+        for address in addresses
+        if _balance_key(address) in cached
+    }
+
+    misses = [address for address in addresses if address not in balances]
+    if not misses:
+        return balances
+
+    client = get_client()
+    floors = cache.get_many([_balance_floor_key(address) for address in misses])
+    max_workers = min(settings.XRP_BALANCE_MAX_WORKERS, len(misses))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        accounts = executor.map(lambda a: _fetch_account_root(client, a), misses)
+
+    fresh = {}
+    for address, account in zip(misses, accounts):
+        if account is None:
+            continue
+        balances[address] = account
+        # a lagging server may still answer from before our last transaction
+        if account["ledger_index"] >= floors.get(_balance_floor_key(address), 0):
+            fresh[_balance_key(address)] = account
+
+    cache.set_many(fresh, timeout=settings.XRP_BALANCE_CACHE_TIMEOUT)
+    return {address: balances[address] for address in addresses if address in balances}
+
+
+def invalidate_balances(addresses, ledger_index=None):
+    """
+    Drop the cached balances of `addresses`.
+
+    With `ledger_index`, the validated ledger a transaction landed in, reads from
+    older ledgers are not cached again for a while.
+    """
+    addresses = {address for address in addresses if address}
+    cache.delete_many([_balance_key(address) for address in addresses])
+    if ledger_index:
+        cache.set_many(
+            {_balance_floor_key(address): ledger_index for address in addresses},
+            timeout=settings.CACHE_DEFAULT_TIMEOUT,
+        )
+
+
 def get_acc_info(addr):
-    client = xrpl.clients.JsonRpcClient(xrp_url)
-    return xrpl.account.get_account_root(addr, client)
+    balances = get_balances([addr])
+    if addr not in balances:
+        raise XRPLRequestFailureException(
+            {"error": "actNotFound", "error_message": "Account not found."}
+        )
+    return balances[addr]
+
+
+def affected_accounts(meta):
+    """Addresses of the account roots a validated transaction modified"""
+
+    accounts = set()
+    for node in meta.get("AffectedNodes", []):
+        for change in node.values():
+            if change.get("LedgerEntryType") == "AccountRoot":
+                fields = change.get("FinalFields") or change.get("NewFields") or {}
+                accounts.add(fields.get("Account"))
+    return accounts
+
+
+def submit(transaction, wallet):
+    """
+    `submit_and_wait` which drops the cached balances of the accounts involved,
+    whether the transaction succeeds or not as the fee is charged either way.
+    """
+    addresses = {
+        transaction.account,
+        getattr(transaction, "destination", None),
+        getattr(transaction, "owner", None),
+    }
+    ledger_index = None
+    try:
+        response = xrpl.transaction.submit_and_wait(transaction, get_client(), wallet)
+        addresses |= affected_accounts(response.result.get("meta", {}))
+        ledger_index = response.result.get("ledger_index")
+        return response
+    finally:
+        invalidate_balances(addresses, ledger_index=ledger_index)
 
 
 def send_xrp(seed, amount, destination):
     sending_wallet = xrpl.wallet.Wallet.from_seed(seed)
-    client = xrpl.clients.JsonRpcClient(xrp_url)
     payment = xrpl.models.transactions.Payment(
         account=sending_wallet.address,
         amount=xrpl.utils.xrp_to_drops(amount),
         destination=destination,
     )
     try:
-        response = xrpl.transaction.submit_and_wait(payment, client, sending_wallet)
+        response = submit(payment, sending_wallet)
     except xrpl.transaction.XRPLReliableSubmissionException as e:
         response = f"Submit failed: {e}"
         raise ValidationError(response)
@@ -64,6 +164,191 @@ def send_xrp(seed, amount, destination):
     return response
 
 
+def _sequence_key(address):
+    return f"xrp-sequence:{address}"
+
+
+def reserve_sequences(client, address, count):
+    """
+    Reserve `count` consecutive sequence numbers of `address`, returns the first.
+
+    The next free sequence is kept in the cache and incremented atomically, so
+    concurrent senders from the same account, in any process, sign with distinct
+    sequences instead of all reading the same one from the ledger.
+    """
+    key = _sequence_key(address)
+    try:
+        return cache.incr(key, count) - count
+    except ValueError:
+        pass
+
+    first = get_next_valid_seq_number(address, client)
+    if cache.add(key, first + count, timeout=settings.XRP_SEQUENCE_CACHE_TIMEOUT):
+        return first
+    # another sender read it first
+    return cache.incr(key, count) - count
+
+
+def reset_sequence(address):
+    """Read the next sequence of `address` from the ledger again on next reserve"""
+    cache.delete(_sequence_key(address))
+
+
+class PaymentQueue:
+    """
+    XRP payments from one account, submitted and confirmed as a group.
+
+    Sequence numbers for the whole queue are reserved up front with
+    `reserve_sequences`. The payments are signed locally and submitted back to
+    back without waiting for each other to validate. As an account's
+    transactions apply in sequence order, confirming the group takes one lookup
+    of the last payment per ledger close until it validates.
+
+    Each payment ends up with its final `result`, e.g tesSUCCESS, or None with
+    an `error` when it was never submitted.
+    """
+
+    def __init__(self, seed):
+        self.wallet = Wallet.from_seed(seed)
+        self.payments = []
+        self.last_ledger_sequence = None
+
+    def add(self, amount, destination):
+        """Queue `amount` XRP to `destination`"""
+        self.payments.append(
+            {
+                "amount": amount,
+                "destination": destination,
+                "tx_hash": None,
+                "result": None,
+                "ledger_index": None,
+                "error": "",
+            }
+        )
+
+    def send(self):
+        """Submit then confirm the queued payments, returns them"""
+        if not self.payments:
+            return []
+
+        client = get_client()
+        try:
+            submitted = self.submit(client)
+            self.confirm(client, submitted)
+        finally:
+            ledger_index = max(
+                (p["ledger_index"] for p in self.payments if p["ledger_index"]),
+                default=None,
+            )
+            invalidate_balances(
+                {self.wallet.address} | {p["destination"] for p in self.payments},
+                ledger_index=ledger_index,
+            )
+        return self.payments
+
+    def sign(self, payment, sequence, fee):
+        transaction = Payment(
+            account=self.wallet.address,
+            amount=xrpl.utils.xrp_to_drops(payment["amount"]),
+            destination=payment["destination"],
+            sequence=sequence,
+            fee=fee,
+            last_ledger_sequence=self.last_ledger_sequence,
+        )
+        return xrpl.transaction.sign(transaction, self.wallet)
+
+    def submit(self, client):
+        """Sign and submit the payments in sequence order, returns those submitted"""
+
+        address = self.wallet.address
+        fee = get_fee(client)
+        self.last_ledger_sequence = (
+            get_latest_validated_ledger_sequence(client)
+            + settings.XRP_PAYMENT_LEDGER_OFFSET
+        )
+        sequence = reserve_sequences(client, address, len(self.payments))
+
+        submitted = []
+        retried = False
+        try:
+            while len(submitted) < len(self.payments):
+                index = len(submitted)
+                payment = self.payments[index]
+                signed = self.sign(payment, sequence + index, fee)
+                payment["tx_hash"] = signed.get_hash()
+                response = xrpl.transaction.submit(signed, client)
+                result = response.result["engine_result"]
+
+                if result == "tefPAST_SEQ" and index == 0 and not retried:
+                    # the cached sequence was stale, another sender used it
+                    reset_sequence(address)
+                    sequence = reserve_sequences(client, address, len(self.payments))
+                    retried = True
+                    continue
+                if result[:3] in ("tem", "tef", "tel"):
+                    # none of the later sequences can apply without this one
+                    payment["result"] = payment["error"] = result
+                    for later in self.payments[index:]:
+                        later["error"] = later["error"] or "Earlier payment failed"
+                    reset_sequence(address)
+                    break
+
+                submitted.append(payment)
+        except Exception:
+            reset_sequence(address)
+            raise
+
+        return submitted
+
+    def confirm(self, client, submitted):
+        """Wait for the final result of the submitted payments"""
+
+        pending = list(submitted)
+        while pending:
+            # read the ledger first, a payment missing after it is final
+            latest = get_latest_validated_ledger_sequence(client)
+            expired = latest >= self.last_ledger_sequence
+            # sequences apply in order, once the last payment validated the
+            # earlier ones are final too. Past the last ledger every one is, the
+            # earlier payments may have validated without the last
+            if self.lookup(client, pending[-1]) or expired:
+                self.lookup_all(client, pending[:-1])
+            pending = [payment for payment in pending if payment["result"] is None]
+
+            if pending and expired:
+                for payment in pending:
+                    payment["result"] = payment["error"] = "tefMAX_LEDGER"
+                break
+            if pending:
+                time.sleep(settings.XRP_PAYMENT_POLL_INTERVAL)
+
+    def lookup_all(self, client, payments):
+        """`lookup` of each payment, run concurrently"""
+
+        if not payments:
+            return
+        workers = min(settings.XRP_BALANCE_MAX_WORKERS, len(payments))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda p: self.lookup(client, p), payments))
+
+    def lookup(self, client, payment):
+        """Record the outcome of a validated payment, False while it is not"""
+
+        response = client.request(Tx(transaction=payment["tx_hash"]))
+        if not response.is_successful():
+            if response.result.get("error") != "txnNotFound":
+                raise XRPLRequestFailureException(response.result)
+            return False
+        if not response.result.get("validated"):
+            return False
+
+        payment["result"] = response.result["meta"]["TransactionResult"]
+        payment["ledger_index"] = response.result["ledger_index"]
+        if payment["result"] != "tesSUCCESS":
+            payment["error"] = payment["result"]
+        return True
+
+
 def generate_condition():
     randy = urandom(32)
     fulfillment = PreimageSha256(preimage=randy)
@@ -81,56 +366,100 @@ def add_seconds(numOfSeconds):
     return new_date
 
 
-def create_conditional_escrow(seed, amount, destination, cancel, condition):
-    wallet = Wallet.from_seed(seed)
-    client = JsonRpcClient(xrp_url)
-    cancel_date = add_seconds(cancel)
-    source_tag = settings.XRP_SOURCE_TAG
-
-    escrow_tx = EscrowCreate(
-        account=wallet.address,
+def escrow_create_tx(account, amount, destination, cancel, condition):
+    """EscrowCreate of `amount` drops, finishable after `cancel` seconds"""
+    return EscrowCreate(
+        account=account,
         amount=amount,
         destination=destination,
-        finish_after=cancel_date,
+        finish_after=add_seconds(cancel),
         condition=condition,
-        source_tag=source_tag,
+        source_tag=settings.XRP_SOURCE_TAG,
     )
-    # Submit the transaction and report the results
-    reply = ""
-    try:
-        response = xrpl.transaction.submit_and_wait(escrow_tx, client, wallet)
-        reply = response.result
-    except xrpl.transaction.XRPLReliableSubmissionException as e:
-        reply = f"Submit failed: {e}"
-        raise ValidationError(reply)
-    return reply
 
 
-def finish_conditional_escrow(seed, owner, sequence, condition, fulfillment):
-    wallet = Wallet.from_seed(seed)
-    client = JsonRpcClient(xrp_url)
-    finish_tx = EscrowFinish(
-        account=wallet.address,
+def escrow_finish_tx(account, owner, sequence, condition, fulfillment):
+    return EscrowFinish(
+        account=account,
         owner=owner,
         offer_sequence=int(sequence),
         condition=condition,
         fulfillment=fulfillment,
     )
-    # Submit the transaction and report the results
-    reply = ""
-    try:
-        response = xrpl.transaction.submit_and_wait(finish_tx, client, wallet)
-        reply = response.result
-    except xrpl.transaction.XRPLReliableSubmissionException as e:
-        reply = f"Submit failed: {e}"
-        raise ValidationError(reply)
-    return reply
 
 
-def get_escrows(account):
-    client = JsonRpcClient(xrp_url)
-    acct_escrows = AccountObjects(
-        account=account, ledger_index="validated", type="escrow"
-    )
-    response = client.request(acct_escrows)
+def sign(transaction, seed):
+    """Autofill and sign `transaction`, the signed transaction can be resubmitted"""
+    wallet = Wallet.from_seed(seed)
+    return xrpl.transaction.autofill_and_sign(transaction, get_client(), wallet)
+
+
+def submit_signed(transaction):
+    """
+    Submit a signed transaction without waiting for it to be validated.
+
+    Returns the preliminary result, see `get_outcome` for the final one.
+    """
+    try:
+        response = xrpl.transaction.submit(transaction, get_client())
+    finally:
+        invalidate_balances({transaction.account})
     return response.result
+
+
+def get_outcome(tx_hash, last_ledger_sequence):
+    """
+    Final result code of a submitted transaction and the ledger it was validated in.
+
+    Returns None while the transaction may still be included in a ledger. Once
+    `last_ledger_sequence` is validated without it, it never will be and
+    `("tefMAX_LEDGER", None)` is returned.
+    """
+    client = get_client()
+    # read the ledger first, a transaction missing after it is final
+    latest = xrpl.ledger.get_latest_validated_ledger_sequence(client)
+    response = client.request(Tx(transaction=tx_hash))
+    if response.is_successful():
+        if response.result.get("validated"):
+            ledger_index = response.result["ledger_index"]
+            meta = response.result["meta"]
+            invalidate_balances(affected_accounts(meta), ledger_index=ledger_index)
+            return meta["TransactionResult"], ledger_index
+    elif response.result.get("error") != "txnNotFound":
+        raise XRPLRequestFailureException(response.result)
+
+    if latest >= last_ledger_sequence:
+        return "tefMAX_LEDGER", None
+    return None
+
+
+def get_account_transactions(account, ledger_index_min=-1, limit=200):
+    """
+    Validated transactions of `account` from `ledger_index_min` on, oldest first.
+
+    Follows the pagination markers and returns `(transactions, ledger_index_max)`,
+    the last validated ledger covered by the search, or `([], None)` when the
+    account doesn't exist yet.
+    """
+    client = get_client()
+    transactions, marker = [], None
+    while True:
+        response = client.request(
+            AccountTx(
+                account=account,
+                ledger_index_min=ledger_index_min,
+                ledger_index_max=-1,
+                forward=True,
+                limit=limit,
+                marker=marker,
+            )
+        )
+        if not response.is_successful():
+            if response.result.get("error") == "actNotFound":
+                return [], None
+            raise XRPLRequestFailureException(response.result)
+
+        transactions += response.result["transactions"]
+        marker = response.result.get("marker")
+        if marker is None:
+            return transactions, response.result["ledger_index_max"]
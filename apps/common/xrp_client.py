@@ -0,0 +1,122 @@
+import logging
+import random
+import threading
+import time
+from functools import lru_cache
+from json import JSONDecodeError
+
+import httpx
+from django.conf import settings
+from xrpl.asyncio.clients.utils import json_to_response, request_to_json_rpc
+from xrpl.clients import JsonRpcClient, XRPLRequestFailureException
+
+logger = logging.getLogger(__name__)
+
+# responses worth retrying, possibly on another server
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRY_ERRORS = {"tooBusy", "noNetwork", "noCurrent", "noClosed", "slowDown"}
+
+
+class PooledJsonRpcClient(JsonRpcClient):
+    """
+    JSON-RPC client sharing one pool of keep-alive connections.
+
+    The stock client opens a new connection, and TLS session, for every request.
+    This one reuses a thread safe `httpx.Client`, retries transient errors with
+    jittered exponential backoff and fails over to the next of `endpoints` when a
+    server is unreachable or busy. Works with every xrpl-py helper taking a client.
+    """
+
+    def __init__(self, endpoints, timeout=10, max_retries=3, backoff=0.5, pool_size=10):
+        super().__init__(endpoints[0])
+        self.endpoints = list(endpoints)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.http = httpx.Client(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=pool_size, max_keepalive_connections=pool_size
+            ),
+        )
+        self.lock = threading.Lock()
+
+    async def _request_impl(self, request, *, timeout=None):
+        # the pool is synchronous so it can outlive the event loop xrpl-py runs
+        # each request in
+        return self.post(request_to_json_rpc(request), timeout=timeout)
+
+    def post(self, payload, timeout=None):
+        """Send a JSON-RPC payload, retrying and failing over on transient errors"""
+
+        for attempt in range(self.max_retries + 1):
+            url = self.url
+            try:
+                response = self.http.post(
+                    url, json=payload, timeout=timeout or self.timeout
+                )
+                error = self.get_retry_error(response)
+            except httpx.TransportError as e:
+                error = e
+
+            if error is None:
+                return json_to_response(response.json())
+            if attempt == self.max_retries:
+                break
+
+            logger.warning("XRPL request to %s failed: %r", url, error)
+            self.failover(url)
+            time.sleep(random.uniform(0, self.backoff * 2**attempt))
+
+        raise error
+
+    def get_retry_error(self, response):
+        """Error to retry the response on, None when it can be used"""
+
+        if response.status_code in RETRY_STATUS_CODES:
+            return XRPLRequestFailureException(
+                {"error": response.status_code, "error_message": response.text}
+            )
+        try:
+            result = response.json()["result"]
+        except (JSONDecodeError, KeyError):
+            raise XRPLRequestFailureException(
+                {"error": response.status_code, "error_message": response.text}
+            )
+        if result.get("error") in RETRY_ERRORS:
+            return XRPLRequestFailureException(result)
+        return None
+
+    def failover(self, url):
+        """Move on to the endpoint after `url`, unless another thread already did"""
+
+        with self.lock:
+            if self.url == url and len(self.endpoints) > 1:
+                index = self.endpoints.index(url)
+                self.url = self.endpoints[(index + 1) % len(self.endpoints)]
+                logger.warning("XRPL failing over from %s to %s", url, self.url)
+
+    def close(self):
+        self.http.close()
+
+
+def get_client():
+    """Process wide client for the servers in `XRPL_ENDPOINTS`"""
+    return _load_client(
+        tuple(settings.XRPL_ENDPOINTS),
+        settings.XRPL_TIMEOUT,
+        settings.XRPL_MAX_RETRIES,
+        settings.XRPL_RETRY_BACKOFF,
+        settings.XRPL_POOL_SIZE,
+    )
+
+
+@lru_cache(maxsize=None)
+def _load_client(endpoints, timeout, max_retries, backoff, pool_size):
+    return PooledJsonRpcClient(
+        endpoints,
+        timeout=timeout,
+        max_retries=max_retries,
+        backoff=backoff,
+        pool_size=pool_size,
+    )
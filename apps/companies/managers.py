@@ -1,17 +1,38 @@
 from django.db import models
+from django.db.models import Count, Q
 
-# from django.db.models import Count, Q
 
+class CompanyQuerySet(models.QuerySet):
+    def with_stats(self):
+        """
+        Annotate job and application counts in the same query.
 
-class CompanyManager(models.Manager):
-    def get_queryset(self):
+        Counts are distinct since the jobs and applications joins multiply rows.
+        Read them through the `total_jobs`, `active_jobs`, `assigned_jobs`,
+        `completed_jobs` and `total_applications` properties of `Company`.
+        """
+        return self.annotate(
+            job_count=Count("jobs", distinct=True),
+            active_job_count=Count(
+                "jobs", filter=Q(jobs__status="active"), distinct=True
+            ),
+            assigned_job_count=Count(
+                "jobs", filter=Q(jobs__status="assigned"), distinct=True
+            ),
+            completed_job_count=Count(
+                "jobs", filter=Q(jobs__status="completed"), distinct=True
+            ),
+            application_count=Count("jobs__applicants", distinct=True),
+        )
+
+    def with_details(self):
+        """Stats and every relation rendered by the company serializers"""
         return (
-            super().get_queryset()
-            # .annotate(
-            #     total_jobs=Count("jobs"),
-            #     active_jobs=Count("jobs", filter=Q(jobs__status="active")),
-            #     assigned_jobs=Count("jobs", filter=Q(jobs__status="assigned")),
-            #     completed_jobs=Count("jobs", filter=Q(jobs__status="completed")),
-            #     total_applications=Count("jobs__applicants"),
-            # )
+            self.with_stats()
+            .select_related("industry")
+            .prefetch_related("managers", "values")
         )
+
+
+class CompanyManager(models.Manager.from_queryset(CompanyQuerySet)):
+    pass
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.2 on 2026-10-18 16:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("companies", "0008_company_visibility"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="company",
+            index=models.Index(fields=["created_at"], name="company_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="companymanager",
+            index=models.Index(fields=["user", "created_at"], name="manager_user_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="companymanager",
+            index=models.Index(
+                fields=["company", "created_at"], name="manager_company_idx"
+            ),
+        ),
+    ]
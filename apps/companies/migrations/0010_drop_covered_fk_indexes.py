@@ -0,0 +1,35 @@
+# Generated by Django 4.2.2 on 2026-10-18 16:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("companies", "0009_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="companymanager",
+            name="company",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="managers",
+                to="companies.company",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="companymanager",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="companies_managed",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
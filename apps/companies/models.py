@@ -1,10 +1,11 @@
 from django.apps import apps
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
 from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 
 from apps.common import models as base_models
+from apps.common.cache import invalidate_tags
 from apps.common.models import HowYouFoundUs
 from apps.users.models import phone_regex
 
@@ -62,26 +63,40 @@ class Company(base_models.BaseModel):
 
     class Meta:
         ordering = ("created_at",)
+        indexes = [models.Index(fields=["created_at"], name="company_created_idx")]
+
+    # the counts are annotated by `Company.objects.with_stats()`, a COUNT query
+    # per property is only the fallback for instances loaded without it
 
     @property
     def total_applications(self) -> int:
+        if hasattr(self, "application_count"):
+            return self.application_count
         applications = apps.get_model("jobs.Application")
         return applications.objects.filter(job__company=self).count()
 
     @property
     def active_jobs(self) -> int:
+        if hasattr(self, "active_job_count"):
+            return self.active_job_count
         return self.jobs.filter(status="active").count()
 
     @property
     def total_jobs(self) -> int:
+        if hasattr(self, "job_count"):
+            return self.job_count
         return self.jobs.count()
 
     @property
     def assigned_jobs(self) -> int:
+        if hasattr(self, "assigned_job_count"):
+            return self.assigned_job_count
         return self.jobs.filter(status="assigned").count()
 
     @property
     def completed_jobs(self) -> int:
+        if hasattr(self, "completed_job_count"):
+            return self.completed_job_count
         return self.jobs.filter(status="completed").count()
 
     def __str__(self):
@@ -89,15 +104,20 @@ class Company(base_models.BaseModel):
 
 
 class CompanyManager(base_models.BaseModel):
+    # indexed by manager_user_idx and manager_company_idx
     user = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name="companies_managed"
+        User, on_delete=models.CASCADE, related_name="companies_managed", db_index=False
     )
     company = models.ForeignKey(
-        Company, on_delete=models.CASCADE, related_name="managers"
+        Company, on_delete=models.CASCADE, related_name="managers", db_index=False
     )
 
     class Meta:
         ordering = ("created_at",)
+        indexes = [
+            models.Index(fields=["user", "created_at"], name="manager_user_idx"),
+            models.Index(fields=["company", "created_at"], name="manager_company_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.username}::{self.company.name}"
@@ -141,3 +161,15 @@ def set_manger_role(sender, instance, created, **kwargs):
         user.role = user.Roles.MANAGER
         user.account_type = user.AccountType.COMPANY
         user.save(update_fields=["role", "account_type", "updated_at"])
+
+
+@receiver([models.signals.post_save, models.signals.post_delete], sender=CompanyValue)
+def invalidate_company_values_cache(sender, **kwargs):
+    transaction.on_commit(lambda: invalidate_tags("company-values"))
+
+
+@receiver(
+    [models.signals.post_save, models.signals.post_delete], sender=CompanyIndustry
+)
+def invalidate_company_industries_cache(sender, **kwargs):
+    transaction.on_commit(lambda: invalidate_tags("company-industries"))
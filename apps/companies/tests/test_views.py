@@ -22,6 +22,40 @@ class TestCompany:
         assert resp.status_code == status.HTTP_200_OK
         assert len(resp_data["results"]) == 3
 
+    def test_list_company_stats(
+        self,
+        api_client_auth,
+        admin,
+        company_factory,
+        job_factory,
+        application_factory,
+        capture_queries,
+    ):
+        url = reverse("api:company-list")
+        company = company_factory()
+        job = job_factory(company=company)
+        job_factory(company=company, status="assigned")
+        job_factory(company=company, status="completed")
+        application_factory.create_batch(2, job=job)
+
+        client = api_client_auth(user=admin)
+        queries = capture_queries(client.get, url)
+
+        company_factory.create_batch(5)
+        for job in job_factory.create_batch(5):
+            application_factory(job=job)
+
+        # stats are aggregated in the list query, not counted per company
+        assert len(capture_queries(client.get, url)) == len(queries)
+
+        resp = client.get(url, {"page_size": 1})
+        stats = resp.json()["data"]["results"][0]
+        assert stats["total_jobs"] == 3
+        assert stats["active_jobs"] == 1
+        assert stats["assigned_jobs"] == 1
+        assert stats["completed_jobs"] == 1
+        assert stats["total_applications"] == 2
+
     def test_create_company(self, api_client_auth, user):
         url = reverse("api:company-list")
         client = api_client_auth(user=user)
@@ -1,13 +1,11 @@
-import logging
-
-from django.conf import settings
 from django.db.models import Q
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.permissions import AllowAny
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 
+from apps.common.cache import CachedListMixin
 from apps.common.permissions import IsAdmin, IsCompanyOwner
-from apps.common.xrp import get_account, send_xrp
+from apps.extras.wallets import claim_wallet
 
 from .models import Company, CompanyIndustry, CompanyManager, CompanyValue
 from .serializers import (
@@ -21,8 +19,9 @@ from .serializers import (
 
 class CompanyView(ModelViewSet):
     queryset = (
-        Company.objects.select_related("user")
-        .prefetch_related("managers")
+        Company.objects.with_stats()
+        .select_related("user", "industry")
+        .prefetch_related("managers", "values")
         .order_by("created_at")
     )
     serializer_class = CompanySerializer
@@ -52,20 +51,10 @@ class CompanyView(ModelViewSet):
         return super().get_permissions()
 
     def perform_create(self, serializer):
-        # create xrp account
-        wallet = get_account("")
+        # pre-funded xrp account from the pool
+        wallet = claim_wallet()
         serializer.save(xrp_seed=wallet.seed, xrp_address=wallet.address)
 
-        try:
-            # fund account
-            if settings.XRP_LIVE:
-                xrp_main_seed = settings.XRP_MAIN_SEED
-                xrp_amount = 10
-                acc_to_fund = wallet.address
-                send_xrp(xrp_main_seed, xrp_amount, acc_to_fund)
-        except Exception as e:
-            logging.warning(e)
-
 
 class CompanyManagerView(ModelViewSet):
     queryset = CompanyManager.objects.select_related("user", "company").order_by(
@@ -87,13 +76,15 @@ class CompanyManagerView(ModelViewSet):
         return self.queryset.filter(Q(user=user) | Q(company__user=user))
 
 
-class CompanyValueView(ReadOnlyModelViewSet):
+class CompanyValueView(CachedListMixin, ReadOnlyModelViewSet):
     queryset = CompanyValue.objects.all().order_by("created_at")
     serializer_class = CompanyValueSerializer
     permission_classes = [AllowAny]
+    cache_tags = ("company-values",)
 
 
-class CompanyIndustryView(ReadOnlyModelViewSet):
+class CompanyIndustryView(CachedListMixin, ReadOnlyModelViewSet):
     queryset = CompanyIndustry.objects.all().order_by("created_at")
     serializer_class = CompanyIndustrySerializer
     permission_classes = [AllowAny]
+    cache_tags = ("company-industries",)
@@ -1,8 +1,13 @@
 import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from pytest_factoryboy import register
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from apps.common.fake_rippled import FakeRippled
 from apps.common.utils import OTPUtils
+from apps.common.xrp_client import get_client
 from apps.companies.tests.factories import CompanyFactory, CompanyManagerFactory
 from apps.freelancers.tests.factories import (
     FreelancerFactory,
@@ -44,6 +49,25 @@ def media_storage(settings, tmpdir):
     settings.MEDIA_ROOT = tmpdir.strpath
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # the database is rolled back between tests, cached responses must go too
+    cache.clear()
+
+
+@pytest.fixture
+def fake_rippled(settings, monkeypatch):
+    """Local rippled the XRPL client talks to, see `apps.common.fake_rippled`"""
+    with FakeRippled() as server:
+        settings.XRPL_ENDPOINTS = [server.url]
+        # ledgers close on demand, no need to wait for one before polling
+        monkeypatch.setattr(
+            "xrpl.asyncio.transaction.reliable_submission._LEDGER_CLOSE_TIME", 0
+        )
+        yield server
+        get_client().close()
+
+
 @pytest.fixture()
 def test_email():
     return "test@email.com"
@@ -117,3 +141,17 @@ def api_client_auth(api_client):
         return api_client
 
     return make_auth
+
+
+@pytest.fixture
+def capture_queries():
+    """
+    SQL of the database queries run by a callable
+    """
+
+    def capture(func, *args, **kwargs):
+        with CaptureQueriesContext(connection) as context:
+            func(*args, **kwargs)
+        return [query["sql"] for query in context.captured_queries]
+
+    return capture
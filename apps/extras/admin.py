@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Country, Currency, PaymentService
+from .models import Country, Currency, PaymentService, ProvisionedWallet
 
 # Register your models here.
 
@@ -21,3 +21,11 @@ class CountryAdmin(admin.ModelAdmin):
 class PaymentServiceAdmin(admin.ModelAdmin):
     search_fields = ["id", "name", "url"]
     list_display = ["name", "url"]
+
+
+@admin.register(ProvisionedWallet)
+class ProvisionedWalletAdmin(admin.ModelAdmin):
+    search_fields = ["address"]
+    list_display = ["address", "status", "created_at"]
+    list_filter = ["status"]
+    exclude = ["seed"]
@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from xrpl.asyncio.transaction import reliable_submission
+
+from apps.common.fake_rippled import FakeRippled
+from apps.common.xrp import PaymentQueue, send_xrp
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the XRP payment throughput of one account against a local fake "
+        "ledger, one payment at a time versus a PaymentQueue"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("-p", "--payments", type=int, default=50)
+        parser.add_argument(
+            "--ledger-close",
+            type=float,
+            default=1.0,
+            help="Seconds waited before checking again for a validated payment",
+        )
+        parser.add_argument(
+            "--latency", type=float, default=0.01, help="Seconds added per request"
+        )
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write("running...")
+
+        count = kwargs["payments"]
+        ledger_close = kwargs["ledger_close"]
+        default_close = reliable_submission._LEDGER_CLOSE_TIME
+        reliable_submission._LEDGER_CLOSE_TIME = ledger_close
+        try:
+            with FakeRippled(delay=kwargs["latency"]) as server, override_settings(
+                XRPL_ENDPOINTS=[server.url], XRP_PAYMENT_POLL_INTERVAL=ledger_close
+            ):
+                self.benchmark("sequential", server, count, self.send_sequential)
+                self.benchmark("queue", server, count, self.send_queue)
+        finally:
+            reliable_submission._LEDGER_CLOSE_TIME = default_close
+
+    def benchmark(self, name, server, count, send):
+        ledger = server.ledger
+        sender = ledger.wallet(xrp=count * 10)
+        receiver = ledger.wallet()
+        requests = server.requests
+
+        start = time.perf_counter()
+        send(sender.seed, receiver.address, count)
+        seconds = time.perf_counter() - start
+
+        self.stdout.write(
+            f"{name}: payments={count} requests={server.requests - requests} "
+            f"seconds={seconds:.3f} throughput={count / seconds:.1f}/s"
+        )
+
+    def send_sequential(self, seed, destination, count):
+        for _ in range(count):
+            send_xrp(seed, 1, destination)
+
+    def send_queue(self, seed, destination, count):
+        queue = PaymentQueue(seed)
+        for _ in range(count):
+            queue.add(1, destination)
+        queue.send()
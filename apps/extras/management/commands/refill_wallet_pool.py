@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.extras.wallets import refill_pool
+
+
+class Command(BaseCommand):
+    help = "Provision funded wallets until the pool holds WALLET_POOL_SIZE of them"
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write("running...")
+
+        funded = refill_pool(batch_size=settings.WALLET_POOL_SIZE)
+
+        self.stdout.write(self.style.SUCCESS(f"Added {funded} wallets"))
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.2 on 2026-10-18 16:55
+
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("extras", "0003_paymentservice_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProvisionedWallet",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="created_at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="updated at"),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                ("address", models.CharField(max_length=255, unique=True)),
+                ("seed", models.CharField(max_length=255)),
+            ],
+            options={
+                "ordering": ("created_at",),
+            },
+        ),
+    ]
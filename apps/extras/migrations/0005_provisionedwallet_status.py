@@ -0,0 +1,31 @@
+# Generated by Django 4.2.2 on 2026-10-18 17:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("extras", "0004_provisionedwallet"),
+    ]
+
+    operations = [
+        # wallets already in the pool were funded before they were stored
+        migrations.AddField(
+            model_name="provisionedwallet",
+            name="status",
+            field=models.CharField(
+                choices=[("pending", "Pending"), ("funded", "Funded")],
+                default="funded",
+                max_length=10,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="provisionedwallet",
+            name="status",
+            field=models.CharField(
+                choices=[("pending", "Pending"), ("funded", "Funded")],
+                default="pending",
+                max_length=10,
+            ),
+        ),
+    ]
@@ -1,8 +1,10 @@
-from django.db import models
+from django.db import models, transaction
+from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 from rest_framework.exceptions import ValidationError
 
 from apps.common import models as base_models
+from apps.common.cache import invalidate_tags
 
 
 # Validator function to check if string is interger
@@ -49,3 +51,40 @@ class PaymentService(base_models.BaseModel):
 
     def __str__(self):
         return self.name
+
+
+class ProvisionedWallet(base_models.BaseModel):
+    """
+    XRP wallet waiting in the pool for a new company or freelancer.
+
+    Wallets are stored pending before any funding goes out and only claimed once
+    funded. Claimed wallets are removed from the pool, see apps.extras.wallets.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        FUNDED = "funded", _("Funded")
+
+    address = models.CharField(max_length=255, unique=True)
+    seed = models.CharField(max_length=255)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDING
+    )
+
+    class Meta:
+        ordering = ("created_at",)
+
+    def __str__(self):
+        return self.address
+
+
+# SIGNALS
+# ---------------------------------------------------
+@receiver([models.signals.post_save, models.signals.post_delete], sender=Country)
+def invalidate_countries_cache(sender, **kwargs):
+    transaction.on_commit(lambda: invalidate_tags("countries"))
+
+
+@receiver([models.signals.post_save, models.signals.post_delete], sender=Currency)
+def invalidate_currencies_cache(sender, **kwargs):
+    transaction.on_commit(lambda: invalidate_tags("currencies"))
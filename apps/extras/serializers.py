@@ -3,7 +3,7 @@ import logging
 from rest_framework import serializers
 from xrpl.utils import drops_to_xrp
 
-from apps.common.xrp import get_acc_info, send_xrp
+from apps.common.xrp import PaymentQueue, get_acc_info, get_balances
 from apps.companies.models import Company
 from apps.freelancers.models import Freelancer
 
@@ -49,6 +49,32 @@ class XRPBalanceSerializer(serializers.Serializer):
             raise serializers.ValidationError({"message": e})
 
 
+class XRPBalancesSerializer(serializers.Serializer):
+    xrp_addresses = serializers.ListField(
+        child=serializers.CharField(), write_only=True, min_length=1, max_length=100
+    )
+
+    def save(self):
+        addresses = self.validated_data.get("xrp_addresses")
+        try:
+            balances = get_balances(addresses)
+        except Exception as e:
+            raise serializers.ValidationError({"message": e})
+
+        return [
+            {
+                "account": address,
+                "xrp_balance": drops_to_xrp(balances[address]["Balance"])
+                if address in balances
+                else None,
+                "ledger_index": balances[address]["ledger_index"]
+                if address in balances
+                else None,
+            }
+            for address in addresses
+        ]
+
+
 class XRPWithdrawalSerializer(serializers.Serializer):
     xrp_address = serializers.CharField(required=True)
     xrp_amount = serializers.DecimalField(
@@ -110,14 +136,23 @@ class XRPWithdrawalSerializer(serializers.Serializer):
         if not from_seed:
             raise serializers.ValidationError({"message": "No xrp to transfer"})
 
+        # sent through a queue so concurrent withdrawals from the same account
+        # get distinct sequence numbers
+        queue = PaymentQueue(from_seed)
+        queue.add(amount, addr)
         try:
-            _ = send_xrp(from_seed, amount, addr)
+            (payment,) = queue.send()
         except Exception as e:
             logging.warning(e)
             raise serializers.ValidationError(
                 {"message": "XRP transfer failed", "error": e}
             )
 
+        if payment["result"] != "tesSUCCESS":
+            raise serializers.ValidationError(
+                {"message": "XRP transfer failed", "error": payment["error"]}
+            )
+
         return {"message": "Transfer Successful"}
 
 
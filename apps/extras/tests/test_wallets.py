@@ -0,0 +1,159 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import resolve
+from django.urls.base import reverse
+from rest_framework import status
+from xrpl.wallet import Wallet
+
+from apps.extras.models import ProvisionedWallet
+from apps.extras.wallets import (
+    FundingProvisioner,
+    LocalProvisioner,
+    claim_wallet,
+    metrics,
+    refill_pool,
+)
+from apps.freelancers.models import Freelancer
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def tasks(monkeypatch):
+    tasks = []
+    monkeypatch.setattr(
+        "apps.common.tasks.create_task",
+        lambda uri, payload=None, **kwargs: tasks.append(uri),
+    )
+    metrics.reset()
+    yield tasks
+    metrics.reset()
+
+
+def fill_pool(count):
+    wallets = [Wallet.create() for _ in range(count)]
+    ProvisionedWallet.objects.bulk_create(
+        [
+            ProvisionedWallet(
+                address=w.address, seed=w.seed, status=ProvisionedWallet.Status.FUNDED
+            )
+            for w in wallets
+        ]
+    )
+    return wallets
+
+
+class TestWalletPool:
+    def test_claim_from_pool(self, tasks, settings, django_capture_on_commit_callbacks):
+        settings.WALLET_POOL_MIN_SIZE = 1
+        wallets = fill_pool(2)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            wallet = claim_wallet()
+
+        assert (wallet.address, wallet.seed) == (wallets[0].address, wallets[0].seed)
+        assert list(ProvisionedWallet.objects.values_list("address", flat=True)) == [
+            wallets[1].address
+        ]
+        assert metrics.claimed == 1
+        assert tasks == []
+
+    def test_empty_pool_provisions_and_refills_once(
+        self, tasks, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            first = claim_wallet()
+            second = claim_wallet()
+
+        assert first.address != second.address
+        assert metrics.misses == 2
+        assert tasks == ["refill-wallet-pool"]
+
+    def test_refill_task(
+        self, api_client, tasks, settings, django_capture_on_commit_callbacks
+    ):
+        settings.WALLET_POOL_SIZE = 3
+        settings.WALLET_POOL_REFILL_BATCH_SIZE = 2
+        url = reverse("api:misc-refill-wallet-pool")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            resp = api_client.post(url)
+        assert resp.status_code == status.HTTP_200_OK
+        assert resolve(url).func._non_atomic_requests == {"default"}
+        assert ProvisionedWallet.objects.filter(status="funded").count() == 2
+        assert tasks == ["refill-wallet-pool"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(url)
+        assert ProvisionedWallet.objects.count() == 3
+        assert tasks == ["refill-wallet-pool"]
+        assert refill_pool() == 0
+
+    def test_funding_provisioner(self, fake_rippled, settings):
+        ledger = fake_rippled.ledger
+        settings.XRP_MAIN_SEED = ledger.wallet(xrp=1000).seed
+
+        # funded by an earlier refill that stopped before recording it
+        funded = ledger.wallet(xrp=20)
+        wallets = [Wallet.create(), Wallet.create(), funded]
+
+        addresses = FundingProvisioner().fund(wallets)
+
+        assert addresses == {w.address for w in wallets}
+        assert [ledger.balance(w.address) for w in wallets] == [
+            10_000_000,
+            10_000_000,
+            20_000_000,
+        ]
+
+    def test_failed_funding_keeps_pending_wallets(self, tasks, monkeypatch):
+        def fail(self, wallets):
+            raise ConnectionError("rippled unreachable")
+
+        fund = LocalProvisioner.fund
+        monkeypatch.setattr(LocalProvisioner, "fund", fail)
+        with pytest.raises(ConnectionError):
+            refill_pool(batch_size=2)
+
+        # the seeds are kept, but the wallets can't be claimed before funding
+        monkeypatch.setattr(LocalProvisioner, "fund", fund)
+        pending = dict(ProvisionedWallet.objects.values_list("address", "status"))
+        assert list(pending.values()) == ["pending"] * 2
+        assert claim_wallet().address not in pending
+        assert metrics.misses == 1
+
+        # the oldest pending wallets are funded first
+        assert refill_pool(batch_size=2) == 2
+        funded = ProvisionedWallet.objects.filter(address__in=pending)
+        assert set(funded.values_list("status", flat=True)) == {"funded"}
+
+    def test_refill_command(self, tasks, settings):
+        settings.WALLET_POOL_SIZE = 3
+        fill_pool(1)
+
+        call_command("refill_wallet_pool", stdout=StringIO())
+
+        assert ProvisionedWallet.objects.filter(status="funded").count() == 3
+
+    def test_sign_up_claims_pooled_wallet(self, api_client_auth, user, tasks):
+        wallet = fill_pool(1)[0]
+        client = api_client_auth(user=user)
+
+        resp = client.post(reverse("api:freelancers-list"), {"user": str(user.id)})
+
+        assert resp.status_code == status.HTTP_201_CREATED
+        assert Freelancer.objects.get(user=user).xrp_address == wallet.address
+        assert not ProvisionedWallet.objects.exists()
+
+    def test_pool_metrics(self, api_client_auth, admin, tasks, settings):
+        fill_pool(2)
+        claim_wallet()
+
+        resp = api_client_auth(user=admin).get(reverse("api:misc-wallet-pool"))
+        data = resp.json()["data"]
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert (data["available"], data["claimed"], data["misses"]) == (1, 1, 0)
+        assert data["size"] == settings.WALLET_POOL_SIZE
@@ -1,3 +1,4 @@
+from django.db import transaction
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
@@ -6,8 +7,10 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
+from apps.common import cache
 from apps.common.pagination import DefaultPagination
-from apps.common.permissions import IsAdmin, IsCron
+from apps.common.permissions import IsAdmin, IsCron, IsTask
+from apps.common.views import NonAtomicActionsMixin
 
 from .models import Country, Currency, PaymentService
 from .serializers import (
@@ -16,6 +19,7 @@ from .serializers import (
     CurrencySerializer,
     PaymentServiceSerializer,
     XRPBalanceSerializer,
+    XRPBalancesSerializer,
     XRPWithdrawalSerializer,
 )
 
@@ -44,9 +48,20 @@ response_schema = openapi.Schema(
     type=openapi.TYPE_OBJECT,
     properties={"message": openapi.Schema(type=openapi.TYPE_STRING)},
 )
+balances_schema = openapi.Schema(
+    type=openapi.TYPE_ARRAY,
+    items=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            "account": openapi.Schema(type=openapi.TYPE_STRING),
+            "xrp_balance": openapi.Schema(type=openapi.TYPE_STRING),
+            "ledger_index": openapi.Schema(type=openapi.TYPE_INTEGER),
+        },
+    ),
+)
 
 
-class MiscellaneousViewSet(ViewSet, DefaultPagination):
+class MiscellaneousViewSet(NonAtomicActionsMixin, ViewSet, DefaultPagination):
     # Countries
     # --------------------------------------------------------------------------
     @swagger_auto_schema(method="GET", responses={200: CountrySerializer})
@@ -54,9 +69,15 @@ class MiscellaneousViewSet(ViewSet, DefaultPagination):
     def countries(self, request):
         # countries = [{"name": c[1], "code": c[0]} for c in COUNTRIES]
 
-        qs = Country.objects.all()
-        serializer = CountrySerializer(qs, many=True)
-        return Response(serializer.data)
+        def get_data():
+            qs = Country.objects.all()
+            return CountrySerializer(qs, many=True).data
+
+        def get_response():
+            data = cache.get_or_set("countries", get_data, tags=("countries",))
+            return Response(data)
+
+        return cache.conditional_response(request, Country, get_response)
 
         # page = self.paginate_queryset(qs, request)
         # serializer = CountryListSerializer(page, many=True)
@@ -90,18 +111,25 @@ class MiscellaneousViewSet(ViewSet, DefaultPagination):
         serializer = CurrencyQueryParamSerializer(data=request.query_params)
         serializer.is_valid()
         # currencies = [{"name": c[1], "code": c[0]} for c in Currency.choices]
-        qs = Currency.objects.all()
         # filters
         code = serializer.validated_data.get("code")
         _type = serializer.validated_data.get("_type")
 
-        if code:
-            qs = qs.filter(code=code)
-        if _type:
-            qs = qs.filter(_type=_type)
+        def get_data():
+            qs = Currency.objects.all()
+            if code:
+                qs = qs.filter(code=code)
+            if _type:
+                qs = qs.filter(_type=_type)
+            return CurrencySerializer(qs, many=True).data
+
+        key = f"currencies:{code or ''}:{_type or ''}"
+
+        def get_response():
+            data = cache.get_or_set(key, get_data, tags=("currencies",))
+            return Response(data)
 
-        serializer = CurrencySerializer(qs, many=True)
-        return Response(serializer.data)
+        return cache.conditional_response(request, Currency, get_response)
 
     @swagger_auto_schema(method="POST", responses={200: CurrencySerializer})
     @action(
@@ -137,6 +165,27 @@ class MiscellaneousViewSet(ViewSet, DefaultPagination):
 
         return Response(res, status=status.HTTP_200_OK)
 
+    # Get Ripple balances of many accounts
+    # -----------------------------------------------------------------------------------
+    @swagger_auto_schema(
+        method="POST",
+        request_body=XRPBalancesSerializer,
+        responses={200: balances_schema},
+    )
+    @action(
+        detail=False,
+        permission_classes=[AllowAny],
+        methods=["POST"],
+        url_path="get-balances",
+    )
+    def get_balances(self, request, *args, **kwargs):
+        """Balances in the same order as `xrp_addresses`, null for unknown accounts"""
+        serializer = XRPBalancesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        res = serializer.save()
+
+        return Response(res, status=status.HTTP_200_OK)
+
     # Withdraw XRP
     # ---------------------------------------------
     @swagger_auto_schema(
@@ -186,3 +235,35 @@ class MiscellaneousViewSet(ViewSet, DefaultPagination):
         update_rates()
 
         return Response("OK")
+
+    # Wallet pool
+    # ----------------------------------------------------------------------------------
+    @action(
+        methods=["GET"],
+        detail=False,
+        permission_classes=[IsAdmin],
+        url_path="wallet-pool",
+    )
+    def wallet_pool(self, request):
+        """Depth of the funded wallet pool and the claims served by this instance"""
+        from .wallets import metrics
+
+        return Response(metrics.snapshot())
+
+    @action(
+        methods=["POST"],
+        detail=False,
+        permission_classes=[IsTask],
+        url_path="refill-wallet-pool",
+    )
+    @transaction.non_atomic_requests
+    def refill_wallet_pool(self, request):
+        """
+        Endpoint used in conjuction with cloud task to refill the wallet pool.
+        Outside of the request transaction, new wallets are committed before funding.
+        """
+        from .wallets import refill_pool
+
+        refill_pool()
+
+        return Response("OK")
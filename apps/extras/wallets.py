@@ -0,0 +1,209 @@
+"""
+Pool of funded XRP wallets for new companies and freelancers.
+
+Creating a wallet takes a funding payment from the main account, or many seconds
+of faucet polling off mainnet, so it is done ahead of time by a cloud task that
+keeps `WALLET_POOL_SIZE` wallets in the pool. Sign-up claims a funded one with a
+single row lock. When the pool is empty a wallet is funded on the spot, like
+before the pool existed.
+
+The provisioner configured in `WALLET_PROVISIONER` funds wallets with
+`fund(wallets)`, returning the addresses that got funded. New wallets are
+committed as pending rows before that, so a refill that fails half way never
+loses the seed of a funded wallet, the next refill picks the rows up again.
+"""
+import logging
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import ValidationError
+from xrpl.wallet import Wallet, generate_faucet_wallet
+
+from apps.common.xrp import PaymentQueue, get_balances
+from apps.common.xrp_client import get_client
+
+from .models import ProvisionedWallet
+
+logger = logging.getLogger(__name__)
+
+REFILL_LOCK_KEY = "wallet-pool-refill"
+
+
+class FaucetProvisioner:
+    """Wallets funded by the faucet of the test network, devnet or testnet"""
+
+    def fund(self, wallets):
+        client = get_client()
+        funded = set()
+        for wallet in wallets:
+            try:
+                generate_faucet_wallet(client, wallet)
+            except Exception as e:
+                logger.warning("Faucet funding of %s failed: %s", wallet.address, e)
+                continue
+            funded.add(wallet.address)
+        return funded
+
+
+class FundingProvisioner:
+    """
+    Wallets funded with `XRP_WALLET_FUNDING` XRP from the main account.
+
+    The funding payments are sent as one `PaymentQueue`. Wallets already on the
+    ledger, funded by a run that stopped before recording it, aren't paid again.
+    """
+
+    def fund(self, wallets):
+        addresses = [wallet.address for wallet in wallets]
+        funded = set(get_balances(addresses))
+        queue = PaymentQueue(settings.XRP_MAIN_SEED)
+        for address in addresses:
+            if address not in funded:
+                queue.add(settings.XRP_WALLET_FUNDING, address)
+
+        payments = queue.send()
+        failed = [p for p in payments if p["result"] != "tesSUCCESS"]
+        if failed:
+            logger.warning(
+                "Funding of %s wallets failed: %s", len(failed), failed[0]["error"]
+            )
+        return funded | {
+            p["destination"] for p in payments if p["result"] == "tesSUCCESS"
+        }
+
+
+class LocalProvisioner:
+    """Unfunded key pairs without any network call, used in tests"""
+
+    def fund(self, wallets):
+        return {wallet.address for wallet in wallets}
+
+
+def get_provisioner():
+    """Instance of the provisioner configured in `WALLET_PROVISIONER`"""
+    return _load_provisioner(settings.WALLET_PROVISIONER)
+
+
+@lru_cache(maxsize=None)
+def _load_provisioner(path):
+    return import_string(path)()
+
+
+class WalletPoolMetrics:
+    """Running totals of the wallets claimed and provisioned by this process"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.claimed = 0
+        # claims the pool couldn't serve, provisioned during the request
+        self.misses = 0
+        self.provisioned = 0
+        self.refills = 0
+
+    def snapshot(self):
+        funded = ProvisionedWallet.Status.FUNDED
+        return {
+            "available": ProvisionedWallet.objects.filter(status=funded).count(),
+            "pending": ProvisionedWallet.objects.exclude(status=funded).count(),
+            "min_size": settings.WALLET_POOL_MIN_SIZE,
+            "size": settings.WALLET_POOL_SIZE,
+            "claimed": self.claimed,
+            "misses": self.misses,
+            "provisioned": self.provisioned,
+            "refills": self.refills,
+        }
+
+
+metrics = WalletPoolMetrics()
+
+
+def claim_wallet():
+    """
+    Funded wallet for a new account, taken from the pool.
+
+    The row is locked with SKIP LOCKED so concurrent sign-ups each get their own
+    wallet without waiting on one another, and goes back to the pool if the
+    surrounding transaction rolls back. Queues a refill once the pool runs low.
+    """
+    funded = ProvisionedWallet.objects.filter(status=ProvisionedWallet.Status.FUNDED)
+    with transaction.atomic():
+        pooled = (
+            funded.select_for_update(skip_locked=True).order_by("created_at").first()
+        )
+        if pooled:
+            pooled.delete()
+
+    if pooled:
+        metrics.claimed += 1
+        wallet = Wallet.from_seed(pooled.seed)
+    else:
+        logger.warning("Wallet pool empty, funding a wallet during the request")
+        metrics.misses += 1
+        wallet = Wallet.create()
+        if not get_provisioner().fund([wallet]):
+            raise ValidationError({"message": "Could not create an xrp account"})
+
+    if funded.count() < settings.WALLET_POOL_MIN_SIZE:
+        queue_refill()
+    return wallet
+
+
+def queue_refill():
+    """Queue a refill task, unless one was queued in the last few minutes"""
+    from apps.common.tasks import create_task
+
+    if cache.add(REFILL_LOCK_KEY, True, timeout=settings.WALLET_POOL_REFILL_TIMEOUT):
+        transaction.on_commit(lambda: create_task("refill-wallet-pool"))
+
+
+def refill_pool(batch_size=None):
+    """
+    Add up to `batch_size` wallets towards `WALLET_POOL_SIZE`, then fund pending ones.
+
+    Runs outside of a transaction so the new wallets are committed before any
+    funding goes out. Queues another refill while the pool is still short, so
+    each task stays well within the request deadline. Returns the number of
+    wallets funded.
+    """
+    batch_size = batch_size or settings.WALLET_POOL_REFILL_BATCH_SIZE
+    missing = settings.WALLET_POOL_SIZE - ProvisionedWallet.objects.count()
+    count = max(min(missing, batch_size), 0)
+
+    wallets = [Wallet.create() for _ in range(count)]
+    ProvisionedWallet.objects.bulk_create(
+        [ProvisionedWallet(address=w.address, seed=w.seed) for w in wallets]
+    )
+
+    funded = fund_pending(batch_size)
+    metrics.provisioned += funded
+    metrics.refills += 1
+    logger.info("Wallet pool refilled with %s wallets", funded)
+
+    cache.delete(REFILL_LOCK_KEY)
+    if missing > count:
+        queue_refill()
+    return funded
+
+
+def fund_pending(batch_size):
+    """Fund up to `batch_size` pending wallets, returns the number funded"""
+
+    with transaction.atomic():
+        # locked so overlapping refills don't pay for the same wallets
+        pending = list(
+            ProvisionedWallet.objects.select_for_update(skip_locked=True)
+            .filter(status=ProvisionedWallet.Status.PENDING)
+            .order_by("created_at")[:batch_size]
+        )
+        if not pending:
+            return 0
+
+        funded = get_provisioner().fund([Wallet.from_seed(w.seed) for w in pending])
+        return ProvisionedWallet.objects.filter(
+            pk__in=[w.pk for w in pending if w.address in funded]
+        ).update(status=ProvisionedWallet.Status.FUNDED)
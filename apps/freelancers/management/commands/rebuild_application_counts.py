@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.freelancers.models import Freelancer
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored application counters of every freelancer"
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write("running...")
+
+        count = Freelancer.objects.refresh_application_counts()
+
+        self.stdout.write(self.style.SUCCESS(f"Updated {count} freelancers"))
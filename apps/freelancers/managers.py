@@ -1,19 +1,65 @@
+from django.apps import apps
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
-# from django.db.models import Count, Q
-
-
-class FreelancerManager(models.Manager):
-    def get_queryset(self):
-        return (
-            super().get_queryset()
-            # .annotate(
-            #     total_applications=Count("applications"),
-            #     accepted_applications=Count(
-            #         "applications", filter=Q(applications__status="accepted")
-            #     ),
-            #     rejected_applications=Count(
-            #         "applications", filter=Q(applications__status="rejected")
-            #     ),
-            # )
+from apps.common.search import joined_names, search_document, search_enabled
+
+# fields the search document is built from, saving others doesn't refresh it
+SEARCH_FIELDS = {"fullname", "title", "bio"}
+
+
+def count_applications(**filters):
+    """Subquery counting the applications of the outer freelancer"""
+
+    application = apps.get_model("jobs.Application")
+    applications = (
+        application.objects.filter(freelancer=OuterRef("pk"), **filters)
+        .order_by()
+        .values("freelancer")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(applications), 0)
+
+
+class FreelancerQuerySet(models.QuerySet):
+    def refresh_application_counts(self):
+        """
+        Recompute the stored application counters from the applications table.
+
+        Runs as a single UPDATE so concurrent changes can't leave the counters
+        half updated, and any drift is corrected on the next refresh.
+        """
+        return self.update(
+            total_applications=count_applications(),
+            accepted_applications=count_applications(status="accepted"),
+            rejected_applications=count_applications(status="rejected"),
         )
+
+    def update_search_vector(self):
+        """
+        Rebuild the full text search document of the freelancers in a single UPDATE.
+
+        Name and title rank highest, then skills, then the bio.
+        """
+        if not search_enabled():
+            return 0
+
+        return self.update(
+            search_vector=search_document(
+                ("fullname", "A"),
+                ("title", "A"),
+                (
+                    joined_names(
+                        self.model.skills.through, "freelancer", "skill__name"
+                    ),
+                    "B",
+                ),
+                ("bio", "C"),
+            )
+        )
+
+
+class FreelancerManager(models.Manager.from_queryset(FreelancerQuerySet)):
+    pass
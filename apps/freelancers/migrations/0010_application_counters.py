@@ -0,0 +1,53 @@
+# Generated by Django 4.2.2 on 2026-10-18 16:04
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_applications(Application, **filters):
+    applications = (
+        Application.objects.filter(freelancer=OuterRef("pk"), **filters)
+        .order_by()
+        .values("freelancer")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(applications), 0)
+
+
+def backfill_application_counts(apps, schema_editor):
+    Freelancer = apps.get_model("freelancers", "Freelancer")
+    Application = apps.get_model("jobs", "Application")
+
+    Freelancer.objects.update(
+        total_applications=count_applications(Application),
+        accepted_applications=count_applications(Application, status="accepted"),
+        rejected_applications=count_applications(Application, status="rejected"),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("freelancers", "0009_alter_service_price_type"),
+        ("jobs", "0012_alter_job_title"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="freelancer",
+            name="accepted_applications",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="freelancer",
+            name="rejected_applications",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="freelancer",
+            name="total_applications",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_application_counts, migrations.RunPython.noop),
+    ]
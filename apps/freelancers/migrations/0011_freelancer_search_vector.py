@@ -0,0 +1,62 @@
+# Generated by Django 4.2.2 on 2026-10-18 16:20
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+
+def weighted(expression, weight):
+    return SearchVector(
+        Coalesce(expression, Value(""), output_field=TextField()),
+        weight=weight,
+        config=settings.SEARCH_CONFIG,
+    )
+
+
+# inlined so later changes to the model code can't alter this migration
+def backfill_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    Freelancer = apps.get_model("freelancers", "Freelancer")
+    skills = (
+        Freelancer.skills.through.objects.filter(freelancer=OuterRef("pk"))
+        .order_by()
+        .values("freelancer")
+        .annotate(names=StringAgg("skill__name", " "))
+        .values("names")
+    )
+    Freelancer.objects.using(schema_editor.connection.alias).update(
+        search_vector=weighted("fullname", "A")
+        + weighted("title", "A")
+        + weighted(Subquery(skills), "B")
+        + weighted("bio", "C")
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("freelancers", "0010_application_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="freelancer",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="freelancer",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="freelancers_search__b3b36e_gin"
+            ),
+        ),
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 4.2.2 on 2026-10-18 16:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("freelancers", "0011_freelancer_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="freelancer",
+            index=models.Index(fields=["created_at"], name="freelancer_created_idx"),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import RegexValidator
 from django.db import models
 from django.dispatch import receiver
@@ -7,7 +9,7 @@ from django.utils.translation import gettext_lazy as _
 from apps.common import models as base_models
 from apps.common.models import Currency, HowYouFoundUs, PriceType
 
-from .managers import FreelancerManager
+from .managers import SEARCH_FIELDS, FreelancerManager
 
 # Create your models here.
 User = get_user_model()
@@ -45,23 +47,21 @@ class Freelancer(base_models.BaseModel):
         max_length=100, choices=HowYouFoundUs.choices, default=HowYouFoundUs.OTHER
     )
     visibility = models.BooleanField(default=True)
+    # counters kept up to date by the application signals in apps/jobs/models.py
+    total_applications = models.PositiveIntegerField(default=0, editable=False)
+    accepted_applications = models.PositiveIntegerField(default=0, editable=False)
+    rejected_applications = models.PositiveIntegerField(default=0, editable=False)
+    # full text search document, see FreelancerQuerySet.update_search_vector
+    search_vector = SearchVectorField(null=True, editable=False)
 
     objects = FreelancerManager()
 
     class Meta:
         ordering = ("created_at",)
-
-    @property
-    def total_applications(self):
-        return self.applications.count()
-
-    @property
-    def accepted_applications(self):
-        return self.applications.filter(status="accepted").count()
-
-    @property
-    def rejected_applications(self):
-        return self.applications.filter(status="rejected").count()
+        indexes = [
+            GinIndex(fields=["search_vector"]),
+            models.Index(fields=["created_at"], name="freelancer_created_idx"),
+        ]
 
     def __str__(self):
         return self.user.username or self.user.email
@@ -142,3 +142,26 @@ def update_account_type(sender, instance, created, **kwargs):
         user = instance.user
         user.account_type = user.AccountType.FREELANCER
         user.save(update_fields=["account_type", "updated_at"])
+
+
+@receiver(models.signals.post_save, sender=Freelancer)
+def update_search_vector(sender, instance, created, update_fields=None, **kwargs):
+    if created or not update_fields or SEARCH_FIELDS.intersection(update_fields):
+        Freelancer.objects.filter(pk=instance.pk).update_search_vector()
+
+
+@receiver(models.signals.m2m_changed, sender=Freelancer.skills.through)
+def update_skills_search_vector(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        Freelancer.objects.filter(pk=instance.pk).update_search_vector()
+    elif pk_set:
+        Freelancer.objects.filter(pk__in=pk_set).update_search_vector()
+
+
+@receiver(models.signals.post_save, sender="users.Skill")
+def update_skill_freelancers_search_vector(sender, instance, created, **kwargs):
+    if not created:
+        Freelancer.objects.filter(skills=instance).update_search_vector()
@@ -1,8 +1,13 @@
+from io import StringIO
+
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.urls.base import reverse
 from rest_framework import status
 
+from apps.freelancers.models import Freelancer
+
 User = get_user_model()
 
 pytestmark = pytest.mark.django_db
@@ -61,6 +66,61 @@ class TestFreelancer:
         assert resp.status_code == status.HTTP_200_OK
         assert resp_data["how_you_found_us"] == freelancer.how_you_found_us
 
+    def test_application_counts(self, freelancer_factory, application_factory):
+        freelancer = freelancer_factory()
+        accepted, rejected, pending = application_factory.create_batch(
+            3, freelancer=freelancer
+        )
+        accepted.status = accepted.Status.ACCEPTED
+        accepted.save()
+        rejected.status = rejected.Status.REJECTED
+        rejected.save(update_fields=["status", "updated_at"])
+
+        freelancer.refresh_from_db()
+        assert freelancer.total_applications == 3
+        assert freelancer.accepted_applications == 1
+        assert freelancer.rejected_applications == 1
+
+        pending.delete()
+        accepted.delete()
+        freelancer.refresh_from_db()
+        assert freelancer.total_applications == 1
+        assert freelancer.accepted_applications == 0
+
+    def test_rebuild_application_counts(self, freelancer_factory, application_factory):
+        freelancer = freelancer_factory()
+        application_factory.create_batch(2, freelancer=freelancer)
+        Freelancer.objects.update(total_applications=0)
+
+        call_command("rebuild_application_counts", stdout=StringIO())
+
+        freelancer.refresh_from_db()
+        assert freelancer.total_applications == 2
+
+
+class TestFreelancerSearch:
+    def test_search(self, api_client_auth, admin, freelancer_factory, skill_factory):
+        url = reverse("api:freelancers-list")
+        client = api_client_auth(user=admin)
+        django = skill_factory(name="Django")
+        match = freelancer_factory(fullname="Ama Mensah", title="Developer")
+        match.skills.add(django)
+        freelancer_factory(fullname="Kofi Boateng", bio="Some django side projects")
+        freelancer_factory(fullname="Yaw Owusu")
+
+        resp = client.get(url, {"search": "django"})
+        names = [f["fullname"] for f in resp.json()["data"]["results"]]
+        assert names == ["Ama Mensah", "Kofi Boateng"]
+
+        match.skills.clear()
+        resp = client.get(url, {"search": "django"})
+        names = [f["fullname"] for f in resp.json()["data"]["results"]]
+        assert names == ["Kofi Boateng"]
+
+        match.save(update_fields=["gender"])
+        resp = client.get(url, {"search": "ama"})
+        assert resp.json()["data"]["count"] == 1
+
 
 class TestWorkExpperience:
     def test_list_experiences(
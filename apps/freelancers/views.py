@@ -1,11 +1,8 @@
-import logging
-
-from django.conf import settings
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.viewsets import ModelViewSet
 
 from apps.common.permissions import IsAdmin, IsOwner
-from apps.common.xrp import get_account, send_xrp
+from apps.extras.wallets import claim_wallet
 
 from .models import Freelancer, PortfolioItem, Service, WorkExperience
 from .serializers import (
@@ -24,12 +21,16 @@ class FreelancerView(ModelViewSet):
     queryset = (
         Freelancer.objects.select_related("user")
         .prefetch_related(
-            "applications", "work_experiences", "portfolio_item", "services"
+            "skills",
+            "work_experiences",
+            "portfolio_item__skills",
+            "services__skills",
         )
         .order_by("created_at")
     )
     serializer_class = FreelancerSerializer
     search_fields = ("fullname", "title", "bio", "skills__name")
+    search_vector_field = "search_vector"
     filterset_fields = ("user", "gender")
     parser_classes = (JSONParser, FormParser, MultiPartParser)
 
@@ -56,20 +57,10 @@ class FreelancerView(ModelViewSet):
         return super().get_permissions()
 
     def perform_create(self, serializer):
-        # create xrp account
-        wallet = get_account("")
+        # pre-funded xrp account from the pool
+        wallet = claim_wallet()
         serializer.save(xrp_seed=wallet.seed, xrp_address=wallet.address)
 
-        try:
-            # fund account
-            if settings.XRP_LIVE:
-                xrp_main_seed = settings.XRP_MAIN_SEED
-                xrp_amount = 10
-                acc_to_fund = wallet.address
-                send_xrp(xrp_main_seed, xrp_amount, acc_to_fund)
-        except Exception as e:
-            logging.warning(e)
-
 
 class WorkExperienceView(ModelViewSet):
     queryset = WorkExperience.objects.all()
@@ -98,7 +89,9 @@ class WorkExperienceView(ModelViewSet):
 
 
 class PortfolioItemView(ModelViewSet):
-    queryset = PortfolioItem.objects.all()
+    queryset = PortfolioItem.objects.select_related(
+        "freelancer", "category"
+    ).prefetch_related("skills")
     serializer_class = PortfolioItemSerializer
     filterset_fields = ("user", "freelancer")
     parser_classes = (FormParser, MultiPartParser, JSONParser)
@@ -131,7 +124,9 @@ class PortfolioItemView(ModelViewSet):
 
 
 class ServiceView(ModelViewSet):
-    queryset = Service.objects.all()
+    queryset = Service.objects.select_related(
+        "freelancer", "category"
+    ).prefetch_related("skills")
     serializer_class = ServiceSerializer
     filterset_fields = ("user", "freelancer")
     parser_classes = (FormParser, MultiPartParser, JSONParser)
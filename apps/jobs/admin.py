@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Application, Job, JobSubmission, Tag
+from .models import Application, EscrowDrift, EscrowTransaction, Job, JobSubmission, Tag
 
 
 @admin.register(Job)
@@ -26,3 +26,15 @@ class JobSubmissionAdmin(admin.ModelAdmin):
         "application.freelancer.user.email",
         "application.freelancer.fullname",
     ]
+
+
+@admin.register(EscrowTransaction)
+class EscrowTransactionAdmin(admin.ModelAdmin):
+    list_display = ["job", "kind", "status", "result", "created_at"]
+    list_filter = ["kind", "status"]
+
+
+@admin.register(EscrowDrift)
+class EscrowDriftAdmin(admin.ModelAdmin):
+    list_display = ["account", "sequence", "job", "escrow_status", "ledger_status"]
+    list_filter = ["ledger_status"]
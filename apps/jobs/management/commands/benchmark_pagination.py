@@ -0,0 +1,104 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.common.pagination import DefaultPagination, KeysetPagination
+from apps.companies.models import Company
+from apps.jobs.models import Job
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the latency of fetching the first and a deep page of jobs with page "
+        "number and keyset (cursor) pagination. Use --seed to benchmark against "
+        "throwaway jobs which are rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("-p", "--page", type=int, default=500, help="Deep page")
+        parser.add_argument("-s", "--page-size", type=int, default=20)
+        parser.add_argument("-r", "--repeat", type=int, default=5)
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Throwaway jobs to create first"
+        )
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write("running...")
+
+        try:
+            with transaction.atomic():
+                if kwargs["seed"]:
+                    self.seed(kwargs["seed"])
+                self.benchmark(kwargs["page"], kwargs["page_size"], kwargs["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, count):
+        company = Company.objects.first()
+        if company is None:
+            raise CommandError("A company is required to seed jobs")
+
+        Job.objects.bulk_create(
+            [
+                Job(company=company, title=f"Benchmark job {i}", price_type="per_hour")
+                for i in range(count)
+            ],
+            batch_size=1000,
+        )
+
+    def benchmark(self, page, page_size, repeat):
+        total = Job.objects.count()
+        if total < page * page_size:
+            raise CommandError(
+                f"Page {page} needs {page * page_size} jobs, found {total}. "
+                "Lower --page or use --seed"
+            )
+
+        queryset = Job.objects.order_by("created_at", "id")
+        # cursor pointing at the last row before the deep page, as a client that
+        # scrolled there would hold
+        last = queryset[(page - 1) * page_size - 1] if page > 1 else None
+
+        for name, number in (("first", 1), ("deep", page)):
+            params = {"page": number, "page_size": page_size}
+            self.report(
+                f"page-number {name}",
+                self.measure(DefaultPagination, queryset, params, repeat),
+            )
+
+            params = {"pagination": "cursor", "page_size": page_size}
+            if number > 1:
+                params["cursor"] = KeysetPagination().make_cursor(last)
+            self.report(
+                f"keyset {name}",
+                self.measure(DefaultPagination, queryset, params, repeat),
+            )
+
+    def measure(self, pagination_class, queryset, params, repeat):
+        timings, queries = [], 0
+        for _ in range(repeat):
+            request = Request(APIRequestFactory().get("/", params))
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                pagination_class().paginate_queryset(queryset, request)
+                timings.append(time.perf_counter() - start)
+            queries = len(context.captured_queries)
+        return timings, queries
+
+    def report(self, name, result):
+        timings, queries = result
+        self.stdout.write(
+            f"{name:<18} queries={queries} "
+            f"median={statistics.median(timings) * 1000:.2f}ms "
+            f"max={max(timings) * 1000:.2f}ms"
+        )
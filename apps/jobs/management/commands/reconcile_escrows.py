@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from apps.jobs.reconcile import reconcile_escrows
+
+
+class Command(BaseCommand):
+    help = "Update the escrow state of jobs from the company accounts' ledger history"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Accounts read per batch, defaults to LEDGER_RECONCILE_BATCH_SIZE",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Read the whole available history instead of resuming",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("running...")
+
+        stats = reconcile_escrows(
+            batch_size=options["batch_size"], full=options["full"]
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Read {stats['transactions']} transactions of {stats['accounts']} "
+                f"accounts, updated {stats['updated']} jobs, "
+                f"recorded {stats['drift']} drifted escrows"
+            )
+        )
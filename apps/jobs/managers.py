@@ -0,0 +1,37 @@
+from django.apps import apps
+from django.db import models
+from django.db.models import OuterRef, Subquery
+
+from apps.common.search import joined_names, search_document, search_enabled
+
+# fields the search document is built from, saving others doesn't refresh it
+SEARCH_FIELDS = {"title", "description", "company"}
+
+
+class JobQuerySet(models.QuerySet):
+    def update_search_vector(self):
+        """
+        Rebuild the full text search document of the jobs in a single UPDATE.
+
+        Title ranks highest, then skills and company name, then the description.
+        """
+        if not search_enabled():
+            return 0
+
+        job = self.model
+        company = apps.get_model("companies.Company")
+        company_name = company.objects.filter(pk=OuterRef("company_id")).values("name")[
+            :1
+        ]
+        return self.update(
+            search_vector=search_document(
+                ("title", "A"),
+                (joined_names(job.skills.through, "job", "skill__name"), "B"),
+                (Subquery(company_name), "B"),
+                ("description", "C"),
+            )
+        )
+
+
+class JobManager(models.Manager.from_queryset(JobQuerySet)):
+    pass
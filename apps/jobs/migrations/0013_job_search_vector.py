@@ -0,0 +1,64 @@
+# Generated by Django 4.2.2 on 2026-10-18 16:20
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+
+def weighted(expression, weight):
+    return SearchVector(
+        Coalesce(expression, Value(""), output_field=TextField()),
+        weight=weight,
+        config=settings.SEARCH_CONFIG,
+    )
+
+
+# inlined so later changes to the model code can't alter this migration
+def backfill_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    Job = apps.get_model("jobs", "Job")
+    Company = apps.get_model("companies", "Company")
+    skills = (
+        Job.skills.through.objects.filter(job=OuterRef("pk"))
+        .order_by()
+        .values("job")
+        .annotate(names=StringAgg("skill__name", " "))
+        .values("names")
+    )
+    company_name = Company.objects.filter(pk=OuterRef("company_id")).values("name")
+    Job.objects.using(schema_editor.connection.alias).update(
+        search_vector=weighted("title", "A")
+        + weighted(Subquery(skills), "B")
+        + weighted(Subquery(company_name[:1]), "B")
+        + weighted("description", "C")
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0012_alter_job_title"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="jobs_job_search__684d46_gin"
+            ),
+        ),
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.2 on 2026-10-18 16:24
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+from apps.common.search import trigram_available
+
+INDEX = django.contrib.postgres.indexes.GinIndex(
+    fields=["name"], name="jobs_tag_name_trgm", opclasses=["gin_trgm_ops"]
+)
+
+
+def create_trigram_index(apps, schema_editor):
+    if trigram_available(schema_editor.connection):
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.add_index(apps.get_model("jobs", "Tag"), INDEX)
+
+
+def drop_trigram_index(apps, schema_editor):
+    schema_editor.execute(f'DROP INDEX IF EXISTS "{INDEX.name}"')
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0013_job_search_vector"),
+        ("users", "0006_name_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[migrations.AddIndex(model_name="tag", index=INDEX)],
+            database_operations=[
+                migrations.RunPython(create_trigram_index, drop_trigram_index)
+            ],
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.2 on 2026-10-18 16:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0014_tag_name_trigram_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(fields=["created_at"], name="application_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(
+                fields=["freelancer", "created_at"], name="application_freelancer_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(
+                fields=["job", "created_at"], name="application_job_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(
+                fields=["freelancer", "status"], name="application_freelancer_st_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(
+                fields=["job", "status"], name="application_job_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(fields=["created_at"], name="job_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                fields=["status", "created_at"], name="job_status_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                fields=["company", "status", "created_at"],
+                name="job_company_status_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobbookmark",
+            index=models.Index(
+                fields=["freelancer", "created_at"], name="bookmark_freelancer_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobbookmark",
+            index=models.Index(fields=["job", "created_at"], name="bookmark_job_idx"),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.2 on 2026-10-18 16:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("companies", "0010_drop_covered_fk_indexes"),
+        ("freelancers", "0012_indexes"),
+        ("jobs", "0015_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="application",
+            name="freelancer",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="applications",
+                to="freelancers.freelancer",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="application",
+            name="job",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="applicants",
+                to="jobs.job",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="job",
+            name="company",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="jobs",
+                to="companies.company",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="jobbookmark",
+            name="freelancer",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="job_bookmarks",
+                to="freelancers.freelancer",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="jobbookmark",
+            name="job",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="bookmarks",
+                to="jobs.job",
+            ),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.2 on 2026-10-18 16:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0016_drop_covered_fk_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EscrowTransaction",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="created_at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="updated at"),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("create", "Create"), ("finish", "Finish")],
+                        max_length=25,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("submitted", "Submitted"),
+                            ("validated", "Validated"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=25,
+                    ),
+                ),
+                ("amount", models.CharField(blank=True, max_length=50)),
+                ("destination", models.CharField(blank=True, max_length=255)),
+                ("account", models.CharField(blank=True, max_length=255)),
+                ("sequence", models.PositiveBigIntegerField(blank=True, null=True)),
+                (
+                    "last_ledger_sequence",
+                    models.PositiveBigIntegerField(blank=True, null=True),
+                ),
+                ("tx_hash", models.CharField(blank=True, max_length=64)),
+                ("tx_blob", models.TextField(blank=True)),
+                ("result", models.CharField(blank=True, max_length=50)),
+                ("ledger_index", models.PositiveBigIntegerField(blank=True, null=True)),
+                ("error", models.TextField(blank=True)),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="escrow_transactions",
+                        to="jobs.job",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("created_at",),
+            },
+        ),
+    ]
@@ -0,0 +1,112 @@
+# Generated by Django 4.2.2 on 2026-10-18 16:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0017_escrowtransaction"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LedgerCursor",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="created_at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="updated at"),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                ("account", models.CharField(max_length=255, unique=True)),
+                ("ledger_index", models.PositiveBigIntegerField()),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.AlterField(
+            model_name="job",
+            name="escrow_status",
+            field=models.CharField(
+                choices=[
+                    ("created", "Created"),
+                    ("redeemed", "Redeemed"),
+                    ("pending", "Pending"),
+                    ("cancelled", "Cancelled"),
+                ],
+                default="pending",
+                max_length=25,
+            ),
+        ),
+        migrations.CreateModel(
+            name="EscrowDrift",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="created_at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="updated at"),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                ("account", models.CharField(max_length=255)),
+                ("sequence", models.PositiveBigIntegerField()),
+                ("tx_hash", models.CharField(max_length=64)),
+                ("ledger_index", models.PositiveBigIntegerField()),
+                ("escrow_status", models.CharField(blank=True, max_length=25)),
+                ("escrow_sequence", models.CharField(blank=True, max_length=255)),
+                (
+                    "ledger_status",
+                    models.CharField(
+                        choices=[
+                            ("created", "Created"),
+                            ("redeemed", "Redeemed"),
+                            ("pending", "Pending"),
+                            ("cancelled", "Cancelled"),
+                        ],
+                        max_length=25,
+                    ),
+                ),
+                (
+                    "job",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="escrow_drifts",
+                        to="jobs.job",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("-created_at",),
+            },
+        ),
+    ]
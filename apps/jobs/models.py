@@ -1,10 +1,15 @@
-from django.db import models
+from django.apps import apps
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 
 from apps.common import models as base_models
+from apps.common.cache import invalidate_tags
 from apps.common.models import Currency, PriceType, RoleType
-from apps.notifications.utils import fcm_notify_bulk
+
+from .managers import SEARCH_FIELDS, JobManager
 
 # Create your models here.
 
@@ -12,6 +17,14 @@ from apps.notifications.utils import fcm_notify_bulk
 class Tag(base_models.BaseModel):
     name = models.CharField(max_length=50)
 
+    class Meta:
+        # trigram index for autocomplete, see apps.common.typeahead
+        indexes = [
+            GinIndex(
+                fields=["name"], name="jobs_tag_name_trgm", opclasses=["gin_trgm_ops"]
+            )
+        ]
+
     def __str__(self):
         return self.name
 
@@ -36,9 +49,14 @@ class Job(base_models.BaseModel):
         CREATED = "created", _("Created")
         REDEEMED = "redeemed", _("Redeemed")
         PENDING = "pending", _("Pending")
+        CANCELLED = "cancelled", _("Cancelled")
 
+    # indexed by job_company_status_created_idx
     company = models.ForeignKey(
-        "companies.Company", on_delete=models.CASCADE, related_name="jobs"
+        "companies.Company",
+        on_delete=models.CASCADE,
+        related_name="jobs",
+        db_index=False,
     )
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
@@ -75,9 +93,24 @@ class Job(base_models.BaseModel):
     escrow_status = models.CharField(
         max_length=25, choices=EscrowStatus.choices, default=EscrowStatus.PENDING
     )
+    # full text search document, see JobQuerySet.update_search_vector
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = JobManager()
 
     class Meta:
         ordering = ("created_at",)
+        indexes = [
+            GinIndex(fields=["search_vector"]),
+            models.Index(fields=["created_at"], name="job_created_idx"),
+            models.Index(
+                fields=["status", "created_at"], name="job_status_created_idx"
+            ),
+            models.Index(
+                fields=["company", "status", "created_at"],
+                name="job_company_status_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title}::{self.company.name}"
@@ -89,29 +122,58 @@ class Application(base_models.BaseModel):
         ACCEPTED = "accepted", _("Accepted")
         REJECTED = "rejected", _("Rejected")
 
+    # indexed by application_freelancer_idx and application_job_idx
     freelancer = models.ForeignKey(
-        "freelancers.Freelancer", on_delete=models.CASCADE, related_name="applications"
+        "freelancers.Freelancer",
+        on_delete=models.CASCADE,
+        related_name="applications",
+        db_index=False,
+    )
+    job = models.ForeignKey(
+        Job, on_delete=models.CASCADE, related_name="applicants", db_index=False
     )
-    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="applicants")
     status = models.CharField(
         max_length=25, choices=Status.choices, default=Status.PENDING
     )
 
     class Meta:
         ordering = ("created_at",)
+        indexes = [
+            models.Index(fields=["created_at"], name="application_created_idx"),
+            models.Index(
+                fields=["freelancer", "created_at"], name="application_freelancer_idx"
+            ),
+            models.Index(fields=["job", "created_at"], name="application_job_idx"),
+            models.Index(
+                fields=["freelancer", "status"], name="application_freelancer_st_idx"
+            ),
+            models.Index(fields=["job", "status"], name="application_job_status_idx"),
+        ]
 
     def __str__(self):
         return f"{self.job.title}::{self.freelancer.user.username}"
 
 
 class JobBookmark(base_models.BaseModel):
+    # indexed by bookmark_freelancer_idx and bookmark_job_idx
     freelancer = models.ForeignKey(
-        "freelancers.Freelancer", on_delete=models.CASCADE, related_name="job_bookmarks"
+        "freelancers.Freelancer",
+        on_delete=models.CASCADE,
+        related_name="job_bookmarks",
+        db_index=False,
+    )
+    job = models.ForeignKey(
+        "Job", on_delete=models.CASCADE, related_name="bookmarks", db_index=False
     )
-    job = models.ForeignKey("Job", on_delete=models.CASCADE, related_name="bookmarks")
 
     class Meta:
         ordering = ("created_at",)
+        indexes = [
+            models.Index(
+                fields=["freelancer", "created_at"], name="bookmark_freelancer_idx"
+            ),
+            models.Index(fields=["job", "created_at"], name="bookmark_job_idx"),
+        ]
 
     def __str__(self):
         return f"Bookmarked {self.job.title}::{self.freelancer.user.username}"
@@ -137,22 +199,155 @@ class JobSubmission(base_models.BaseModel):
         return f"Submission {self.application.job.title}::{self.application.freelancer.user.username}"
 
 
+class EscrowTransaction(base_models.BaseModel):
+    """
+    XRPL transaction creating or finishing the escrow of a job.
+
+    Submitted and confirmed by cloud tasks, never inside a request. Moves from
+    `pending` to `submitted` once rippled accepts it, then to `validated` or
+    `failed` when its outcome is final. The signed `tx_blob` is stored before it
+    is submitted so a retry resubmits the same transaction.
+    """
+
+    class Kind(models.TextChoices):
+        CREATE = "create", _("Create")
+        FINISH = "finish", _("Finish")
+
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        SUBMITTED = "submitted", _("Submitted")
+        VALIDATED = "validated", _("Validated")
+        FAILED = "failed", _("Failed")
+
+    job = models.ForeignKey(
+        "Job", on_delete=models.CASCADE, related_name="escrow_transactions"
+    )
+    kind = models.CharField(max_length=25, choices=Kind.choices)
+    status = models.CharField(
+        max_length=25, choices=Status.choices, default=Status.PENDING
+    )
+    # EscrowCreate only, amount in drops
+    amount = models.CharField(max_length=50, blank=True)
+    destination = models.CharField(max_length=255, blank=True)
+    account = models.CharField(max_length=255, blank=True)
+    sequence = models.PositiveBigIntegerField(null=True, blank=True)
+    last_ledger_sequence = models.PositiveBigIntegerField(null=True, blank=True)
+    tx_hash = models.CharField(max_length=64, blank=True)
+    tx_blob = models.TextField(blank=True)
+    # preliminary, then final engine result e.g tesSUCCESS
+    result = models.CharField(max_length=50, blank=True)
+    ledger_index = models.PositiveBigIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ("created_at",)
+
+    def __str__(self):
+        return f"{self.kind}::{self.job_id}::{self.status}"
+
+    @property
+    def in_flight(self):
+        return self.status in (self.Status.PENDING, self.Status.SUBMITTED)
+
+
+class LedgerCursor(base_models.BaseModel):
+    """Last validated ledger whose transactions were reconciled for an account"""
+
+    account = models.CharField(max_length=255, unique=True)
+    ledger_index = models.PositiveBigIntegerField()
+
+    def __str__(self):
+        return f"{self.account}::{self.ledger_index}"
+
+
+class EscrowDrift(base_models.BaseModel):
+    """
+    Escrow whose state on the ledger didn't match the job, found by reconciliation.
+
+    The job is corrected to the ledger state, this keeps a record of what was
+    stored. Escrows created by our accounts for no known job have no `job`.
+    """
+
+    job = models.ForeignKey(
+        "Job",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="escrow_drifts",
+    )
+    account = models.CharField(max_length=255)
+    sequence = models.PositiveBigIntegerField()
+    tx_hash = models.CharField(max_length=64)
+    ledger_index = models.PositiveBigIntegerField()
+    escrow_status = models.CharField(max_length=25, blank=True)
+    escrow_sequence = models.CharField(max_length=255, blank=True)
+    ledger_status = models.CharField(max_length=25, choices=Job.EscrowStatus.choices)
+
+    class Meta:
+        ordering = ("-created_at",)
+
+    def __str__(self):
+        return f"{self.account}::{self.sequence}::{self.ledger_status}"
+
+
 # SIGNALS
 # ---------------------------------------------------
 @receiver(models.signals.post_save, sender=Application)
-def set_owner_role(sender, instance, created, **kwargs):
-    from fcm_django.models import FCMDevice
+def notify_application_created(sender, instance, created, **kwargs):
+    from apps.common.tasks import create_task
 
+    # notify the company from a cloud task once the application is committed so
+    # the apply request never waits on firebase
     if created:
-        freelancer = instance.freelancer
-        job = instance.job
-        company = job.company
-
-        # send notification
-        Q = models.Q
-        devices = FCMDevice.objects.filter(
-            Q(user__companies_managed__company=company) | Q(user__company=company)
+        payload = {"application_id": str(instance.pk)}
+        transaction.on_commit(
+            lambda: create_task("notify-application", payload=payload)
         )
-        title = "Job Application"
-        body = f"{freelancer.fullname or 'User'} applied for the Job titled {job.title}"
-        fcm_notify_bulk(title, body, devices=devices)
+
+
+@receiver(models.signals.post_save, sender=Application)
+@receiver(models.signals.post_delete, sender=Application)
+def update_application_counts(sender, instance, **kwargs):
+    Freelancer = apps.get_model("freelancers.Freelancer")
+
+    update_fields = kwargs.get("update_fields")
+    if update_fields and "status" not in update_fields:
+        return
+
+    Freelancer.objects.filter(pk=instance.freelancer_id).refresh_application_counts()
+
+
+@receiver([models.signals.post_save, models.signals.post_delete], sender=Tag)
+def invalidate_tags_cache(sender, **kwargs):
+    transaction.on_commit(lambda: invalidate_tags("tags"))
+
+
+@receiver(models.signals.post_save, sender=Job)
+def update_job_search_vector(sender, instance, created, update_fields=None, **kwargs):
+    if created or not update_fields or SEARCH_FIELDS.intersection(update_fields):
+        Job.objects.filter(pk=instance.pk).update_search_vector()
+
+
+@receiver(models.signals.m2m_changed, sender=Job.skills.through)
+def update_job_skills_search_vector(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        Job.objects.filter(pk=instance.pk).update_search_vector()
+    elif pk_set:
+        Job.objects.filter(pk__in=pk_set).update_search_vector()
+
+
+@receiver(models.signals.post_save, sender="companies.Company")
+def update_company_jobs_search_vector(sender, instance, update_fields=None, **kwargs):
+    if not update_fields or "name" in update_fields:
+        Job.objects.filter(company=instance).update_search_vector()
+
+
+@receiver(models.signals.post_save, sender="users.Skill")
+def update_skill_jobs_search_vector(sender, instance, created, **kwargs):
+    if not created:
+        Job.objects.filter(skills=instance).update_search_vector()
@@ -0,0 +1,194 @@
+"""
+Reconciles the escrow state of jobs with the ledger.
+
+Every run reads the validated transactions of the company accounts since the last
+reconciled ledger, kept per account in `LedgerCursor`, so a run only costs the
+transactions that happened since the previous one. Escrows created, finished or
+cancelled by those transactions are matched to jobs by condition, or by owner
+and sequence, and jobs whose stored state differs are bulk updated to match the
+ledger. Each difference is recorded as an `EscrowDrift` unless an escrow
+transaction of ours is still being confirmed for it.
+
+Each account is committed with its cursor on its own, so an account that fails
+is read again on the next run without holding back the others.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.common.xrp import get_account_transactions
+from apps.companies.models import Company
+
+from .models import EscrowDrift, EscrowTransaction, Job, LedgerCursor
+
+logger = logging.getLogger(__name__)
+
+ESCROW_STATUSES = {
+    "EscrowCreate": Job.EscrowStatus.CREATED,
+    "EscrowFinish": Job.EscrowStatus.REDEEMED,
+    "EscrowCancel": Job.EscrowStatus.CANCELLED,
+}
+
+
+def reconcile_escrows(batch_size=None, full=False):
+    """
+    Reconcile the escrows of every company account, `batch_size` accounts at a time.
+
+    With `full` the cursors are ignored and the whole available history is read.
+    Returns the counts of accounts, transactions and escrows read, of jobs
+    updated and drift recorded, and of accounts that failed.
+    """
+    batch_size = batch_size or settings.LEDGER_RECONCILE_BATCH_SIZE
+    addresses = list(
+        Company.objects.exclude(xrp_address="")
+        .order_by("xrp_address")
+        .values_list("xrp_address", flat=True)
+        .distinct()
+    )
+
+    stats = {
+        "accounts": 0,
+        "transactions": 0,
+        "escrows": 0,
+        "updated": 0,
+        "drift": 0,
+        "failed": 0,
+    }
+    for start in range(0, len(addresses), batch_size):
+        end = start + batch_size
+        reconcile_accounts(addresses[start:end], stats, full=full)
+
+    logger.info("Escrow reconciliation: %s", stats)
+    return stats
+
+
+def reconcile_accounts(addresses, stats, full=False):
+    cursors = {
+        cursor.account: cursor
+        for cursor in LedgerCursor.objects.filter(account__in=addresses)
+    }
+    for address in addresses:
+        try:
+            reconcile_account(address, cursors.get(address), stats, full=full)
+        except Exception:
+            logger.exception("Escrow reconciliation of %s failed", address)
+            stats["failed"] += 1
+
+
+def reconcile_account(address, cursor, stats, full=False):
+    ledger_index_min = cursor.ledger_index + 1 if cursor and not full else -1
+    entries, ledger_index_max = get_account_transactions(address, ledger_index_min)
+
+    # (owner, sequence) -> latest state of the escrow seen on the ledger
+    escrows = {}
+    for entry in entries:
+        read_escrow_transaction(address, entry, escrows)
+
+    # the jobs and the cursor move together, a failed account is simply read again
+    with transaction.atomic():
+        update_jobs(escrows, stats)
+        if ledger_index_max is not None:
+            cursor = cursor or LedgerCursor(account=address)
+            cursor.ledger_index = ledger_index_max
+            cursor.save()
+
+    stats["accounts"] += 1
+    stats["transactions"] += len(entries)
+    stats["escrows"] += len(escrows)
+
+
+def read_escrow_transaction(address, entry, escrows):
+    """Record the state left by a successful transaction on an escrow of `address`"""
+
+    tx_json = entry["tx_json"]
+    status = ESCROW_STATUSES.get(tx_json["TransactionType"])
+    if status is None or entry["meta"]["TransactionResult"] != "tesSUCCESS":
+        return
+
+    if status == Job.EscrowStatus.CREATED:
+        key = (tx_json["Account"], tx_json["Sequence"])
+    else:
+        key = (tx_json["Owner"], tx_json["OfferSequence"])
+    # escrows other accounts hold for this one are reconciled with their owner
+    if key[0] != address:
+        return
+
+    escrow = escrows.setdefault(key, {"condition": None})
+    escrow["condition"] = tx_json.get("Condition") or escrow["condition"]
+    escrow["status"] = status
+    escrow["tx_hash"] = entry["hash"]
+    escrow["ledger_index"] = entry["ledger_index"]
+
+
+def update_jobs(escrows, stats):
+    if not escrows:
+        return
+
+    conditions = {e["condition"] for e in escrows.values() if e["condition"]}
+    owners = {owner for owner, _ in escrows}
+    sequences = {str(sequence) for _, sequence in escrows}
+    jobs = Job.objects.filter(
+        Q(escrow_condition__in=conditions)
+        | Q(company__xrp_address__in=owners, escrow_sequence__in=sequences)
+    ).select_related("company")
+    by_condition = {job.escrow_condition: job for job in jobs if job.escrow_condition}
+    by_sequence = {
+        (job.company.xrp_address, job.escrow_sequence): job
+        for job in jobs
+        if job.escrow_sequence
+    }
+    # our own transactions still being confirmed, their task updates the job
+    in_flight = set(
+        EscrowTransaction.objects.filter(
+            tx_hash__in=[e["tx_hash"] for e in escrows.values()],
+            status__in=[
+                EscrowTransaction.Status.PENDING,
+                EscrowTransaction.Status.SUBMITTED,
+            ],
+        ).values_list("tx_hash", flat=True)
+    )
+
+    now = timezone.now()
+    updated, drift = {}, []
+    for (owner, sequence), escrow in escrows.items():
+        job = by_condition.get(escrow["condition"]) or by_sequence.get(
+            (owner, str(sequence))
+        )
+        if (
+            job
+            and job.escrow_status == escrow["status"]
+            and job.escrow_sequence == str(sequence)
+        ):
+            continue
+
+        if escrow["tx_hash"] not in in_flight:
+            drift.append(
+                EscrowDrift(
+                    job=job,
+                    account=owner,
+                    sequence=sequence,
+                    tx_hash=escrow["tx_hash"],
+                    ledger_index=escrow["ledger_index"],
+                    escrow_status=job.escrow_status if job else "",
+                    escrow_sequence=job.escrow_sequence if job else "",
+                    ledger_status=escrow["status"],
+                )
+            )
+        if job:
+            job.escrow_status = escrow["status"]
+            job.escrow_sequence = str(sequence)
+            job.updated_at = now
+            updated[job.pk] = job
+
+    Job.objects.bulk_update(
+        updated.values(), ["escrow_status", "escrow_sequence", "updated_at"]
+    )
+    EscrowDrift.objects.bulk_create(drift)
+    if drift:
+        logger.warning("Escrow drift on %s escrows", len(drift))
+
+    stats["updated"] += len(updated)
+    stats["drift"] += len(drift)
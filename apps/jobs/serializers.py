@@ -6,13 +6,17 @@ from rest_framework import serializers
 from apps.common.email import send_email_template
 from apps.common.serializers import (
     CompanyBaseSerializer,
+    CompanyMiniSerializer,
+    DynamicFieldsMixin,
     FreelancerBaseSerializer,
+    FreelancerMiniSerializer,
     JobSubmissionBaseSerializer,
     SkillBaseSerializer,
+    TagBaseSerializer,
 )
 from apps.notifications.utils import fcm_notify
 
-from .models import Application, Job, JobBookmark, JobSubmission, Tag
+from .models import Application, EscrowTransaction, Job, JobBookmark, JobSubmission, Tag
 from .utils import create_escrow, redeem_escrow
 
 
@@ -67,7 +71,7 @@ class JobSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
-class JobReadSerializer(serializers.ModelSerializer):
+class JobReadSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     company = CompanyBaseSerializer()
     tags = TagSerializer(many=True)
     skills = SkillBaseSerializer(many=True)
@@ -101,6 +105,42 @@ class JobReadSerializer(serializers.ModelSerializer):
         )
 
 
+class JobListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """Compact job for lists. `?expand=company` returns the full company"""
+
+    company = CompanyMiniSerializer()
+    tags = TagBaseSerializer(many=True)
+    skills = SkillBaseSerializer(many=True)
+
+    class Meta:
+        model = Job
+        fields = (
+            "id",
+            "title",
+            "company",
+            "location",
+            "tags",
+            "skills",
+            "price_type",
+            "price",
+            "min_price",
+            "max_price",
+            "currency",
+            "role_type",
+            "application_type",
+            "status",
+            "created_at",
+            "updated_at",
+        )
+        expandable_fields = {"company": (CompanyBaseSerializer, {})}
+
+
+class JobMiniSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ("id", "title", "company", "status", "price", "currency")
+
+
 class ApplicationCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Application
@@ -175,13 +215,31 @@ class RedeemEscrowSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({"message": "Escrow condition not met"})
 
 
+class EscrowTransactionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EscrowTransaction
+        fields = (
+            "id",
+            "job",
+            "kind",
+            "status",
+            "tx_hash",
+            "sequence",
+            "result",
+            "ledger_index",
+            "error",
+            "created_at",
+            "updated_at",
+        )
+
+
 class ApplicationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Application
         fields = ("id", "freelancer", "job", "status", "created_at", "updated_at")
 
 
-class ApplicationReadSerializer(serializers.ModelSerializer):
+class ApplicationReadSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     freelancer = FreelancerBaseSerializer()
     job = JobReadSerializer()
     submission = JobSubmissionBaseSerializer(many=True)
@@ -243,6 +301,25 @@ class UpdateApplicationStatusSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class ApplicationListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """
+    Compact application for lists.
+    `?expand=freelancer,job,submission` returns the full relations.
+    """
+
+    freelancer = FreelancerMiniSerializer()
+    job = JobMiniSerializer()
+
+    class Meta:
+        model = Application
+        fields = ("id", "freelancer", "job", "status", "created_at", "updated_at")
+        expandable_fields = {
+            "freelancer": (FreelancerBaseSerializer, {}),
+            "job": (JobReadSerializer, {}),
+            "submission": (JobSubmissionBaseSerializer, {"many": True}),
+        }
+
+
 class BookmarkSerializer(serializers.ModelSerializer):
     class Meta:
         model = JobBookmark
@@ -1,7 +1,19 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.urls import resolve
 from django.urls.base import reverse
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
+
+from apps.common.xrp import (
+    escrow_create_tx,
+    escrow_finish_tx,
+    generate_condition,
+    submit,
+)
+from apps.jobs.models import EscrowDrift, EscrowTransaction, Job, LedgerCursor
+from apps.jobs.utils import create_escrow
 
 pytestmark = pytest.mark.django_db
 
@@ -74,6 +86,72 @@ class TestJob:
         assert resp.status_code == status.HTTP_200_OK
         assert len(resp_data["results"]) == 3
 
+    def test_list_job_company_stats(
+        self, api_client_auth, user, job_factory, application_factory, capture_queries
+    ):
+        url = reverse("api:jobs-list")
+        job = job_factory()
+        application_factory(job=job)
+        job_factory.create_batch(19)
+
+        client = api_client_auth(user=user)
+        queries = capture_queries(client.get, url, {"expand": "company"})
+
+        # only the pagination count, company stats come from one aggregated query
+        assert len([sql for sql in queries if "COUNT(*)" in sql]) == 1
+
+        resp = client.get(url, {"page_size": 1, "expand": "company"})
+        company = resp.json()["data"]["results"][0]["company"]
+        assert company["total_jobs"] == 1
+        assert company["total_applications"] == 1
+
+    def test_list_job_compact(self, api_client_auth, user, job_factory):
+        url = reverse("api:jobs-list")
+        job_factory.create_batch(3)
+
+        client = api_client_auth(user=user)
+        compact = client.get(url)
+        expanded = client.get(url, {"expand": "company"})
+        resp_data = compact.json()["data"]
+
+        assert compact.status_code == status.HTTP_200_OK
+        assert set(resp_data["results"][0]["company"]) == {"id", "name", "logo"}
+        assert "total_jobs" in expanded.json()["data"]["results"][0]["company"]
+        assert len(compact.content) < len(expanded.content)
+
+    def test_list_job_fields(self, api_client_auth, user, job_factory):
+        url = reverse("api:jobs-list")
+        job = job_factory()
+
+        client = api_client_auth(user=user)
+        resp = client.get(url, {"fields": "id,title,unknown"})
+        resp_data = resp.json()["data"]
+
+        assert resp_data["results"] == [{"id": str(job.id), "title": job.title}]
+
+    @pytest.mark.parametrize("expand,queries", [("", 6), ("company", 9)])
+    def test_list_job_query_count(
+        self,
+        api_client_auth,
+        user,
+        job_factory,
+        skill_factory,
+        tag_factory,
+        django_assert_num_queries,
+        expand,
+        queries,
+    ):
+        url = reverse("api:jobs-list")
+        for job in job_factory.create_batch(100):
+            job.skills.add(skill_factory())
+            job.tags.add(tag_factory())
+
+        client = api_client_auth(user=user)
+        with django_assert_num_queries(queries):
+            resp = client.get(url, {"page_size": 100, "expand": expand})
+
+        assert len(resp.json()["data"]["results"]) == 100
+
     def test_create_job(self, api_client_auth, user, company_factory):
         url = reverse("api:jobs-list")
         client = api_client_auth(user=user)
@@ -115,6 +193,51 @@ class TestJob:
         assert resp_data["title"] == job.title
 
 
+class TestJobSearch:
+    def test_search(self, api_client_auth, user, job_factory, skill_factory):
+        url = reverse("api:jobs-list")
+        client = api_client_auth(user=user)
+        python = skill_factory(name="Python")
+        match = job_factory(title="Backend developer")
+        match.skills.add(python)
+        job_factory(title="Designer", description="We need python experience")
+        job_factory(title="Accountant")
+
+        resp = client.get(url, {"search": "pyth"})
+        titles = [job["title"] for job in resp.json()["data"]["results"]]
+
+        # skills rank above the description, no duplicate rows from the join
+        assert titles == ["Backend developer", "Designer"]
+
+    def test_search_updates(self, api_client_auth, user, job_factory, skill_factory):
+        url = reverse("api:jobs-list")
+        client = api_client_auth(user=user)
+        job = job_factory(title="Designer")
+        skill = skill_factory(name="Figma")
+        job.skills.add(skill)
+
+        assert client.get(url, {"search": "figma"}).json()["data"]["count"] == 1
+
+        skill.name = "Sketch"
+        skill.save()
+        assert client.get(url, {"search": "figma"}).json()["data"]["count"] == 0
+        assert client.get(url, {"search": "sketch"}).json()["data"]["count"] == 1
+
+        job.company.name = "Acme"
+        job.company.save()
+        assert client.get(url, {"search": "acme"}).json()["data"]["count"] == 1
+
+    def test_search_fallback(self, api_client_auth, user, job_factory, monkeypatch):
+        monkeypatch.setattr("apps.common.search.search_enabled", lambda: False)
+        url = reverse("api:jobs-list")
+        client = api_client_auth(user=user)
+        job_factory(title="Backend developer")
+        job_factory(title="Designer")
+
+        resp = client.get(url, {"search": "backend"})
+        assert resp.json()["data"]["count"] == 1
+
+
 class TestApplication:
     def test_list_application(
         self,
@@ -136,6 +259,45 @@ class TestApplication:
         assert resp.status_code == status.HTTP_200_OK
         assert len(resp_data["results"]) == 3
 
+    def test_list_application_expand(
+        self, api_client_auth, user, freelancer_factory, application_factory
+    ):
+        url = reverse("api:applications-list")
+        freelancer = freelancer_factory(user=user)
+        application = application_factory(freelancer=freelancer)
+
+        client = api_client_auth(user=user)
+        compact = client.get(url).json()["data"]["results"][0]
+        expanded = client.get(url, {"expand": "job,submission"}).json()["data"]
+        expanded = expanded["results"][0]
+
+        assert compact["job"]["id"] == str(application.job.id)
+        assert "submission" not in compact
+        assert "skills" not in compact["freelancer"]
+        assert expanded["job"]["company"]["id"] == str(application.job.company.id)
+        assert expanded["submission"] == []
+
+    @pytest.mark.parametrize(
+        "expand,queries", [("", 4), ("freelancer,job,submission", 14)]
+    )
+    def test_list_application_query_count(
+        self,
+        api_client_auth,
+        admin,
+        application_factory,
+        django_assert_num_queries,
+        expand,
+        queries,
+    ):
+        url = reverse("api:applications-list")
+        application_factory.create_batch(100)
+
+        client = api_client_auth(user=admin)
+        with django_assert_num_queries(queries):
+            resp = client.get(url, {"page_size": 100, "expand": expand})
+
+        assert len(resp.json()["data"]["results"]) == 100
+
     def test_create_applications(
         self, api_client_auth, user, job_factory, freelancer_factory
     ):
@@ -153,6 +315,58 @@ class TestApplication:
         assert resp_data["freelancer"] == str(freelancer.id)
         assert resp_data["job"] == str(job.id)
 
+    def test_create_application_notifies_after_commit(
+        self,
+        api_client_auth,
+        user,
+        job_factory,
+        freelancer_factory,
+        monkeypatch,
+        django_capture_on_commit_callbacks,
+    ):
+        from fcm_django.models import FCMDevice
+
+        tasks, pushes = [], []
+        monkeypatch.setattr(
+            "apps.common.tasks.create_task",
+            lambda uri, payload=None, **kwargs: tasks.append((uri, payload)),
+        )
+        monkeypatch.setattr(
+            "apps.jobs.utils.fcm_notify_bulk",
+            lambda title, body, devices=None: pushes.append((body, list(devices))),
+        )
+        freelancer = freelancer_factory(
+            user=user, fullname="Ama", xrp_address="rippleaddress"
+        )
+        job = job_factory(title="Logo design")
+        device = FCMDevice.objects.create(
+            user=job.company.user, registration_id="token", type="android"
+        )
+
+        client = api_client_auth(user=user)
+        with django_capture_on_commit_callbacks() as callbacks:
+            resp = client.post(
+                reverse("api:applications-list"),
+                data={"job": str(job.id), "freelancer": str(freelancer.id)},
+            )
+        application_id = resp.json()["data"]["id"]
+
+        # nothing leaves the request, the task is queued once the transaction commits
+        assert resp.status_code == status.HTTP_201_CREATED
+        assert tasks == [] and pushes == []
+        assert len(callbacks) == 1
+
+        callbacks[0]()
+        assert tasks == [("notify-application", {"application_id": application_id})]
+
+        resp = client.post(
+            reverse("api:notifications-notify-application"),
+            data=tasks[0][1],
+            format="json",
+        )
+        assert resp.status_code == status.HTTP_200_OK
+        assert pushes == [("Ama applied for the Job titled Logo design", [device])]
+
     def test_update_application(
         self, api_client_auth, user, application_factory, freelancer_factory
     ):
@@ -181,3 +395,379 @@ class TestApplication:
 
         assert resp.status_code == status.HTTP_200_OK
         assert resp_data["status"] == application.status
+
+
+class TestEscrow:
+    @pytest.fixture
+    def escrow_setup(
+        self,
+        fake_rippled,
+        monkeypatch,
+        company_factory,
+        job_factory,
+        application_factory,
+        django_capture_on_commit_callbacks,
+    ):
+        tasks = []
+        monkeypatch.setattr(
+            "apps.common.tasks.create_task",
+            lambda uri, payload=None, **kwargs: tasks.append((uri, payload)),
+        )
+        ledger = fake_rippled.ledger
+        company_wallet = ledger.wallet(xrp=500)
+        freelancer_wallet = ledger.wallet(xrp=20)
+        company = company_factory(
+            xrp_address=company_wallet.address, xrp_seed=company_wallet.seed
+        )
+        job = job_factory(company=company, price=100, currency="USD")
+        application = application_factory(
+            job=job, freelancer__xrp_address=freelancer_wallet.address
+        )
+
+        # 1 USD = 2 XRP
+        monkeypatch.setattr(
+            "apps.jobs.utils.currency_conversion", lambda amount, currency: amount * 2
+        )
+        monkeypatch.setattr("apps.jobs.utils.fcm_notify", lambda *args, **kw: None)
+
+        def run_tasks(client):
+            """Deliver queued escrow tasks until none are left, as cloud tasks would"""
+            while tasks:
+                uri, payload = tasks.pop(0)
+                url = reverse(f"api:escrow-transactions-{uri.split('-')[0]}")
+                with django_capture_on_commit_callbacks(execute=True):
+                    resp = client.post(url, payload, format="json")
+                assert resp.status_code == status.HTTP_200_OK
+
+        return {
+            "ledger": ledger,
+            "application": application,
+            "job": job,
+            "freelancer_address": freelancer_wallet.address,
+            "tasks": tasks,
+            "run_tasks": run_tasks,
+        }
+
+    def test_accept_application_queues_escrow(
+        self, api_client_auth, escrow_setup, django_capture_on_commit_callbacks
+    ):
+        application = escrow_setup["application"]
+        job = escrow_setup["job"]
+        tasks = escrow_setup["tasks"]
+
+        client = api_client_auth(user=job.company.user)
+        with django_capture_on_commit_callbacks(execute=True):
+            resp = client.post(
+                reverse("api:applications-update-status", args=[application.pk]),
+                {"status": "accepted"},
+            )
+
+        # nothing is submitted within the request
+        escrow_tx = EscrowTransaction.objects.get(job=job)
+        assert resp.status_code == status.HTTP_200_OK
+        assert escrow_tx.status == EscrowTransaction.Status.PENDING
+        assert escrow_setup["ledger"].transactions == {}
+        assert tasks == [
+            ("submit-escrow", {"escrow_transaction_id": str(escrow_tx.pk)})
+        ]
+
+        escrow_setup["run_tasks"](client)
+
+        escrow_tx.refresh_from_db()
+        job.refresh_from_db()
+        assert escrow_tx.status == EscrowTransaction.Status.VALIDATED
+        assert escrow_tx.result == "tesSUCCESS"
+        assert job.escrow_status == Job.EscrowStatus.CREATED
+        assert job.escrow_sequence == str(escrow_tx.sequence)
+
+        resp = client.get(
+            reverse("api:escrow-transactions-detail", args=[escrow_tx.pk])
+        )
+        assert resp.json()["data"]["status"] == "validated"
+
+    def test_redeem_escrow(
+        self, api_client_auth, escrow_setup, django_capture_on_commit_callbacks
+    ):
+        ledger = escrow_setup["ledger"]
+        job = escrow_setup["job"]
+        run_tasks = escrow_setup["run_tasks"]
+        client = api_client_auth(user=job.company.user)
+        url = reverse(
+            "api:applications-redeem-escrow", args=[escrow_setup["application"].pk]
+        )
+        with django_capture_on_commit_callbacks(execute=True):
+            create_escrow(job, escrow_setup["application"].freelancer)
+        run_tasks(client)
+        job.refresh_from_db()
+        job.status = Job.Status.COMPLETED
+        job.save()
+
+        # the escrow can't be finished before its FinishAfter time
+        with django_capture_on_commit_callbacks(execute=True):
+            resp = client.get(url)
+        run_tasks(client)
+        failed = EscrowTransaction.objects.get(kind="finish")
+        assert resp.json()["data"]["message"] == "Escrow redemption queued"
+        assert failed.status == EscrowTransaction.Status.FAILED
+        assert failed.error == "tecNO_PERMISSION"
+
+        ledger.time_offset = 120
+        with django_capture_on_commit_callbacks(execute=True):
+            client.get(url)
+        run_tasks(client)
+        job.refresh_from_db()
+        assert job.escrow_status == Job.EscrowStatus.REDEEMED
+        # 100 USD at 2 XRP per USD on top of the 20 XRP it was funded with
+        assert ledger.balance(escrow_setup["freelancer_address"]) == 220_000_000
+
+    def test_escrow_in_progress(self, escrow_setup):
+        job = escrow_setup["job"]
+        freelancer = escrow_setup["application"].freelancer
+
+        create_escrow(job, freelancer)
+        with pytest.raises(ValidationError):
+            create_escrow(job, freelancer)
+
+    def test_submit_retried_with_same_blob(
+        self,
+        api_client_auth,
+        escrow_setup,
+        monkeypatch,
+        django_capture_on_commit_callbacks,
+    ):
+        from apps.jobs import utils
+
+        submitted = []
+        submit_signed = utils.submit_signed
+
+        def flaky_submit(signed):
+            submitted.append(signed.get_hash())
+            if len(submitted) == 1:
+                raise ConnectionError("rippled unreachable")
+            return submit_signed(signed)
+
+        monkeypatch.setattr("apps.jobs.utils.submit_signed", flaky_submit)
+        with django_capture_on_commit_callbacks(execute=True):
+            create_escrow(escrow_setup["job"], escrow_setup["application"].freelancer)
+        escrow_setup["run_tasks"](
+            api_client_auth(user=escrow_setup["job"].company.user)
+        )
+
+        escrow_tx = EscrowTransaction.objects.get()
+        assert submitted == [escrow_tx.tx_hash, escrow_tx.tx_hash]
+        assert escrow_tx.status == EscrowTransaction.Status.VALIDATED
+
+    @pytest.mark.django_db(transaction=True)
+    def test_submit_interrupted_after_submission(
+        self, api_client_auth, escrow_setup, monkeypatch
+    ):
+        from apps.jobs import utils
+
+        submitted = []
+        submit_signed = utils.submit_signed
+        record_submission = utils.record_submission
+
+        def record_once(*args):
+            if len(submitted) == 1:
+                # the instance dies once rippled has the transaction
+                raise RuntimeError("instance restarted")
+            return record_submission(*args)
+
+        monkeypatch.setattr(
+            "apps.jobs.utils.submit_signed",
+            lambda signed: submitted.append(signed.get_hash()) or submit_signed(signed),
+        )
+        monkeypatch.setattr("apps.jobs.utils.record_submission", record_once)
+        client = api_client_auth(user=escrow_setup["job"].company.user)
+        # committed straight away here, with the application's notification task
+        escrow_setup["tasks"].clear()
+        with transaction.atomic():
+            create_escrow(escrow_setup["job"], escrow_setup["application"].freelancer)
+        uri, payload = escrow_setup["tasks"].pop()
+        with pytest.raises(RuntimeError):
+            client.post(
+                reverse("api:escrow-transactions-submit"), payload, format="json"
+            )
+
+        # redelivered by cloud tasks
+        escrow_setup["tasks"].append((uri, payload))
+        escrow_setup["run_tasks"](client)
+
+        escrow_tx = EscrowTransaction.objects.get()
+        assert submitted == [escrow_tx.tx_hash, escrow_tx.tx_hash]
+        assert escrow_tx.status == EscrowTransaction.Status.VALIDATED
+        assert len(escrow_setup["ledger"].escrows) == 1
+
+    def test_stale_sequence_signed_again(
+        self,
+        api_client_auth,
+        escrow_setup,
+        monkeypatch,
+        django_capture_on_commit_callbacks,
+    ):
+        from apps.jobs import utils
+
+        submitted = []
+        submit_signed = utils.submit_signed
+
+        def stale_submit(signed):
+            submitted.append(signed.get_hash())
+            if len(submitted) == 1:
+                # the sequence went to another transaction of the account
+                return {"engine_result": "tefPAST_SEQ"}
+            return submit_signed(signed)
+
+        monkeypatch.setattr("apps.jobs.utils.submit_signed", stale_submit)
+        signed = []
+        sign = utils.sign
+        monkeypatch.setattr(
+            "apps.jobs.utils.sign", lambda *args: signed.append(args) or sign(*args)
+        )
+        with django_capture_on_commit_callbacks(execute=True):
+            create_escrow(escrow_setup["job"], escrow_setup["application"].freelancer)
+        escrow_setup["run_tasks"](
+            api_client_auth(user=escrow_setup["job"].company.user)
+        )
+
+        escrow_tx = EscrowTransaction.objects.get()
+        assert len(signed) == len(submitted) == 2
+        assert submitted[-1] == escrow_tx.tx_hash
+        assert escrow_tx.status == EscrowTransaction.Status.VALIDATED
+        assert escrow_tx.result == "tesSUCCESS"
+
+
+class TestReconcile:
+    @pytest.fixture
+    def ledger_job(self, fake_rippled, company_factory, job_factory):
+        ledger = fake_rippled.ledger
+        wallet = ledger.wallet(xrp=500)
+        condition, fulfillment = generate_condition()
+        company = company_factory(xrp_address=wallet.address, xrp_seed=wallet.seed)
+        job = job_factory(
+            company=company,
+            escrow_condition=condition,
+            escrow_fulfillment=fulfillment,
+        )
+        return ledger, wallet, job
+
+    def create_escrow(self, wallet, amount, destination, condition):
+        tx = escrow_create_tx(wallet.address, amount, destination, 60, condition)
+        return submit(tx, wallet).result
+
+    def reconcile(self, client):
+        resp = client.get(
+            reverse("api:escrow-transactions-reconcile"),
+            HTTP_X_APPENGINE_CRON="true",
+        )
+        assert resp.status_code == status.HTTP_200_OK
+        return resp.json()["data"]
+
+    def test_reconcile_requires_cron(self, api_client):
+        resp = api_client.get(reverse("api:escrow-transactions-reconcile"))
+
+        assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_reconcile_escrow_lifecycle(self, api_client, ledger_job):
+        ledger, wallet, job = ledger_job
+        freelancer = ledger.wallet(xrp=20)
+
+        # created on the ledger but the confirmation never reached the job
+        escrow = self.create_escrow(
+            wallet, "40000000", freelancer.address, job.escrow_condition
+        )
+        sequence = escrow["tx_json"]["Sequence"]
+        stats = self.reconcile(api_client)
+
+        job.refresh_from_db()
+        drift = EscrowDrift.objects.get()
+        assert stats["updated"] == 1
+        assert job.escrow_status == Job.EscrowStatus.CREATED
+        assert job.escrow_sequence == str(sequence)
+        assert (drift.job, drift.escrow_status, drift.ledger_status) == (
+            job,
+            Job.EscrowStatus.PENDING,
+            Job.EscrowStatus.CREATED,
+        )
+        assert LedgerCursor.objects.get().ledger_index == ledger.validated_index
+
+        # nothing new, nothing read
+        stats = self.reconcile(api_client)
+        assert (stats["transactions"], stats["updated"]) == (0, 0)
+
+        ledger.time_offset = 120
+        finish = escrow_finish_tx(
+            wallet.address,
+            wallet.address,
+            sequence,
+            job.escrow_condition,
+            job.escrow_fulfillment,
+        )
+        submit(finish, wallet)
+        stats = self.reconcile(api_client)
+
+        job.refresh_from_db()
+        assert stats["transactions"] == 1
+        assert job.escrow_status == Job.EscrowStatus.REDEEMED
+        assert EscrowDrift.objects.count() == 2
+
+    def test_in_flight_and_unknown_escrows(self, api_client, ledger_job):
+        ledger, wallet, job = ledger_job
+        freelancer = ledger.wallet(xrp=20)
+        escrow = self.create_escrow(
+            wallet, "40000000", freelancer.address, job.escrow_condition
+        )
+        # submitted by the escrow tasks, the confirmation is still to come
+        EscrowTransaction.objects.create(
+            job=job,
+            kind=EscrowTransaction.Kind.CREATE,
+            status=EscrowTransaction.Status.SUBMITTED,
+            tx_hash=escrow["hash"],
+        )
+        self.create_escrow(
+            wallet, "10000000", freelancer.address, generate_condition()[0]
+        )
+
+        stats = self.reconcile(api_client)
+
+        job.refresh_from_db()
+        assert job.escrow_status == Job.EscrowStatus.CREATED
+        assert stats["escrows"] == 2
+        assert list(EscrowDrift.objects.values_list("job", flat=True)) == [None]
+
+    def test_failed_account_keeps_others(
+        self, api_client, ledger_job, company_factory, monkeypatch
+    ):
+        ledger, wallet, job = ledger_job
+        other = ledger.wallet(xrp=100)
+        company_factory(xrp_address=other.address, xrp_seed=other.seed)
+        self.create_escrow(wallet, "40000000", other.address, job.escrow_condition)
+
+        from apps.jobs import reconcile
+
+        get_account_transactions = reconcile.get_account_transactions
+
+        def flaky_account_tx(account, ledger_index_min=-1):
+            if account == other.address:
+                raise ConnectionError("rippled unreachable")
+            return get_account_transactions(account, ledger_index_min)
+
+        monkeypatch.setattr(
+            "apps.jobs.reconcile.get_account_transactions", flaky_account_tx
+        )
+        stats = self.reconcile(api_client)
+
+        job.refresh_from_db()
+        assert (stats["accounts"], stats["failed"]) == (1, 1)
+        assert job.escrow_status == Job.EscrowStatus.CREATED
+        assert list(LedgerCursor.objects.values_list("account", flat=True)) == [
+            wallet.address
+        ]
+
+    def test_reconcile_not_atomic(self):
+        view = resolve(reverse("api:escrow-transactions-reconcile")).func
+
+        assert view._non_atomic_requests == {"default"}
+        assert not hasattr(
+            resolve(reverse("api:escrow-transactions-confirm")).func,
+            "_non_atomic_requests",
+        )
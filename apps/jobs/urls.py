@@ -1,6 +1,13 @@
 from rest_framework.routers import SimpleRouter
 
-from .views import ApplicationView, BookmarkView, JobSubmissionView, JobView, TagView
+from .views import (
+    ApplicationView,
+    BookmarkView,
+    EscrowTransactionView,
+    JobSubmissionView,
+    JobView,
+    TagView,
+)
 
 router = SimpleRouter()
 
@@ -9,6 +16,9 @@ router.register("applications", ApplicationView, basename="applications")
 router.register("tags", TagView, basename="tags")
 router.register("bookmarks", BookmarkView, basename="bookmarks")
 router.register("submissions", JobSubmissionView, basename="submission")
+router.register(
+    "escrow-transactions", EscrowTransactionView, basename="escrow-transactions"
+)
 router.register("", JobView, basename="jobs")
 
 
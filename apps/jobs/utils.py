@@ -1,19 +1,61 @@
 import logging
 
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
 from rest_framework import serializers
+from xrpl.models.transactions.transaction import Transaction
 from xrpl.utils import xrp_to_drops
 
 from apps.common.exchange import currency_conversion
 from apps.common.models import Currency
 from apps.common.xrp import (
-    create_conditional_escrow,
-    finish_conditional_escrow,
+    escrow_create_tx,
+    escrow_finish_tx,
     generate_condition,
     get_acc_info,
+    get_outcome,
+    sign,
+    submit_signed,
 )
+from apps.notifications.utils import fcm_notify, fcm_notify_bulk
+
+from .models import EscrowTransaction, Job
+
+
+def get_in_flight_escrow(job, kind):
+    """
+    Escrow transaction of `kind` still pending or submitted for `job`.
+
+    Locks the job row so concurrent requests can't both queue one.
+    """
+    list(Job.objects.select_for_update().filter(pk=job.pk).values_list("pk"))
+    return EscrowTransaction.objects.filter(
+        job=job,
+        kind=kind,
+        status__in=[
+            EscrowTransaction.Status.PENDING,
+            EscrowTransaction.Status.SUBMITTED,
+        ],
+    ).first()
+
+
+def queue_escrow_task(uri, escrow_tx, delay=None):
+    from apps.common.tasks import create_task
+
+    payload = {"escrow_transaction_id": str(escrow_tx.pk)}
+    transaction.on_commit(
+        lambda: create_task(uri, payload=payload, schedule_time=delay)
+    )
 
 
 def create_escrow(job, freelancer):
+    """
+    Queue the escrow of the job's price for the freelancer.
+
+    Checks run straight away, the transaction is submitted and confirmed by cloud
+    tasks. Returns the escrow transaction to poll.
+    """
     if job.escrow_sequence and job.escrow_condition and job.escrow_fulfillment:
         raise serializers.ValidationError({"message": "Escrow already created"})
 
@@ -25,6 +67,9 @@ def create_escrow(job, freelancer):
     if not company.xrp_address and not company.xrp_seed:
         raise serializers.ValidationError({"message": "Update xrp address and seed"})
 
+    if get_in_flight_escrow(job, EscrowTransaction.Kind.CREATE):
+        raise serializers.ValidationError({"message": "Escrow creation in progress"})
+
     # check currency
     currency = job.currency
     if currency != Currency.USD:
@@ -47,72 +92,224 @@ def create_escrow(job, freelancer):
             {"message": "Insufficient Balance to create job"}
         )
 
-    # Create escrow for Job
-    condition, fulfillment = generate_condition()
-    company_seed = company.xrp_seed
     freelancer_address = freelancer.xrp_address
-
     if not freelancer_address:
         raise serializers.ValidationError(
             {"message": "Freelancer xrp address required"}
         )
 
-    finish_time = 60  # In seconds
-    price_in_drops = xrp_to_drops(price)
-    try:
-        escrow = create_conditional_escrow(
-            company_seed,
-            price_in_drops,
-            freelancer_address,
-            finish_time,
-            condition,
-        )
-    except Exception as e:
-        logging.warning(e)
-        raise serializers.ValidationError(
-            {"message": "Escrow creation failed", "error": e}
-        )
-    # Update jobs
-    escrow_sequence = escrow["tx_json"]["Sequence"]
+    # Create escrow for Job
+    condition, fulfillment = generate_condition()
     job.escrow_condition = condition
     job.escrow_fulfillment = fulfillment
-    job.escrow_sequence = escrow_sequence
-    job.escrow_status = job.EscrowStatus.CREATED
-    job.save(
-        update_fields=[
-            "escrow_sequence",
-            "escrow_condition",
-            "escrow_fulfillment",
-            "escrow_status",
-            "updated_at",
-        ]
+    job.save(update_fields=["escrow_condition", "escrow_fulfillment", "updated_at"])
+
+    escrow_tx = EscrowTransaction.objects.create(
+        job=job,
+        kind=EscrowTransaction.Kind.CREATE,
+        amount=xrp_to_drops(price),
+        destination=freelancer_address,
     )
-    return {"message": "Escrow created"}
+    queue_escrow_task("submit-escrow", escrow_tx)
+    return {
+        "message": "Escrow creation queued",
+        "escrow_transaction": str(escrow_tx.pk),
+    }
 
 
 def redeem_escrow(job):
+    """Queue the release of the job's escrow to the freelancer, see `create_escrow`"""
     sequence = job.escrow_sequence
     condition = job.escrow_condition
     fulfillment = job.escrow_fulfillment
     if not sequence or not condition or not fulfillment:
         raise serializers.ValidationError({"message": "Escrow not created"})
 
-    # redeem escrow for Job
+    if job.escrow_status == job.EscrowStatus.REDEEMED:
+        raise serializers.ValidationError({"message": "Escrow already redeemed"})
+
+    if get_in_flight_escrow(job, EscrowTransaction.Kind.FINISH):
+        raise serializers.ValidationError({"message": "Escrow redemption in progress"})
+
+    escrow_tx = EscrowTransaction.objects.create(
+        job=job, kind=EscrowTransaction.Kind.FINISH
+    )
+    queue_escrow_task("submit-escrow", escrow_tx)
+    return {
+        "message": "Escrow redemption queued",
+        "escrow_transaction": str(escrow_tx.pk),
+    }
+
+
+def build_escrow_transaction(escrow_tx):
+    job = escrow_tx.job
     company = job.company
-    company_seed = company.xrp_seed
-    company_address = company.xrp_address
-    try:
-        finish_conditional_escrow(
-            company_seed, company_address, sequence, condition, fulfillment
+    if escrow_tx.kind == EscrowTransaction.Kind.CREATE:
+        finish_time = 60  # In seconds
+        return escrow_create_tx(
+            company.xrp_address,
+            escrow_tx.amount,
+            escrow_tx.destination,
+            finish_time,
+            job.escrow_condition,
         )
+    return escrow_finish_tx(
+        company.xrp_address,
+        company.xrp_address,
+        job.escrow_sequence,
+        job.escrow_condition,
+        job.escrow_fulfillment,
+    )
+
+
+def get_escrow_transaction(pk, status):
+    """Escrow transaction `pk` while still in `status`, locked for the transaction"""
+    return (
+        EscrowTransaction.objects.select_for_update(of=("self",))
+        .select_related("job__company__user")
+        .filter(pk=pk, status=status)
+        .first()
+    )
+
+
+def submit_escrow_transaction(pk):
+    """
+    Sign and submit a pending escrow transaction, then queue its confirmation.
+
+    Runs outside of a transaction: the signed blob is committed before it is
+    submitted and the result recorded in a second transaction. Network errors,
+    or a process that dies mid submission, keep it pending for another attempt,
+    which resubmits the stored blob rather than signing a second escrow.
+    """
+    with transaction.atomic():
+        escrow_tx = get_escrow_transaction(pk, EscrowTransaction.Status.PENDING)
+        # already handled by an earlier delivery of the task
+        if escrow_tx is None:
+            return None
+        resubmit = bool(escrow_tx.tx_blob)
+        if not resubmit:
+            sign_escrow_transaction(escrow_tx)
+
+    try:
+        result = submit_signed(Transaction.from_blob(escrow_tx.tx_blob))
     except Exception as e:
         logging.warning(e)
-        raise serializers.ValidationError(
-            {"message": "Failed to redeem escrow", "error": e}
+        result = {"error": str(e)}
+
+    with transaction.atomic():
+        submitted = get_escrow_transaction(pk, EscrowTransaction.Status.PENDING)
+        # recorded, or signed again, by an overlapping delivery of the task
+        if submitted is None or submitted.tx_hash != escrow_tx.tx_hash:
+            return submitted
+        record_submission(submitted, result, resubmit)
+    return submitted
+
+
+def sign_escrow_transaction(escrow_tx):
+    signed = sign(build_escrow_transaction(escrow_tx), escrow_tx.job.company.xrp_seed)
+    escrow_tx.account = signed.account
+    escrow_tx.sequence = signed.sequence
+    escrow_tx.last_ledger_sequence = signed.last_ledger_sequence
+    escrow_tx.tx_hash = signed.get_hash()
+    escrow_tx.tx_blob = signed.blob()
+    escrow_tx.save()
+
+
+def record_submission(escrow_tx, result, resubmit):
+    """Record the preliminary result of submitting `escrow_tx`, queue what's next"""
+
+    if "engine_result" not in result:
+        escrow_tx.error = result["error"]
+        escrow_tx.save(update_fields=["error", "updated_at"])
+        queue_escrow_task("submit-escrow", escrow_tx, delay=settings.ESCROW_RETRY_DELAY)
+        return
+
+    engine_result = result["engine_result"]
+    escrow_tx.result = engine_result
+    # tefPAST_SEQ and tefALREADY on a resubmission mean it already got in, the
+    # confirmation tells by hash
+    already_in = resubmit and engine_result in ("tefPAST_SEQ", "tefALREADY")
+    if engine_result == "tefPAST_SEQ" and not resubmit:
+        # another transaction of the account took the sequence, sign it again
+        escrow_tx.tx_blob = escrow_tx.tx_hash = ""
+        escrow_tx.error = result.get("engine_result_message", engine_result)
+        escrow_tx.save()
+        queue_escrow_task("submit-escrow", escrow_tx, delay=settings.ESCROW_RETRY_DELAY)
+        return
+
+    if engine_result[:3] in ("tem", "tef") and not already_in:
+        escrow_tx.status = EscrowTransaction.Status.FAILED
+        escrow_tx.error = result.get("engine_result_message", engine_result)
+        escrow_tx.save(update_fields=["status", "result", "error", "updated_at"])
+        notify_escrow_transaction(escrow_tx)
+        return
+
+    escrow_tx.status = EscrowTransaction.Status.SUBMITTED
+    escrow_tx.error = ""
+    escrow_tx.save(update_fields=["status", "result", "error", "updated_at"])
+    queue_escrow_task("confirm-escrow", escrow_tx, delay=settings.ESCROW_CONFIRM_DELAY)
+
+
+def confirm_escrow_transaction(escrow_tx):
+    """
+    Record the final outcome of a submitted escrow transaction on it and the job.
+
+    Checks again later while the transaction may still be included in a ledger.
+    """
+    outcome = get_outcome(escrow_tx.tx_hash, escrow_tx.last_ledger_sequence)
+    if outcome is None:
+        queue_escrow_task(
+            "confirm-escrow", escrow_tx, delay=settings.ESCROW_CONFIRM_DELAY
         )
+        return escrow_tx
+
+    escrow_tx.result, escrow_tx.ledger_index = outcome
+    if escrow_tx.result != "tesSUCCESS":
+        escrow_tx.status = EscrowTransaction.Status.FAILED
+        escrow_tx.error = escrow_tx.result
+        escrow_tx.save()
+        notify_escrow_transaction(escrow_tx)
+        return escrow_tx
+
+    escrow_tx.status = EscrowTransaction.Status.VALIDATED
+    escrow_tx.save()
+
+    job = escrow_tx.job
+    if escrow_tx.kind == EscrowTransaction.Kind.CREATE:
+        job.escrow_sequence = escrow_tx.sequence
+        job.escrow_status = job.EscrowStatus.CREATED
+    else:
+        job.escrow_status = job.EscrowStatus.REDEEMED
+    job.save(update_fields=["escrow_sequence", "escrow_status", "updated_at"])
 
-    # update job escrow status
-    job.escrow_status = job.EscrowStatus.REDEEMED
-    job.save(update_fields=["escrow_status", "updated_at"])
+    notify_escrow_transaction(escrow_tx)
+    return escrow_tx
+
+
+def notify_escrow_transaction(escrow_tx):
+    """Push the final state of an escrow transaction to the company owner"""
+    job = escrow_tx.job
+    action = (
+        "creation" if escrow_tx.kind == EscrowTransaction.Kind.CREATE else "release"
+    )
+    state = "failed" if escrow_tx.status == EscrowTransaction.Status.FAILED else "done"
+    title = "Escrow Update"
+    body = f"Escrow {action} for {job.title} {state}"
+    data = {"escrow_transaction_id": str(escrow_tx.pk), "status": escrow_tx.status}
+    fcm_notify(job.company.user, title, body, custom_data=data)
+
+
+def notify_application(application):
+    """Push a new application to the owner and managers of the job's company"""
+    from fcm_django.models import FCMDevice
+
+    freelancer = application.freelancer
+    job = application.job
+    company = job.company
 
-    return {"message": "Escrow redeemed"}
+    devices = FCMDevice.objects.filter(
+        Q(user__companies_managed__company=company) | Q(user__company=company)
+    ).distinct()
+    title = "Job Application"
+    body = f"{freelancer.fullname or 'User'} applied for the Job titled {job.title}"
+    fcm_notify_bulk(title, body, devices=devices)
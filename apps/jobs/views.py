@@ -1,24 +1,42 @@
-from django.db.models import Q
+import json
+
+from django.db import transaction
+from django.db.models import Prefetch, Q
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.mixins import ListModelMixin, RetrieveModelMixin
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.viewsets import GenericViewSet, ModelViewSet
 
-from apps.common.permissions import IsAdmin, IsCompanyManager, IsCompanyOwner
+from apps.common.cache import CachedListMixin
+from apps.common.permissions import (
+    IsAdmin,
+    IsCompanyManager,
+    IsCompanyOwner,
+    IsCron,
+    IsTask,
+)
+from apps.common.serializers import get_query_list
+from apps.common.typeahead import TypeaheadMixin
+from apps.common.views import NonAtomicActionsMixin
+from apps.companies.models import Company
 
 from .filters import ApplicationFilter, JobSubmissionFilter
-from .models import Application, Job, JobBookmark, JobSubmission, Tag
+from .models import Application, EscrowTransaction, Job, JobBookmark, JobSubmission, Tag
 from .serializers import (
     ApplicationCreateSerializer,
+    ApplicationListSerializer,
     ApplicationReadSerializer,
     ApplicationSerializer,
     BookmarkReadSerializer,
     BookmarkSerializer,
     CreateEscrowSerializer,
+    EscrowTransactionSerializer,
+    JobListSerializer,
     JobReadSerializer,
     JobSerializer,
     JobSubmissionReadSerializer,
@@ -27,6 +45,11 @@ from .serializers import (
     TagSerializer,
     UpdateApplicationStatusSerializer,
 )
+from .utils import (
+    confirm_escrow_transaction,
+    get_escrow_transaction,
+    submit_escrow_transaction,
+)
 
 # api schema
 response_schema = openapi.Schema(
@@ -35,10 +58,55 @@ response_schema = openapi.Schema(
 )
 
 
-class TagView(ModelViewSet):
+# prefetch plans, each matches the relations a read serializer walks.
+# `prefix` is the lookup path to the related object e.g "job__"
+def job_prefetches(prefix=""):
+    """JobReadSerializer: company with stats and relations, tags and skills"""
+    return [
+        Prefetch(f"{prefix}company", queryset=Company.objects.with_details()),
+        f"{prefix}tags",
+        f"{prefix}skills",
+    ]
+
+
+def freelancer_prefetches(prefix=""):
+    """FreelancerBaseSerializer, the freelancer user must be select related"""
+    return [
+        f"{prefix}skills",
+        f"{prefix}work_experiences",
+        f"{prefix}portfolio_item",
+        f"{prefix}services",
+    ]
+
+
+def submission_prefetches(prefix=""):
+    """JobSubmissionBaseSerializer"""
+    return [
+        Prefetch(
+            f"{prefix}submission",
+            queryset=JobSubmission.objects.select_related("freelancer"),
+        )
+    ]
+
+
+def application_prefetches(prefix="", expand=("freelancer", "job", "submission")):
+    """ApplicationReadSerializer, or only the `expand`ed relations of the list"""
+    prefetches = []
+    if "freelancer" in expand:
+        prefetches += freelancer_prefetches(f"{prefix}freelancer__")
+    if "job" in expand:
+        prefetches += job_prefetches(f"{prefix}job__")
+    if "submission" in expand:
+        prefetches += submission_prefetches(prefix)
+    return prefetches
+
+
+class TagView(CachedListMixin, TypeaheadMixin, ModelViewSet):
     queryset = Tag.objects.all().order_by("created_at")
     serializer_class = TagSerializer
     permission_classes = [IsAdmin]
+    cache_tags = ("tags",)
+    typeahead_usages = ((Job.tags.through, "tag"),)
 
     http_method_names = [m for m in ModelViewSet.http_method_names if m not in ["put"]]
 
@@ -49,31 +117,39 @@ class TagView(ModelViewSet):
 
 
 class JobView(ModelViewSet):
-    queryset = (
-        Job.objects.select_related("company")
-        .prefetch_related("applicants")
-        .order_by("created_at")
-    )
+    queryset = Job.objects.order_by("created_at")
     serializer_class = JobSerializer
     search_fields = ("title", "description", "skills__name", "company__name")
+    search_vector_field = "search_vector"
     filterset_fields = ("company", "status")
 
+    def get_queryset(self):
+        if self.action == "retrieve":
+            return self.queryset.prefetch_related(*job_prefetches())
+        if self.action == "list":
+            if "company" in get_query_list(self.request, "expand"):
+                return self.queryset.prefetch_related(*job_prefetches())
+            return self.queryset.select_related("company").prefetch_related(
+                "tags", "skills"
+            )
+        return self.queryset
+
     def get_permissions(self):
         if self.action in ["create", "update", "partial_update", "delete"]:
             self.permission_classes = [IsAdmin | IsCompanyOwner | IsCompanyManager]
         return super().get_permissions()
 
     def get_serializer_class(self):
-        if self.action in ["retrieve", "list"]:
+        if self.action == "list":
+            self.serializer_class = JobListSerializer
+        if self.action == "retrieve":
             self.serializer_class = JobReadSerializer
         return super().get_serializer_class()
 
 
 class ApplicationView(ModelViewSet):
-    queryset = (
-        Application.objects.select_related("freelancer", "job")
-        .prefetch_related("submission")
-        .order_by("created_at")
+    queryset = Application.objects.select_related("freelancer__user", "job").order_by(
+        "created_at"
     )
     serializer_class = ApplicationSerializer
     filterset_class = ApplicationFilter
@@ -82,9 +158,17 @@ class ApplicationView(ModelViewSet):
         user = self.request.user
         if user.is_anonymous:
             return self.queryset.none()
+
+        queryset = self.queryset
+        if self.action == "retrieve":
+            queryset = queryset.prefetch_related(*application_prefetches())
+        if self.action == "list":
+            expand = get_query_list(self.request, "expand")
+            queryset = queryset.prefetch_related(*application_prefetches(expand=expand))
+
         if user.is_staff or user.role == user.Roles.ADMIN:
-            return self.queryset
-        return self.queryset.filter(
+            return queryset
+        return queryset.filter(
             Q(freelancer__user=user)
             | Q(job__company__managers__in=user.companies_managed.all())
             | Q(job__company__user=user)
@@ -93,7 +177,9 @@ class ApplicationView(ModelViewSet):
     def get_serializer_class(self):
         if self.action == "create":
             self.serializer_class = ApplicationCreateSerializer
-        if self.action in ["retrieve", "list"]:
+        if self.action == "list":
+            self.serializer_class = ApplicationListSerializer
+        if self.action == "retrieve":
             self.serializer_class = ApplicationReadSerializer
         if self.action == "create_escrow":
             self.serializer_class = CreateEscrowSerializer
@@ -152,7 +238,12 @@ class ApplicationView(ModelViewSet):
 
 
 class BookmarkView(ModelViewSet):
-    queryset = JobBookmark.objects.all().order_by("created_at")
+    queryset = (
+        JobBookmark.objects.select_related("freelancer__user", "job")
+        .prefetch_related(*freelancer_prefetches("freelancer__"))
+        .prefetch_related(*job_prefetches("job__"))
+        .order_by("created_at")
+    )
     serializer_class = BookmarkSerializer
     filterset_fields = ("freelancer", "job")
 
@@ -170,10 +261,81 @@ class BookmarkView(ModelViewSet):
         return super().get_serializer_class()
 
 
+class EscrowTransactionView(
+    NonAtomicActionsMixin, ListModelMixin, RetrieveModelMixin, GenericViewSet
+):
+    """
+    Escrow transactions of jobs, poll one to follow an escrow creation or release.
+    The submit and confirm actions are called by cloud tasks, reconcile by cron.
+    """
+
+    queryset = EscrowTransaction.objects.select_related("job__company__user")
+    serializer_class = EscrowTransactionSerializer
+    filterset_fields = ("job", "kind", "status")
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.is_anonymous:
+            return self.queryset.none()
+        if user.is_staff or user.role == user.Roles.ADMIN:
+            return self.queryset
+        return self.queryset.filter(
+            Q(job__company__user=user)
+            | Q(job__company__managers__user=user)
+            | Q(job__applicants__freelancer__user=user)
+        ).distinct()
+
+    def get_task_escrow_transaction(self, request, status):
+        body = json.loads(request.body.decode())
+        return get_escrow_transaction(body["escrow_transaction_id"], status)
+
+    @action(detail=False, methods=["POST"], permission_classes=[IsTask])
+    @transaction.non_atomic_requests
+    def submit(self, request):
+        """
+        Endpoint used in conjuction with cloud task to submit escrow transactions.
+        Outside of the request transaction, the signed blob is committed before
+        it is submitted.
+        """
+        body = json.loads(request.body.decode())
+        submit_escrow_transaction(body["escrow_transaction_id"])
+
+        return Response("OK", status=200)
+
+    @action(detail=False, methods=["POST"], permission_classes=[IsTask])
+    def confirm(self, request):
+        """Endpoint used in conjuction with cloud task to confirm escrow transactions"""
+        escrow_tx = self.get_task_escrow_transaction(
+            request, EscrowTransaction.Status.SUBMITTED
+        )
+        if escrow_tx:
+            confirm_escrow_transaction(escrow_tx)
+
+        return Response("OK", status=200)
+
+    @action(detail=False, methods=["GET"], permission_classes=[IsCron])
+    @transaction.non_atomic_requests
+    def reconcile(self, request):
+        """
+        Update the escrow state of jobs from the ledger, see apps.jobs.reconcile.
+        Each account is committed on its own, outside of the request transaction.
+        """
+        from .reconcile import reconcile_escrows
+
+        stats = reconcile_escrows()
+
+        return Response(stats)
+
+
 class JobSubmissionView(ModelViewSet):
-    queryset = JobSubmission.objects.select_related(
-        "application", "freelancer"
-    ).order_by("created_at")
+    queryset = (
+        JobSubmission.objects.select_related(
+            "application__job", "application__freelancer__user", "freelancer__user"
+        )
+        .prefetch_related(*application_prefetches("application__"))
+        .prefetch_related(*freelancer_prefetches("freelancer__"))
+        .order_by("created_at")
+    )
     serializer_class = JobSubmissionSerializer
     filterset_class = JobSubmissionFilter
     parser_classes = (JSONParser, FormParser, MultiPartParser)
@@ -0,0 +1,73 @@
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from firebase_admin import exceptions, messaging
+
+# FCM allows at most 500 tokens per multicast request
+MAX_MULTICAST_TOKENS = 500
+
+
+class FirebaseBackend:
+    """Send multicast messages with the Firebase Admin SDK"""
+
+    # errors meaning the token will never work again
+    invalid_token_errors = (
+        messaging.UnregisteredError,
+        messaging.SenderIdMismatchError,
+        exceptions.InvalidArgumentError,
+    )
+
+    def send_multicast(self, tokens, title, body, data=None):
+        """
+        Send one message to up to `MAX_MULTICAST_TOKENS` tokens.
+
+        Returns the list of tokens which are no longer valid.
+        """
+        message = messaging.MulticastMessage(
+            tokens=list(tokens),
+            notification=messaging.Notification(title=title, body=body),
+            data=data or {},
+        )
+        response = messaging.send_each_for_multicast(message)
+        return [
+            token
+            for token, result in zip(tokens, response.responses)
+            if not result.success
+            and isinstance(result.exception, self.invalid_token_errors)
+        ]
+
+
+class LocalBackend:
+    """
+    In memory stand-in for FCM used in tests and benchmarks.
+
+    Sent messages are kept in `outbox` and tokens starting with `invalid` are
+    reported as unregistered. `NOTIFICATIONS_LOCAL_BACKEND_DELAY` adds an artificial
+    delay in seconds per request to mimic the latency of FCM.
+    """
+
+    outbox = []
+
+    def send_multicast(self, tokens, title, body, data=None):
+        if len(tokens) > MAX_MULTICAST_TOKENS:
+            raise ValueError(f"At most {MAX_MULTICAST_TOKENS} tokens per multicast")
+
+        if settings.NOTIFICATIONS_LOCAL_BACKEND_DELAY:
+            time.sleep(settings.NOTIFICATIONS_LOCAL_BACKEND_DELAY)
+
+        self.outbox.append(
+            {"tokens": list(tokens), "title": title, "body": body, "data": data or {}}
+        )
+        return [token for token in tokens if token.startswith("invalid")]
+
+
+def get_notification_backend():
+    """Instance of the backend configured in `NOTIFICATIONS_BACKEND`"""
+    return _load_backend(settings.NOTIFICATIONS_BACKEND)
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path):
+    return import_string(path)()
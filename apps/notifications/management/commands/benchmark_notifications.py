@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from fcm_django.models import FCMDevice
+
+from apps.notifications.backends import LocalBackend
+from apps.notifications.utils import NotificationBatch
+from apps.users.models import User
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the push notification throughput against the local FCM stand-in. "
+        "Throwaway users and devices are created and rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("-u", "--users", type=int, default=1000)
+        parser.add_argument("-d", "--devices", type=int, default=2, help="Per user")
+        parser.add_argument(
+            "--invalid", type=float, default=0.01, help="Share of invalid tokens"
+        )
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write("running...")
+
+        try:
+            with transaction.atomic():
+                users = self.seed(kwargs["users"], kwargs["devices"], kwargs["invalid"])
+                self.benchmark(users)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, count, per_user, invalid):
+        users = User.objects.bulk_create(
+            [User(email=f"benchmark{i}@example.com") for i in range(count)],
+            batch_size=1000,
+        )
+        every = int(1 / invalid) if invalid else 0
+        devices = []
+        for i, user in enumerate(users):
+            for n in range(per_user):
+                prefix = "invalid" if every and (i * per_user + n) % every == 0 else ""
+                devices.append(
+                    FCMDevice(
+                        user=user, registration_id=f"{prefix}token-{i}-{n}", type="web"
+                    )
+                )
+        FCMDevice.objects.bulk_create(devices, batch_size=1000)
+        return users
+
+    def benchmark(self, users):
+        batch = NotificationBatch(backend=LocalBackend())
+        for user in users:
+            batch.add("Benchmark", "One event per user", users=[user.pk])
+        stats = batch.send()
+
+        self.stdout.write(
+            f"events={stats['events']} messages={stats['messages']} "
+            f"batches={stats['batches']} tokens={stats['tokens']} "
+            f"pruned={stats['pruned']} seconds={stats['seconds']:.3f} "
+            f"throughput={stats['throughput']:.0f}/s"
+        )
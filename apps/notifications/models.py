@@ -1,3 +1,29 @@
-# from django.db import models
+from django.conf import settings
+from django.db import models
 
-# Create your models here.
+from apps.common import models as base_models
+
+
+class PendingNotification(base_models.BaseModel):
+    """
+    Push notification waiting to be sent with the others of its batch window.
+
+    Rows are written in the transaction of the request that raised them and
+    drained by the send-notification task, see apps.notifications.utils.
+    Without a user every device is notified. `claimed_at` is set while a task
+    sends the notification.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="pending_notifications",
+    )
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("created_at",)
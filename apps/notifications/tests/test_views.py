@@ -0,0 +1,219 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import resolve
+from django.urls.base import reverse
+from fcm_django.models import FCMDevice
+from rest_framework import status
+
+from apps.notifications.backends import MAX_MULTICAST_TOKENS, LocalBackend
+from apps.notifications.models import PendingNotification
+from apps.notifications.utils import (
+    NotificationBatch,
+    fcm_notify,
+    fcm_notify_bulk,
+    send_notification,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def outbox():
+    LocalBackend.outbox.clear()
+    yield LocalBackend.outbox
+    LocalBackend.outbox.clear()
+
+
+def add_devices(user, count, prefix="token", active=True):
+    return FCMDevice.objects.bulk_create(
+        [
+            FCMDevice(
+                user=user,
+                registration_id=f"{prefix}-{user.pk}-{i}",
+                type="android",
+                active=active,
+            )
+            for i in range(count)
+        ]
+    )
+
+
+class TestNotificationBatch:
+    def test_notify_all_user_devices(self, user_factory, outbox):
+        user, other = user_factory(), user_factory()
+        devices = add_devices(user, 3)
+        add_devices(user, 1, prefix="old", active=False)
+        add_devices(other, 1)
+
+        fcm_notify(user, "Title", "Body", custom_data={"job_id": 1})
+
+        assert len(outbox) == 1
+        assert sorted(outbox[0]["tokens"]) == sorted(
+            device.registration_id for device in devices
+        )
+        assert outbox[0]["data"] == {"job_id": "1"}
+
+    def test_coalesce_into_multicast_batches(self, user_factory, outbox):
+        users = [user_factory() for _ in range(3)]
+        for user in users:
+            add_devices(user, 400)
+
+        batch = NotificationBatch()
+        for user in users:
+            batch.add("Title", "Body", users=[user.pk])
+        batch.add("Other", "Body", users=[users[0].pk])
+        stats = batch.send()
+
+        assert stats["events"] == 4
+        assert stats["messages"] == 2
+        # 1200 tokens of the shared message in 3 requests, plus 1 for the other
+        assert stats["batches"] == len(outbox) == 4
+        assert all(len(sent["tokens"]) <= MAX_MULTICAST_TOKENS for sent in outbox)
+        assert stats["tokens"] == 1600
+
+    def test_prune_invalid_tokens(self, user_factory, outbox):
+        user = user_factory()
+        add_devices(user, 2)
+        invalid = add_devices(user, 2, prefix="invalid")
+
+        stats = fcm_notify(user, "Title", "Body")
+
+        assert stats["pruned"] == 2
+        assert set(
+            FCMDevice.objects.filter(active=False).values_list(
+                "registration_id", flat=True
+            )
+        ) == {device.registration_id for device in invalid}
+
+        outbox.clear()
+        fcm_notify(user, "Title", "Body")
+        assert len(outbox[0]["tokens"]) == 2
+
+    def test_failed_batch_does_not_stop_others(self, user_factory, outbox):
+        class FlakyBackend(LocalBackend):
+            calls = 0
+
+            def send_multicast(self, tokens, title, body, data=None):
+                self.calls += 1
+                if self.calls == 1:
+                    raise ConnectionError
+                return super().send_multicast(tokens, title, body, data)
+
+        user = user_factory()
+        add_devices(user, 3)
+
+        batch = NotificationBatch(backend=FlakyBackend(), batch_size=2)
+        batch.add("Title", "Body", users=[user.pk])
+        stats = batch.send()
+
+        assert stats["failed_batches"] == 1
+        assert stats["tokens"] == 1
+        assert len(outbox) == 1
+
+    def test_notify_bulk_empty_devices(self, user_factory, outbox):
+        add_devices(user_factory(), 2)
+
+        fcm_notify_bulk("Title", "Body", devices=FCMDevice.objects.none())
+
+        assert outbox == []
+
+
+class TestSendNotification:
+    def test_send_notification_after_commit(
+        self, user, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        tasks = []
+        monkeypatch.setattr(
+            "apps.common.tasks.create_task",
+            lambda uri, **kwargs: tasks.append((uri, kwargs)),
+        )
+
+        with django_capture_on_commit_callbacks(execute=True):
+            send_notification(user, {"title": "Hello"})
+            assert tasks == []
+
+        assert tasks == [("send-notification", {"schedule_time": None})]
+        pending = PendingNotification.objects.get()
+        assert (pending.user, pending.title, pending.body) == (user, "Hello", "")
+
+    def test_send_notifications_in_one_batch(
+        self,
+        api_client,
+        user_factory,
+        outbox,
+        settings,
+        monkeypatch,
+        django_capture_on_commit_callbacks,
+    ):
+        settings.NOTIFICATIONS_BATCH_WINDOW = 2
+        tasks = []
+        monkeypatch.setattr(
+            "apps.common.tasks.create_task",
+            lambda uri, **kwargs: tasks.append((uri, kwargs)),
+        )
+        users = [user_factory() for _ in range(3)]
+        for user in users:
+            add_devices(user, 2)
+
+        # one request per event, only the first of the window queues a task
+        for user in users:
+            with django_capture_on_commit_callbacks(execute=True):
+                send_notification(user, {"title": "Hi", "body": "There"})
+        assert tasks == [("send-notification", {"schedule_time": 2})]
+
+        resp = api_client.post(reverse("api:notifications-send-notification"))
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert len(outbox) == 1
+        assert len(outbox[0]["tokens"]) == 6
+        assert outbox[0]["data"] == {"title": "Hi", "body": "There"}
+        assert not PendingNotification.objects.exists()
+
+    def test_failed_batch_kept_for_next_flush(
+        self, api_client, user_factory, outbox, monkeypatch
+    ):
+        tasks = []
+        monkeypatch.setattr(
+            "apps.common.tasks.create_task",
+            lambda uri, **kwargs: tasks.append(uri),
+        )
+        user, other = user_factory(), user_factory()
+        add_devices(user, 2)
+        add_devices(other, 2, prefix="down")
+        send_notification(user, {"title": "Hi"})
+        send_notification(other, {"title": "Other"})
+        tasks.clear()
+
+        send_multicast = LocalBackend.send_multicast
+
+        def flaky(self, tokens, title, body, data=None):
+            if tokens[0].startswith("down"):
+                raise ConnectionError("FCM unavailable")
+            return send_multicast(self, tokens, title, body, data)
+
+        monkeypatch.setattr(LocalBackend, "send_multicast", flaky)
+        url = reverse("api:notifications-send-notification")
+        resp = api_client.post(url)
+
+        # only the notification that went out is removed, a flush is queued again
+        kept = PendingNotification.objects.get()
+        assert resp.status_code == status.HTTP_200_OK
+        assert (kept.user, kept.claimed_at) == (other, None)
+        assert [sent["title"] for sent in outbox] == ["Hi"]
+        assert tasks == ["send-notification"]
+        assert resolve(url).func._non_atomic_requests == {"default"}
+
+        monkeypatch.setattr(LocalBackend, "send_multicast", send_multicast)
+        api_client.post(url)
+
+        assert [sent["title"] for sent in outbox] == ["Hi", "Other"]
+        assert not PendingNotification.objects.exists()
+
+    def test_benchmark_notifications(self, outbox):
+        out = StringIO()
+        call_command("benchmark_notifications", users=300, devices=2, stdout=out)
+
+        assert "batches=2 tokens=600 pruned=6" in out.getvalue()
+        assert not FCMDevice.objects.exists()
@@ -1,9 +1,193 @@
-# from django.conf import settings
+import json
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
 from fcm_django.models import FCMDevice
-from firebase_admin.messaging import Message, Notification
+from firebase_admin.messaging import Message
+
+from .backends import MAX_MULTICAST_TOKENS, get_notification_backend
+from .models import PendingNotification
 
 # from twilio.rest import Client
 
+logger = logging.getLogger(__name__)
+
+FLUSH_LOCK_KEY = "notifications-flush"
+
+
+class NotificationMetrics:
+    """Running totals of the notifications sent by this process"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.events = 0
+        self.messages = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.tokens = 0
+        self.pruned = 0
+        self.seconds = 0.0
+
+    def record(self, stats):
+        for name, value in stats.items():
+            if name != "throughput":
+                setattr(self, name, getattr(self, name) + value)
+
+    def snapshot(self):
+        return {
+            "events": self.events,
+            "messages": self.messages,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "tokens": self.tokens,
+            "pruned": self.pruned,
+            "seconds": self.seconds,
+            "throughput": self.tokens / self.seconds if self.seconds else 0.0,
+        }
+
+
+metrics = NotificationMetrics()
+
+
+def encode_data(data):
+    """FCM data payloads only take string values"""
+    return {
+        str(key): value if isinstance(value, str) else json.dumps(value)
+        for key, value in (data or {}).items()
+    }
+
+
+class NotificationBatch:
+    """
+    Coalesces notification events into FCM multicast requests.
+
+    Events carrying the same title, body and data are merged so their recipients
+    share requests of at most `MAX_MULTICAST_TOKENS` tokens. Every active device of
+    a user is targeted and tokens FCM reports as invalid are deactivated.
+
+    Usage:
+        batch = NotificationBatch()
+        batch.add("Title", "Body", users=[user.pk])
+        batch.add("Title", "Body", users=[other.pk])
+        stats = batch.send()
+    """
+
+    def __init__(self, backend=None, batch_size=MAX_MULTICAST_TOKENS):
+        self.backend = backend or get_notification_backend()
+        self.batch_size = min(batch_size, MAX_MULTICAST_TOKENS)
+        self.events = 0
+        # message -> {"users": set of user ids, "devices": querysets, "all": bool}
+        self.recipients = defaultdict(
+            lambda: {"users": set(), "devices": [], "all": False}
+        )
+        # message -> tokens of the batches that failed in the last `send`
+        self.failed = {}
+
+    def add(self, title, body, data=None, users=None, devices=None):
+        """
+        Queue a notification.
+
+        Params:
+            users: ids of the users to notify on all of their devices
+            devices: `FCMDevice` queryset to notify
+        Without users or devices every active device is notified.
+        """
+        recipients = self.recipients[self.key(title, body, data)]
+        if users is not None:
+            recipients["users"].update(str(pk) for pk in users)
+        elif devices is not None:
+            recipients["devices"].append(devices)
+        else:
+            recipients["all"] = True
+        self.events += 1
+
+    @staticmethod
+    def key(title, body, data=None):
+        """Notifications with the same key are merged into one message"""
+        data = encode_data(data)
+        return (title or "Notification", body or "", tuple(sorted(data.items())))
+
+    def get_tokens(self, recipients):
+        """Distinct registration ids of the active devices of the recipients"""
+
+        if recipients["all"]:
+            querysets = [FCMDevice.objects.all()]
+        else:
+            querysets = list(recipients["devices"])
+            if recipients["users"]:
+                querysets.append(
+                    FCMDevice.objects.filter(user_id__in=recipients["users"])
+                )
+
+        tokens = {}
+        for queryset in querysets:
+            rows = queryset.filter(active=True).values_list(
+                "registration_id", flat=True
+            )
+            tokens.update(dict.fromkeys(rows))
+        return list(tokens)
+
+    def send(self):
+        """Send the queued notifications, returns the stats of the run"""
+
+        stats = {
+            "events": self.events,
+            "messages": len(self.recipients),
+            "batches": 0,
+            "failed_batches": 0,
+            "tokens": 0,
+            "pruned": 0,
+        }
+        start = time.perf_counter()
+        invalid = []
+        self.failed = {}
+        for (title, body, data), recipients in self.recipients.items():
+            tokens = self.get_tokens(recipients)
+            for offset in range(0, len(tokens), self.batch_size):
+                end = offset + self.batch_size
+                chunk = tokens[offset:end]
+                stats["batches"] += 1
+                try:
+                    invalid += self.backend.send_multicast(
+                        chunk, title, body, dict(data)
+                    )
+                except Exception:
+                    # keep going, the other batches may still get through
+                    logger.exception("Failed to send %s notifications", len(chunk))
+                    stats["failed_batches"] += 1
+                    self.failed.setdefault((title, body, data), []).extend(chunk)
+                    continue
+                stats["tokens"] += len(chunk)
+
+        if invalid:
+            stats["pruned"] = FCMDevice.objects.filter(
+                registration_id__in=invalid
+            ).update(active=False)
+
+        stats["seconds"] = time.perf_counter() - start
+        stats["throughput"] = (
+            stats["tokens"] / stats["seconds"] if stats["seconds"] else 0.0
+        )
+        self.recipients.clear()
+        self.events = 0
+
+        metrics.record(stats)
+        logger.info(
+            "Sent %(events)s notification events in %(batches)s batches to "
+            "%(tokens)s devices (%(throughput).0f/s), pruned %(pruned)s",
+            stats,
+        )
+        return stats
+
 
 # Manually handle notification on app
 def send_fcm(user, title, data=None):
@@ -34,38 +218,124 @@ def send_fcm_bulk(title, data=None):
 
 # FCM handle notification on app automatically
 def fcm_notify(user, title, body, custom_data={}):
-    device = FCMDevice.objects.filter(user=user).first()
-    if device:
-        device.send_message(
-            Message(notification=Notification(title=title, body=body), data=custom_data)
-        )
+    """Notify every active device of `user`"""
+
+    batch = NotificationBatch()
+    batch.add(title, body, data=custom_data, users=[user.pk])
+    return batch.send()
 
 
 # FCM handle notification on app automatically
 def fcm_notify_bulk(title, body, custom_data={}, devices=None):
-    if devices:
-        devices = devices
-    else:
-        devices = FCMDevice.objects.all()
-    devices.send_message(
-        Message(notification=Notification(title=title, body=body), data=custom_data)
-    )
+    """Notify `devices`, or every active device when not given"""
+
+    batch = NotificationBatch()
+    batch.add(title, body, data=custom_data, devices=devices)
+    return batch.send()
 
 
 def send_notification(user=None, data=None):
-    """Util function to send nofication with cloud task"""
+    """
+    Util function to send nofication with cloud task.
+
+    The notification is buffered with the current transaction and sent with the
+    others raised within `NOTIFICATIONS_BATCH_WINDOW` seconds, by a single task
+    queued once the transaction commits. Without a user every device is notified.
+    """
+    data = data or {}
+    PendingNotification.objects.create(
+        user=user, title=data.get("title") or "Notification", body=data.get("body", "")
+    )
+    transaction.on_commit(queue_flush)
 
-    from api_project.common.tasks import create_task
 
-    payload = {
-        "user_id": str(user.pk) if user else None,
-        "data": {
-            "title": data["title"] if hasattr(data, "title") else "Notification",
-            "body": data["body"] if hasattr(data, "body") else "",
-        },
-    }
+def queue_flush():
+    """Queue a send-notification task, unless one is already due in this window"""
+    from apps.common.tasks import create_task
+
+    window = settings.NOTIFICATIONS_BATCH_WINDOW
+    if cache.add(FLUSH_LOCK_KEY, True, timeout=window):
+        create_task("send-notification", schedule_time=window or None)
+
+
+def flush_notifications():
+    """
+    Send the buffered notifications as one `NotificationBatch`, returns the stats.
+
+    The rows are claimed in a short transaction, with SKIP LOCKED so overlapping
+    tasks don't send the same notification twice, and sent outside of it. Only
+    the notifications that went out are removed, the others are released and a
+    flush queued again.
+    """
+    pending = claim_notifications()
+    if not pending:
+        return None
 
-    create_task("send-notification", payload=payload)
+    batch = NotificationBatch()
+    for notification in pending:
+        batch.add(
+            notification.title,
+            notification.body,
+            data={"title": notification.title, "body": notification.body},
+            users=[notification.user_id] if notification.user_id else None,
+        )
+    stats = batch.send()
+
+    failed = get_failed_notifications(pending, batch.failed)
+    PendingNotification.objects.filter(
+        pk__in=[n.pk for n in pending if n.pk not in failed]
+    ).delete()
+    if failed:
+        logger.warning("%s notifications kept for the next flush", len(failed))
+        PendingNotification.objects.filter(pk__in=failed).update(claimed_at=None)
+        queue_flush()
+    return stats
+
+
+def claim_notifications():
+    """Pending notifications not claimed by another task, claimed for this one"""
+
+    now = timezone.now()
+    expired = now - timedelta(seconds=settings.NOTIFICATIONS_CLAIM_TIMEOUT)
+    with transaction.atomic():
+        pending = list(
+            PendingNotification.objects.select_for_update(skip_locked=True).filter(
+                Q(claimed_at__isnull=True) | Q(claimed_at__lt=expired)
+            )
+        )
+        PendingNotification.objects.filter(pk__in=[n.pk for n in pending]).update(
+            claimed_at=now
+        )
+    return pending
+
+
+def get_failed_notifications(pending, failed):
+    """Ids of the `pending` notifications sent in a batch that failed"""
+
+    if not failed:
+        return set()
+
+    tokens = [token for chunk in failed.values() for token in chunk]
+    owners = dict(
+        FCMDevice.objects.filter(registration_id__in=tokens).values_list(
+            "registration_id", "user_id"
+        )
+    )
+    # message -> users owning a device the message didn't reach
+    missed = {
+        key: {str(owners.get(token)) for token in chunk}
+        for key, chunk in failed.items()
+    }
+    ids = set()
+    for notification in pending:
+        data = {"title": notification.title, "body": notification.body}
+        users = missed.get(
+            NotificationBatch.key(notification.title, notification.body, data)
+        )
+        # broadcasts are sent again to every device
+        if users and (not notification.user_id or str(notification.user_id) in users):
+            ids.add(notification.pk)
+    return ids
 
 
 # Send sms
@@ -1,39 +1,52 @@
 import json
 
-from django.contrib.auth import get_user_model
+from django.db import transaction
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
 from apps.common.email import send_email_template
 from apps.common.permissions import IsTask
+from apps.common.views import NonAtomicActionsMixin
+from apps.jobs.models import Application
+from apps.jobs.utils import notify_application
 
-from .utils import fcm_notify, fcm_notify_bulk  # send_sms
+from .utils import flush_notifications  # send_sms
 
-User = get_user_model()
 
-
-class NotificationViewSet(ViewSet):
+class NotificationViewSet(NonAtomicActionsMixin, ViewSet):
     permission_classes = [IsTask]
 
     @action(methods=["post"], detail=False, url_path="send-notification")
+    @transaction.non_atomic_requests
     def send_notification(self, request):
-        req = json.loads(request.body.decode())
-
-        data = req.get("data")
-        user_id = req.get("user_id")
-        title = data.get("title", None)
-        body = data.get("body")
-
-        # if user_id use single else use bulk
-        if user_id:
-            user = User.objects.filter(pk=user_id).first()
-            if user:
-                fcm_notify(user, title=title, body=body, custom_data=data)
-                # send_fcm(user, title=title, data=data)
-        else:
-            fcm_notify_bulk(title, body, custom_data=data)
-            # send_fcm_bulk(title, data=data)
+        """
+        Endpoint used in conjuction with cloud task to send push notifications.
+
+        Sends every notification buffered by `send_notification` as one batch,
+        coalesced into as few FCM requests as possible. Runs outside of the
+        request transaction so the notifications are claimed before sending.
+        """
+        flush_notifications()
+
+        return Response("OK", status=200)
+
+    @action(methods=["POST"], detail=False, url_path="notify-application")
+    def notify_application(self, request):
+        """
+        Endpoint used in conjuction with cloud task to notify a company of a new
+        job application
+        """
+        body = json.loads(request.body.decode())
+
+        application = (
+            Application.objects.select_related("freelancer", "job__company")
+            .filter(pk=body["application_id"])
+            .first()
+        )
+        # the application may have been withdrawn before the task ran
+        if application:
+            notify_application(application)
 
         return Response("OK", status=200)
 
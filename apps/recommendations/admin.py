@@ -1,3 +1,13 @@
-# from django.contrib import admin
+from django.contrib import admin
 
-# Register your models here.
+from .models import JobRecommendation, JobScore
+
+
+@admin.register(JobScore)
+class JobScoreAdmin(admin.ModelAdmin):
+    list_display = ["freelancer", "job", "created_at", "updated_at"]
+
+
+@admin.register(JobRecommendation)
+class JobRecommendationAdmin(admin.ModelAdmin):
+    list_display = ["freelancer", "job", "score", "created_at", "updated_at"]
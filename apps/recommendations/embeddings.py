@@ -0,0 +1,258 @@
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.files import File
+from django.utils.module_loading import import_string
+
+from .backends import get_openai_client
+
+TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+logger = logging.getLogger(__name__)
+
+# process wide index loaded from disk, reloaded when the file changes
+_index_cache = {"path": None, "mtime": None, "index": None, "synced": None}
+
+
+class HashingEmbedder:
+    """
+    Deterministic local embedder.
+
+    Hashes word tokens into a fixed size vector. Needs no network, so it is used in
+    tests and works as an offline fallback.
+    """
+
+    def __init__(self, dimensions=512):
+        self.dimensions = dimensions
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in TOKEN_RE.findall(text.lower()):
+                digest = hashlib.md5(token.encode()).digest()
+                column = int.from_bytes(digest[:4], "little") % self.dimensions
+                sign = 1 if digest[4] & 1 else -1
+                vectors[row, column] += sign
+        return vectors
+
+
+class OpenAIEmbedder:
+    """Embed texts with the OpenAI embeddings API"""
+
+    model = "text-embedding-3-small"
+
+    def embed(self, texts):
+        response = get_openai_client().embeddings.create(
+            model=self.model, input=list(texts)
+        )
+        return np.array([item.embedding for item in response.data], dtype=np.float32)
+
+
+def get_embedder():
+    return import_string(settings.RECOMMENDATIONS_EMBEDDER)()
+
+
+def freelancer_document(freelancer):
+    """Text describing a freelancer profile"""
+
+    parts = [freelancer.title, freelancer.bio]
+    parts += [skill.name for skill in freelancer.skills.all()]
+    for experience in freelancer.work_experiences.all():
+        parts += [experience.job_title, experience.job_description]
+    return "\n".join(part for part in parts if part)
+
+
+def job_document(job):
+    """Text describing a job"""
+
+    parts = [job.title, job.description, job.responsibilities, job.experience]
+    parts += [skill.name for skill in job.skills.all()]
+    return "\n".join(part for part in parts if part)
+
+
+def normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+class FreelancerIndex:
+    """
+    Vector index of freelancer profiles.
+
+    Vectors are stored L2 normalized so cosine similarity is a single dot product.
+    """
+
+    def __init__(self, ids, vectors):
+        self.ids = [str(pk) for pk in ids]
+        self.vectors = normalize(np.asarray(vectors, dtype=np.float32))
+        self.positions = {pk: position for position, pk in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, pk):
+        return str(pk) in self.positions
+
+    @classmethod
+    def build(cls, freelancers, embedder=None):
+        embedder = embedder or get_embedder()
+        freelancers = list(freelancers)
+        if not freelancers:
+            return cls([], np.zeros((0, 0), dtype=np.float32))
+
+        vectors = embedder.embed([freelancer_document(f) for f in freelancers])
+        return cls([f.pk for f in freelancers], vectors)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["ids"].tolist(), data["vectors"])
+
+    def save(self, path):
+        # write to a temp file first so readers never see a partial index
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, ids=np.array(self.ids), vectors=self.vectors)
+        os.replace(tmp_path, path)
+
+    def query(self, vector, k, ids=None):
+        """
+        Top `k` freelancers by cosine similarity to `vector`.
+
+        Pass `ids` to restrict the search to those freelancers.
+        Returns a list of `(freelancer_id, similarity)` ordered best first.
+        """
+        if not self.ids:
+            return []
+
+        positions = np.arange(len(self.ids))
+        if ids is not None:
+            positions = np.array(
+                [self.positions[str(pk)] for pk in ids if str(pk) in self.positions],
+                dtype=int,
+            )
+            if not len(positions):
+                return []
+
+        vector = normalize(np.asarray(vector, dtype=np.float32).reshape(1, -1))[0]
+        similarities = self.vectors[positions] @ vector
+
+        k = min(k, len(positions))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+        return [(self.ids[positions[i]], float(similarities[i])) for i in top]
+
+
+def get_freelancer_index():
+    """
+    Index persisted at `RECOMMENDATIONS_INDEX_PATH`, loaded once per process.
+
+    With `RECOMMENDATIONS_INDEX_STORAGE` set, the published index is pulled into that
+    path first, checked again every `RECOMMENDATIONS_INDEX_SYNC_INTERVAL` seconds.
+    """
+
+    path = settings.RECOMMENDATIONS_INDEX_PATH
+    if settings.RECOMMENDATIONS_INDEX_STORAGE:
+        now = time.monotonic()
+        synced = _index_cache["synced"]
+        if (
+            synced is None
+            or now - synced >= settings.RECOMMENDATIONS_INDEX_SYNC_INTERVAL
+        ):
+            _index_cache["synced"] = now
+            try:
+                sync_freelancer_index(path)
+            except Exception:
+                logger.exception(
+                    "Could not sync the freelancer index, using local copy"
+                )
+
+    if not os.path.exists(path):
+        return None
+
+    mtime = os.path.getmtime(path)
+    if _index_cache["path"] != path or _index_cache["mtime"] != mtime:
+        _index_cache.update(path=path, mtime=mtime, index=FreelancerIndex.load(path))
+    return _index_cache["index"]
+
+
+def build_freelancer_index(freelancers, path=None, embedder=None):
+    """Embed freelancers and persist the index to disk"""
+
+    index = FreelancerIndex.build(freelancers, embedder=embedder)
+    path = path or settings.RECOMMENDATIONS_INDEX_PATH
+    index.save(path)
+    if settings.RECOMMENDATIONS_INDEX_STORAGE:
+        publish_freelancer_index(path)
+    return index
+
+
+def get_index_storage():
+    return import_string(settings.RECOMMENDATIONS_INDEX_STORAGE)()
+
+
+def publish_freelancer_index(path):
+    """Upload the index at `path` to `RECOMMENDATIONS_INDEX_STORAGE`"""
+
+    storage = get_index_storage()
+    name = settings.RECOMMENDATIONS_INDEX_STORAGE_NAME
+    if storage.exists(name):
+        storage.delete(name)
+    with open(path, "rb") as f:
+        storage.save(name, File(f))
+
+
+def sync_freelancer_index(path):
+    """Download the published index to `path` when it is newer than the local copy"""
+
+    storage = get_index_storage()
+    name = settings.RECOMMENDATIONS_INDEX_STORAGE_NAME
+    if not storage.exists(name):
+        return
+
+    published = storage.get_modified_time(name).timestamp()
+    if os.path.exists(path) and os.path.getmtime(path) >= published:
+        return
+
+    # download next to `path` and swap it in so readers never see a partial index
+    directory = os.path.dirname(path) or "."
+    with storage.open(name, "rb") as remote, tempfile.NamedTemporaryFile(
+        dir=directory, suffix=".npz", delete=False
+    ) as local:
+        shutil.copyfileobj(remote, local)
+    os.replace(local.name, path)
+
+
+def shortlist_freelancers(job, freelancers=None, k=20, embedder=None):
+    """
+    Pre-rank freelancers for a job by embedding similarity.
+
+    Uses the persisted index and embeds on the fly only the candidates missing from
+    it. Without `freelancers` the whole index is searched.
+    Returns a list of `(freelancer_id, similarity)` ordered best first.
+    """
+    embedder = embedder or get_embedder()
+    index = get_freelancer_index()
+    job_vector = embedder.embed([job_document(job)])[0]
+
+    if freelancers is None:
+        return index.query(job_vector, k) if index else []
+
+    freelancers = list(freelancers)
+    ids = [f.pk for f in freelancers]
+    results = index.query(job_vector, k, ids=ids) if index else []
+
+    missing = [f for f in freelancers if index is None or f.pk not in index]
+    if missing:
+        extra = FreelancerIndex.build(missing, embedder=embedder)
+        results += extra.query(job_vector, k)
+        results.sort(key=lambda item: item[1], reverse=True)
+
+    return results[:k]
@@ -0,0 +1,218 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+from apps.freelancers.models import Freelancer
+from apps.jobs.models import Job
+
+from .models import JobRecommendation, JobScore
+from .utils import get_content_hash, get_job_description, get_score_value
+
+# job fields that change whether a job is recommended or its llm score freshness
+FEED_JOB_FIELDS = {"status", "description", "responsibilities", "experience"}
+
+JobSkill = Job.skills.through
+JobTag = Job.tags.through
+FreelancerSkill = Freelancer.skills.through
+
+
+def get_match_score(matched, requirements):
+    """Share of a job's skills and tags a freelancer has, on the 0-5 job score scale"""
+
+    if not requirements:
+        return 0
+    return round(5 * matched / requirements, 2)
+
+
+def get_feed_score(match_score, llm_score=None):
+    """Ranking score of a recommendation, refined by the llm score when there is one"""
+
+    if llm_score is None:
+        return match_score
+    return round((match_score + llm_score) / 2, 2)
+
+
+def get_llm_score(job_score):
+    """Numeric score of a completed job score, None when it has no usable score"""
+
+    if job_score.status != JobScore.Status.COMPLETED:
+        return None
+    score = get_score_value(job_score.result)
+    return score if score >= 0 else None
+
+
+def get_llm_scores(job_scores, freelancer_skills, job_descriptions):
+    """
+    Scores of completed job scores whose inputs are unchanged.
+
+    `freelancer_skills` and `job_descriptions` map ids to the current inputs.
+    Returns a dict keyed on `(freelancer_id, job_id)`.
+    """
+    scores = {}
+    for job_score in job_scores:
+        content_hash = get_content_hash(
+            freelancer_skills[job_score.freelancer_id],
+            job_descriptions[job_score.job_id],
+        )
+        if job_score.content_hash == content_hash:
+            key = (job_score.freelancer_id, job_score.job_id)
+            scores[key] = get_llm_score(job_score)
+    return scores
+
+
+def build_recommendation(freelancer_id, job_id, matched, requirements, llm_score):
+    match_score = get_match_score(matched, requirements)
+    return JobRecommendation(
+        freelancer_id=freelancer_id,
+        job_id=job_id,
+        matched_skills=matched,
+        match_score=match_score,
+        llm_score=llm_score,
+        score=get_feed_score(match_score, llm_score),
+    )
+
+
+def refresh_freelancer_recommendations(freelancer):
+    """
+    Recompute the recommended jobs of a freelancer.
+
+    Only active jobs sharing at least one skill, or a tag named like one of the
+    freelancer's skills, are considered.
+    """
+    skills = dict(
+        FreelancerSkill.objects.filter(freelancer=freelancer).values_list(
+            "skill_id", "skill__name"
+        )
+    )
+    names = {name.lower() for name in skills.values()}
+
+    matches = defaultdict(int)
+    skill_matches = JobSkill.objects.filter(
+        skill_id__in=skills, job__status=Job.Status.ACTIVE
+    ).values_list("job_id", flat=True)
+    tag_matches = (
+        JobTag.objects.annotate(name=Lower("tag__name"))
+        .filter(name__in=names, job__status=Job.Status.ACTIVE)
+        .values_list("job_id", flat=True)
+    )
+    for job_id in [*skill_matches, *tag_matches]:
+        matches[job_id] += 1
+
+    jobs = (
+        Job.objects.filter(pk__in=matches)
+        .annotate(
+            skill_count=Count("skills", distinct=True),
+            tag_count=Count("tags", distinct=True),
+        )
+        .only("description", "responsibilities", "experience")
+    )
+    jobs = {job.pk: job for job in jobs}
+
+    job_scores = JobScore.objects.filter(freelancer=freelancer, job__in=jobs)
+    llm_scores = get_llm_scores(
+        job_scores,
+        {freelancer.pk: sorted(skills.values())},
+        {pk: get_job_description(job) for pk, job in jobs.items()},
+    )
+
+    recommendations = [
+        build_recommendation(
+            freelancer.pk,
+            pk,
+            matches[pk],
+            job.skill_count + job.tag_count,
+            llm_scores.get((freelancer.pk, pk)),
+        )
+        for pk, job in jobs.items()
+    ]
+
+    with transaction.atomic():
+        JobRecommendation.objects.filter(freelancer=freelancer).delete()
+        JobRecommendation.objects.bulk_create(recommendations)
+    return recommendations
+
+
+def refresh_job_recommendations(job):
+    """
+    Recompute the freelancers a job is recommended to.
+
+    Inactive jobs are removed from every feed.
+    """
+    if job.status != Job.Status.ACTIVE:
+        JobRecommendation.objects.filter(job=job).delete()
+        return []
+
+    skill_ids = set(JobSkill.objects.filter(job=job).values_list("skill_id", flat=True))
+    tag_names = Counter(
+        name.lower()
+        for name in JobTag.objects.filter(job=job).values_list("tag__name", flat=True)
+    )
+    requirements = len(skill_ids) + sum(tag_names.values())
+
+    matches = defaultdict(int)
+    skill_matches = FreelancerSkill.objects.filter(skill_id__in=skill_ids).values_list(
+        "freelancer_id", flat=True
+    )
+    tag_matches = (
+        FreelancerSkill.objects.annotate(name=Lower("skill__name"))
+        .filter(name__in=tag_names)
+        .values_list("freelancer_id", "name")
+        .distinct()
+    )
+    for freelancer_id in skill_matches:
+        matches[freelancer_id] += 1
+    for freelancer_id, name in tag_matches:
+        matches[freelancer_id] += tag_names[name]
+
+    job_scores = list(JobScore.objects.filter(job=job, freelancer__in=matches))
+    freelancer_skills = defaultdict(list)
+    for freelancer_id, name in FreelancerSkill.objects.filter(
+        freelancer__in=[job_score.freelancer_id for job_score in job_scores]
+    ).values_list("freelancer_id", "skill__name"):
+        freelancer_skills[freelancer_id].append(name)
+    llm_scores = get_llm_scores(
+        job_scores,
+        {pk: sorted(names) for pk, names in freelancer_skills.items()},
+        {job.pk: get_job_description(job)},
+    )
+
+    recommendations = [
+        build_recommendation(
+            pk, job.pk, matched, requirements, llm_scores.get((pk, job.pk))
+        )
+        for pk, matched in matches.items()
+    ]
+
+    with transaction.atomic():
+        JobRecommendation.objects.filter(job=job).delete()
+        JobRecommendation.objects.bulk_create(recommendations)
+    return recommendations
+
+
+def apply_job_scores(job_scores):
+    """Refine existing recommendations with newly stored job scores"""
+
+    llm_scores = {
+        (job_score.freelancer_id, job_score.job_id): get_llm_score(job_score)
+        for job_score in job_scores
+    }
+    if not llm_scores:
+        return
+
+    freelancer_ids = {freelancer_id for freelancer_id, _ in llm_scores}
+    job_ids = {job_id for _, job_id in llm_scores}
+    recommendations = [
+        recommendation
+        for recommendation in JobRecommendation.objects.filter(
+            freelancer__in=freelancer_ids, job__in=job_ids
+        )
+        if (recommendation.freelancer_id, recommendation.job_id) in llm_scores
+    ]
+    for recommendation in recommendations:
+        llm_score = llm_scores[(recommendation.freelancer_id, recommendation.job_id)]
+        recommendation.llm_score = llm_score
+        recommendation.score = get_feed_score(recommendation.match_score, llm_score)
+
+    JobRecommendation.objects.bulk_update(recommendations, ["llm_score", "score"])
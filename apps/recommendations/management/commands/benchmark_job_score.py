@@ -0,0 +1,132 @@
+import itertools
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.freelancers.models import Freelancer
+from apps.jobs.models import Job
+
+MODES = ["cached", "uncached", "batch"]
+
+
+def percentile(values, pct):
+    """Nearest rank percentile of a list of numbers"""
+    values = sorted(values)
+    index = max(0, math.ceil(pct / 100 * len(values)) - 1)
+    return values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure throughput and p50/p99 latency of the job score endpoints of a running "
+        "server under concurrent load. Run the server with "
+        "RECOMMENDATIONS_SCORING_BACKEND=apps.recommendations.backends.LocalScoringBackend "
+        "to benchmark without calling OpenAI."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-u", "--url", type=str, default="http://127.0.0.1:8000", help="Server URL"
+        )
+        parser.add_argument("-t", "--token", type=str, help="JWT access token")
+        parser.add_argument("-e", "--email", type=str, help="Login email")
+        parser.add_argument("-p", "--password", type=str, help="Login password")
+        parser.add_argument(
+            "-m",
+            "--mode",
+            type=str,
+            choices=MODES,
+            action="append",
+            help="Modes to run",
+        )
+        parser.add_argument("-n", "--requests", type=int, default=100)
+        parser.add_argument("-c", "--concurrency", type=int, default=10)
+        parser.add_argument(
+            "-b", "--batch-size", type=int, default=10, help="Freelancers per batch"
+        )
+
+    def handle(self, *args, **kwargs):
+        base_url = kwargs["url"].rstrip("/")
+        token = kwargs.get("token") or self.login(
+            base_url, kwargs.get("email"), kwargs.get("password")
+        )
+
+        jobs = list(Job.objects.values_list("id", flat=True)[:10])
+        freelancers = list(
+            Freelancer.objects.values_list("id", flat=True)[: kwargs["batch_size"]]
+        )
+        if not jobs or not freelancers:
+            raise CommandError("At least one job and one freelancer are required")
+
+        pairs = itertools.cycle(itertools.product(jobs, freelancers))
+        client = httpx.Client(
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=120,
+            limits=httpx.Limits(max_connections=kwargs["concurrency"]),
+        )
+
+        total = kwargs["requests"]
+        for mode in kwargs.get("mode") or MODES:
+            if mode == "batch":
+                url = f"{base_url}/api/recommendations/job-score-batch/"
+                payloads = [
+                    {
+                        "job": str(job),
+                        "freelancers": [str(f) for f in freelancers],
+                        "refresh": True,
+                    }
+                    for job in itertools.islice(itertools.cycle(jobs), total)
+                ]
+            else:
+                url = f"{base_url}/api/recommendations/job-score/"
+                payloads = [
+                    {
+                        "job": str(job),
+                        "freelancer": str(freelancer),
+                        "refresh": mode == "uncached",
+                    }
+                    for job, freelancer in itertools.islice(pairs, total)
+                ]
+                if mode == "cached":
+                    # warm the stored scores so every measured request is a hit
+                    for payload in {tuple(p.items()): p for p in payloads}.values():
+                        client.post(url, json=payload)
+
+            self.report(mode, *self.run(client, url, payloads, kwargs["concurrency"]))
+
+    def login(self, base_url, email, password):
+        if not email or not password:
+            raise CommandError("Provide --token or --email and --password")
+
+        resp = httpx.post(
+            f"{base_url}/api/auth/login/", json={"email": email, "password": password}
+        )
+        if resp.status_code != 200:
+            raise CommandError(f"Login failed: {resp.text}")
+        return resp.json()["data"]["access"]
+
+    def run(self, client, url, payloads, concurrency):
+        def send(payload):
+            start = time.perf_counter()
+            resp = client.post(url, json=payload)
+            return time.perf_counter() - start, resp.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(send, payloads))
+        elapsed = time.perf_counter() - started
+
+        latencies = [latency for latency, _ in results]
+        errors = sum(1 for _, status_code in results if status_code != 200)
+        return latencies, errors, elapsed
+
+    def report(self, mode, latencies, errors, elapsed):
+        self.stdout.write(
+            f"{mode:<9} requests={len(latencies)} errors={errors} "
+            f"throughput={len(latencies) / elapsed:.1f} req/s "
+            f"p50={percentile(latencies, 50) * 1000:.1f}ms "
+            f"p99={percentile(latencies, 99) * 1000:.1f}ms"
+        )
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.freelancers.models import Freelancer
+from apps.recommendations.embeddings import build_freelancer_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Embed freelancer profiles and persist the vector index used for shortlisting"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-p",
+            "--path",
+            type=str,
+            help=f"Index file path. Default: {settings.RECOMMENDATIONS_INDEX_PATH}",
+        )
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write("running...")
+        path = kwargs.get("path") or settings.RECOMMENDATIONS_INDEX_PATH
+
+        freelancers = Freelancer.objects.filter(visibility=True).prefetch_related(
+            "skills", "work_experiences"
+        )
+        index = build_freelancer_index(freelancers, path=path)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Indexed {len(index)} freelancers to {path}")
+        )
+        if settings.RECOMMENDATIONS_INDEX_STORAGE:
+            name = settings.RECOMMENDATIONS_INDEX_STORAGE_NAME
+            self.stdout.write(self.style.SUCCESS(f"Published the index as {name}"))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from apps.freelancers.models import Freelancer
+from apps.recommendations.feed import refresh_freelancer_recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the recommended jobs feed of every freelancer. The feed is kept up "
+        "to date incrementally, this is for backfills and recovering from drift"
+    )
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write("running...")
+
+        count = 0
+        for freelancer in Freelancer.objects.iterator():
+            count += len(refresh_freelancer_recommendations(freelancer))
+
+        self.stdout.write(self.style.SUCCESS(f"Created {count} job recommendations"))
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.2 on 2026-10-18 15:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("freelancers", "0009_alter_service_price_type"),
+        ("jobs", "0012_alter_job_title"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobScore",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="created_at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="updated at"),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                ("content_hash", models.CharField(max_length=64)),
+                ("result", models.JSONField(default=dict)),
+                (
+                    "freelancer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="job_scores",
+                        to="freelancers.freelancer",
+                    ),
+                ),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="job_scores",
+                        to="jobs.job",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("created_at",),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="jobscore",
+            constraint=models.UniqueConstraint(
+                fields=("freelancer", "job"), name="unique_freelancer_job_score"
+            ),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 4.2.2 on 2026-10-18 16:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("freelancers", "0009_alter_service_price_type"),
+        ("jobs", "0012_alter_job_title"),
+        (
+            "recommendations",
+            "0002_jobscore_error_jobscore_requested_by_jobscore_status",
+        ),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobRecommendation",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="created_at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="updated at"),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                ("matched_skills", models.PositiveIntegerField(default=0)),
+                ("match_score", models.FloatField(default=0)),
+                ("llm_score", models.FloatField(blank=True, null=True)),
+                ("score", models.FloatField(default=0)),
+                (
+                    "freelancer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="job_recommendations",
+                        to="freelancers.freelancer",
+                    ),
+                ),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recommendations",
+                        to="jobs.job",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("-score", "-created_at"),
+                "indexes": [
+                    models.Index(
+                        fields=["freelancer", "-score", "-created_at"],
+                        name="recommendat_freelan_ff921e_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="jobrecommendation",
+            constraint=models.UniqueConstraint(
+                fields=("freelancer", "job"),
+                name="unique_freelancer_job_recommendation",
+            ),
+        ),
+    ]
@@ -1,3 +1,130 @@
-# from django.db import models
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+from apps.common import models as base_models
+from apps.freelancers.models import Freelancer
+from apps.jobs.models import Job
+
+User = get_user_model()
+
+
+class JobScore(base_models.BaseModel):
+    """
+    Stored result of scoring a freelancer against a job.
+
+    `content_hash` fingerprints the inputs sent to the LLM (freelancer skills and
+    job description) so a stored result is only reused while those inputs are unchanged.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        COMPLETED = "completed", _("Completed")
+        FAILED = "failed", _("Failed")
+
+    freelancer = models.ForeignKey(
+        "freelancers.Freelancer", on_delete=models.CASCADE, related_name="job_scores"
+    )
+    job = models.ForeignKey(
+        "jobs.Job", on_delete=models.CASCADE, related_name="job_scores"
+    )
+    content_hash = models.CharField(max_length=64)
+    result = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=25, choices=Status.choices, default=Status.COMPLETED
+    )
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+
+    class Meta:
+        ordering = ("created_at",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["freelancer", "job"], name="unique_freelancer_job_score"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.job_id}::{self.freelancer_id}"
+
+    def is_fresh(self, content_hash) -> bool:
+        """True when this is a completed score computed from the given inputs"""
+        return (
+            self.status == self.Status.COMPLETED and self.content_hash == content_hash
+        )
+
+
+class JobRecommendation(base_models.BaseModel):
+    """
+    Precomputed entry of a freelancer's recommended jobs feed.
+
+    `match_score` (0-5) is the share of the job's skills and tags the freelancer has.
+    `llm_score` is copied from a fresh stored job score when one exists and `score`,
+    used for ranking, blends the two.
+    """
+
+    freelancer = models.ForeignKey(
+        "freelancers.Freelancer",
+        on_delete=models.CASCADE,
+        related_name="job_recommendations",
+    )
+    job = models.ForeignKey(
+        "jobs.Job", on_delete=models.CASCADE, related_name="recommendations"
+    )
+    matched_skills = models.PositiveIntegerField(default=0)
+    match_score = models.FloatField(default=0)
+    llm_score = models.FloatField(null=True, blank=True)
+    score = models.FloatField(default=0)
+
+    class Meta:
+        ordering = ("-score", "-created_at")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["freelancer", "job"],
+                name="unique_freelancer_job_recommendation",
+            )
+        ]
+        indexes = [models.Index(fields=["freelancer", "-score", "-created_at"])]
+
+    def __str__(self):
+        return f"{self.freelancer_id}::{self.job_id}"
+
+
+# SIGNALS
+# ---------------------------------------------------
+@receiver(models.signals.post_save, sender=Job)
+def refresh_job_feed(sender, instance, created, update_fields=None, **kwargs):
+    from .feed import FEED_JOB_FIELDS, refresh_job_recommendations
+
+    # a new job has no skills or tags yet, its rows are added when they are set.
+    # also skip saves that can't change the feed e.g escrow updates
+    if created:
+        return
+    if update_fields and not FEED_JOB_FIELDS.intersection(update_fields):
+        return
+
+    refresh_job_recommendations(instance)
+
+
+@receiver(models.signals.m2m_changed, sender=Job.skills.through)
+@receiver(models.signals.m2m_changed, sender=Job.tags.through)
+def refresh_job_feed_requirements(sender, instance, action, reverse, **kwargs):
+    from .feed import refresh_job_recommendations
+
+    if action in ("post_add", "post_remove", "post_clear") and not reverse:
+        refresh_job_recommendations(instance)
+
+
+@receiver(models.signals.m2m_changed, sender=Freelancer.skills.through)
+def refresh_freelancer_feed(sender, instance, action, reverse, **kwargs):
+    from .feed import refresh_freelancer_recommendations
+
+    if action in ("post_add", "post_remove", "post_clear") and not reverse:
+        refresh_freelancer_recommendations(instance)
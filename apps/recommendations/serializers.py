@@ -2,8 +2,81 @@ from rest_framework import serializers
 
 from apps.freelancers.models import Freelancer
 from apps.jobs.models import Job
+from apps.jobs.serializers import JobReadSerializer
+
+from .models import JobRecommendation, JobScore
 
 
 class JobScoreSerializer(serializers.Serializer):
     freelancer = serializers.PrimaryKeyRelatedField(queryset=Freelancer.objects.all())
     job = serializers.PrimaryKeyRelatedField(queryset=Job.objects.all())
+    refresh = serializers.BooleanField(default=False)
+
+
+class JobScoreReadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobScore
+        fields = [
+            "id",
+            "freelancer",
+            "job",
+            "status",
+            "result",
+            "error",
+            "created_at",
+            "updated_at",
+        ]
+
+
+class JobShortlistSerializer(serializers.Serializer):
+    job = serializers.PrimaryKeyRelatedField(queryset=Job.objects.all())
+    freelancers = serializers.PrimaryKeyRelatedField(
+        queryset=Freelancer.objects.all(), many=True, required=False
+    )
+    all_applicants = serializers.BooleanField(default=False)
+    top_k = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+    def get_freelancers(self):
+        """
+        Candidate freelancers with the relations used for scoring prefetched.
+        None when no candidates were given, meaning all indexed freelancers.
+        """
+        job = self.validated_data["job"]
+        freelancers = self.validated_data.get("freelancers") or []
+        qs = Freelancer.objects.prefetch_related("skills", "work_experiences")
+
+        if self.validated_data.get("all_applicants"):
+            return qs.filter(applications__job=job).distinct()
+        if freelancers:
+            return qs.filter(pk__in=[freelancer.pk for freelancer in freelancers])
+        return None
+
+
+class JobScoreBatchSerializer(JobShortlistSerializer):
+    top_k = serializers.IntegerField(min_value=1, max_value=100, required=False)
+    refresh = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if not any(attrs.get(f) for f in ["freelancers", "all_applicants", "top_k"]):
+            raise serializers.ValidationError(
+                {"message": "Provide freelancers, all_applicants or top_k"}
+            )
+        return attrs
+
+
+class JobRecommendationSerializer(serializers.ModelSerializer):
+    job = JobReadSerializer()
+
+    class Meta:
+        model = JobRecommendation
+        fields = [
+            "id",
+            "job",
+            "matched_skills",
+            "match_score",
+            "llm_score",
+            "score",
+            "created_at",
+            "updated_at",
+        ]
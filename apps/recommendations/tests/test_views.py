@@ -0,0 +1,487 @@
+import os
+import threading
+import time
+
+import pytest
+from django.urls.base import reverse
+from rest_framework import status
+
+from apps.freelancers.models import Freelancer
+from apps.recommendations import embeddings
+from apps.recommendations.backends import LocalScoringBackend
+from apps.recommendations.embeddings import (
+    FreelancerIndex,
+    build_freelancer_index,
+    get_freelancer_index,
+)
+from apps.recommendations.feed import refresh_freelancer_recommendations
+from apps.recommendations.models import JobRecommendation, JobScore
+from apps.recommendations.utils import get_job_score, score_freelancers
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    """Replace the LLM call with a stub that records its inputs"""
+    calls = []
+
+    def fake_get_job_score_json(freelancer_skills, job_description):
+        calls.append((freelancer_skills, job_description))
+        return {"score": 4, "explanation": "Good fit"}
+
+    monkeypatch.setattr(
+        "apps.recommendations.utils.get_job_score_json", fake_get_job_score_json
+    )
+    return calls
+
+
+class TestJobScore:
+    def test_job_score(
+        self, api_client_auth, user, freelancer_factory, job_factory, llm_calls
+    ):
+        url = reverse("api:recommendations-job-score")
+        freelancer = freelancer_factory()
+        job = job_factory()
+        data = {"freelancer": str(freelancer.id), "job": str(job.id)}
+
+        client = api_client_auth(user=user)
+        resp = client.post(url, data=data)
+        resp_data = resp.json()["data"]
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp_data["score"] == 4
+        assert len(llm_calls) == 1
+        assert JobScore.objects.filter(freelancer=freelancer, job=job).exists()
+
+    def test_job_score_cached(
+        self, api_client_auth, user, freelancer_factory, job_factory, llm_calls
+    ):
+        url = reverse("api:recommendations-job-score")
+        freelancer = freelancer_factory()
+        job = job_factory()
+        data = {"freelancer": str(freelancer.id), "job": str(job.id)}
+
+        client = api_client_auth(user=user)
+        client.post(url, data=data)
+        resp = client.post(url, data=data)
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.json()["data"]["score"] == 4
+        assert len(llm_calls) == 1
+
+    def test_job_score_invalidated(
+        self,
+        api_client_auth,
+        user,
+        freelancer_factory,
+        job_factory,
+        skill_factory,
+        llm_calls,
+    ):
+        url = reverse("api:recommendations-job-score")
+        freelancer = freelancer_factory()
+        job = job_factory()
+        data = {"freelancer": str(freelancer.id), "job": str(job.id)}
+
+        client = api_client_auth(user=user)
+        client.post(url, data=data)
+
+        freelancer.skills.add(skill_factory(name="Django"))
+        client.post(url, data=data)
+
+        job.description = "Updated description"
+        job.save()
+        client.post(url, data=data)
+
+        client.post(url, data={**data, "refresh": True})
+
+        assert len(llm_calls) == 4
+        assert llm_calls[1][0] == ["Django"]
+        assert JobScore.objects.filter(freelancer=freelancer, job=job).count() == 1
+
+
+class TestLocalScoringBackend:
+    def test_score(self, settings):
+        settings.RECOMMENDATIONS_LOCAL_BACKEND_DELAY = 0
+        backend = LocalScoringBackend()
+
+        res = backend.score(["Python", "Go"], "We need python and django developers")
+
+        assert res["score"] == 2.5
+        assert res["cultural_fit_and_behavioral_traits"] == 2.5
+        assert res == backend.score(
+            ["Python", "Go"], "We need python and django developers"
+        )
+
+    def test_job_score_local_backend(
+        self, api_client_auth, user, freelancer_factory, job_factory, skill_factory
+    ):
+        freelancer = freelancer_factory()
+        freelancer.skills.add(skill_factory(name="Django"))
+        job = job_factory(description="Django developer")
+        data = {"freelancer": str(freelancer.id), "job": str(job.id)}
+
+        client = api_client_auth(user=user)
+        resp = client.post(reverse("api:recommendations-job-score"), data)
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.json()["data"]["score"] == 5
+
+
+class TestJobScoreBatch:
+    def test_job_score_batch(
+        self,
+        api_client_auth,
+        user,
+        freelancer_factory,
+        job_factory,
+        skill_factory,
+        monkeypatch,
+    ):
+        lock = threading.Lock()
+        calls = {"active": 0, "max_active": 0, "total": 0}
+
+        def fake_get_job_score_json(freelancer_skills, job_description):
+            with lock:
+                calls["active"] += 1
+                calls["total"] += 1
+                calls["max_active"] = max(calls["max_active"], calls["active"])
+            time.sleep(0.05)
+            with lock:
+                calls["active"] -= 1
+            return {"score": len(freelancer_skills)}
+
+        monkeypatch.setattr(
+            "apps.recommendations.utils.get_job_score_json", fake_get_job_score_json
+        )
+
+        job = job_factory()
+        freelancers = freelancer_factory.create_batch(4)
+        for count, freelancer in enumerate(freelancers):
+            freelancer.skills.add(*skill_factory.create_batch(count))
+
+        url = reverse("api:recommendations-job-score-batch")
+        data = {"job": str(job.id), "freelancers": [str(f.id) for f in freelancers]}
+
+        client = api_client_auth(user=user)
+        resp = client.post(url, data=data, format="json")
+        results = resp.json()["data"]["results"]
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert [r["freelancer"] for r in results] == [
+            str(f.id) for f in reversed(freelancers)
+        ]
+        assert calls["total"] == 4
+        assert calls["max_active"] > 1
+
+        resp = client.post(url, data=data, format="json")
+        results = resp.json()["data"]["results"]
+
+        assert calls["total"] == 4
+        assert all(r["cached"] for r in results)
+
+    def test_job_score_batch_concurrent_insert(
+        self, freelancer_factory, job_factory, monkeypatch, llm_calls
+    ):
+        from apps.recommendations import utils
+
+        job = job_factory()
+        freelancers = freelancer_factory.create_batch(2)
+        get_content_hash = utils.get_content_hash
+
+        def racing_get_content_hash(*args):
+            # another request stores the first pair after the stored scores were read
+            if not JobScore.objects.exists():
+                JobScore.objects.create(
+                    freelancer=freelancers[0], job=job, content_hash="stale"
+                )
+            return get_content_hash(*args)
+
+        monkeypatch.setattr(
+            "apps.recommendations.utils.get_content_hash", racing_get_content_hash
+        )
+
+        ranked = score_freelancers(job, freelancers)
+
+        assert len(ranked) == 2
+        assert JobScore.objects.count() == 2
+        assert JobScore.objects.get(freelancer=freelancers[0]).content_hash != "stale"
+
+    def test_job_score_batch_all_applicants(
+        self, api_client_auth, user, job_factory, application_factory, llm_calls
+    ):
+        job = job_factory()
+        application_factory.create_batch(3, job=job)
+        application_factory()
+
+        url = reverse("api:recommendations-job-score-batch")
+        data = {"job": str(job.id), "all_applicants": True}
+
+        client = api_client_auth(user=user)
+        resp = client.post(url, data=data, format="json")
+        resp_data = resp.json()["data"]
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert len(resp_data["results"]) == 3
+        assert len(llm_calls) == 3
+
+    def test_job_score_batch_requires_freelancers(
+        self, api_client_auth, user, job_factory
+    ):
+        url = reverse("api:recommendations-job-score-batch")
+        client = api_client_auth(user=user)
+        resp = client.post(url, data={"job": str(job_factory().id)}, format="json")
+
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.fixture
+def index_path(settings, tmpdir):
+    settings.RECOMMENDATIONS_INDEX_PATH = str(tmpdir.join("index.npz"))
+    return settings.RECOMMENDATIONS_INDEX_PATH
+
+
+@pytest.fixture
+def matching_freelancers(freelancer_factory, job_factory, skill_factory):
+    """A python job, a python freelancer and two unrelated freelancers"""
+    job = job_factory(description="Backend engineer to build Django and Python APIs")
+    python_dev = freelancer_factory(title="Python developer", bio="Django APIs")
+    python_dev.skills.add(skill_factory(name="Python"))
+    designer = freelancer_factory(title="Graphic designer", bio="Logos and branding")
+    writer = freelancer_factory(title="Copy writer", bio="Blog posts and newsletters")
+    return job, python_dev, [designer, writer]
+
+
+class TestShortlist:
+    def test_index_roundtrip(self, index_path, matching_freelancers):
+        _, python_dev, others = matching_freelancers
+        index = build_freelancer_index(Freelancer.objects.all())
+
+        loaded = get_freelancer_index()
+
+        assert isinstance(loaded, FreelancerIndex)
+        assert loaded.ids == index.ids
+        assert str(python_dev.pk) in loaded
+
+    def test_index_shared_between_instances(
+        self, settings, tmpdir, index_path, matching_freelancers
+    ):
+        settings.MEDIA_ROOT = str(tmpdir.mkdir("media"))
+        settings.RECOMMENDATIONS_INDEX_STORAGE = (
+            "django.core.files.storage.FileSystemStorage"
+        )
+        index = build_freelancer_index(Freelancer.objects.all())
+
+        # another instance starts with an empty local path
+        settings.RECOMMENDATIONS_INDEX_PATH = str(tmpdir.join("other.npz"))
+        embeddings._index_cache.update(synced=None)
+        loaded = get_freelancer_index()
+
+        assert loaded.ids == index.ids
+        assert os.path.exists(settings.RECOMMENDATIONS_INDEX_PATH)
+
+    def test_shortlist(
+        self, api_client_auth, user, index_path, matching_freelancers, llm_calls
+    ):
+        job, python_dev, _ = matching_freelancers
+        build_freelancer_index(Freelancer.objects.all())
+
+        url = reverse("api:recommendations-shortlist")
+        client = api_client_auth(user=user)
+        resp = client.post(url, data={"job": str(job.id), "top_k": 2}, format="json")
+        results = resp.json()["data"]["results"]
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert len(results) == 2
+        assert results[0]["freelancer"] == str(python_dev.id)
+        assert len(llm_calls) == 0
+
+    def test_job_score_batch_top_k(
+        self, api_client_auth, user, index_path, matching_freelancers, llm_calls
+    ):
+        job, python_dev, others = matching_freelancers
+
+        url = reverse("api:recommendations-job-score-batch")
+        data = {
+            "job": str(job.id),
+            "freelancers": [str(f.id) for f in [python_dev, *others]],
+            "top_k": 1,
+        }
+
+        client = api_client_auth(user=user)
+        resp = client.post(url, data=data, format="json")
+        results = resp.json()["data"]["results"]
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert [r["freelancer"] for r in results] == [str(python_dev.id)]
+        assert len(llm_calls) == 1
+
+
+class TestJobScoreAsync:
+    def test_create_task_handler(self, monkeypatch):
+        from apps.common import tasks
+
+        created = []
+        monkeypatch.setattr(
+            tasks.cloud_task_client,
+            "create_task",
+            lambda parent, task: created.append(task),
+        )
+
+        tasks.create_task("compute-job-score", payload={"job_score_id": "1"})
+
+        assert created[0]["http_request"]["url"].endswith(
+            reverse("api:recommendations-compute-job-score")
+        )
+
+    def test_job_score_async(
+        self,
+        api_client_auth,
+        user,
+        freelancer_factory,
+        job_factory,
+        llm_calls,
+        monkeypatch,
+        django_capture_on_commit_callbacks,
+    ):
+        tasks, notifications = [], []
+        monkeypatch.setattr(
+            "apps.common.tasks.create_task",
+            lambda uri, payload=None, **kwargs: tasks.append((uri, payload)),
+        )
+        monkeypatch.setattr(
+            "apps.recommendations.utils.fcm_notify",
+            lambda user, title, body, custom_data: notifications.append(custom_data),
+        )
+
+        freelancer = freelancer_factory()
+        job = job_factory()
+        data = {"freelancer": str(freelancer.id), "job": str(job.id)}
+
+        client = api_client_auth(user=user)
+        with django_capture_on_commit_callbacks(execute=True):
+            resp = client.post(reverse("api:recommendations-job-score-async"), data)
+        resp_data = resp.json()["data"]
+
+        assert resp.status_code == status.HTTP_202_ACCEPTED
+        assert resp_data["status"] == "pending"
+        assert len(llm_calls) == 0
+        assert tasks == [("compute-job-score", {"job_score_id": resp_data["id"]})]
+
+        resp = client.post(
+            reverse("api:recommendations-compute-job-score"),
+            data=tasks[0][1],
+            format="json",
+        )
+        assert resp.status_code == status.HTTP_200_OK
+        assert len(llm_calls) == 1
+        assert notifications[0]["status"] == "completed"
+
+        url = reverse("api:recommendations-job-score-detail", args=(resp_data["id"],))
+        resp = client.get(url)
+        resp_data = resp.json()["data"]
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp_data["status"] == "completed"
+        assert resp_data["result"]["score"] == 4
+
+    def test_job_score_async_cached(
+        self, api_client_auth, user, freelancer_factory, job_factory, llm_calls
+    ):
+        freelancer = freelancer_factory()
+        job = job_factory()
+        data = {"freelancer": str(freelancer.id), "job": str(job.id)}
+
+        client = api_client_auth(user=user)
+        client.post(reverse("api:recommendations-job-score"), data)
+        resp = client.post(reverse("api:recommendations-job-score-async"), data)
+
+        assert resp.status_code == status.HTTP_202_ACCEPTED
+        assert resp.json()["data"]["status"] == "completed"
+        assert len(llm_calls) == 1
+
+
+class TestRecommendedJobs:
+    url = reverse("api:recommendations-recommended-jobs")
+
+    def test_feed_follows_jobs_and_skills(
+        self, freelancer_factory, job_factory, skill_factory, tag_factory
+    ):
+        python, django, go = skill_factory.create_batch(3)
+        freelancer = freelancer_factory()
+        freelancer.skills.add(python, django)
+
+        full = job_factory()
+        full.skills.add(python, django)
+        half = job_factory()
+        half.skills.add(python, go)
+        tagged = job_factory()
+        tagged.tags.add(tag_factory(name=django.name.upper()))
+        job_factory().skills.add(go)
+
+        feed = JobRecommendation.objects.filter(freelancer=freelancer)
+        assert [(r.job, r.match_score) for r in feed] == [
+            (tagged, 5),
+            (full, 5),
+            (half, 2.5),
+        ]
+
+        freelancer.skills.add(go)
+        assert feed.all().count() == 4
+
+        half.status = half.Status.INACTIVE
+        half.save()
+        assert not feed.filter(job=half).exists()
+
+    def test_feed_refined_by_job_scores(
+        self, freelancer_factory, job_factory, skill_factory, llm_calls
+    ):
+        python, go = skill_factory.create_batch(2)
+        freelancer = freelancer_factory()
+        freelancer.skills.add(python)
+        job = job_factory()
+        job.skills.add(python, go)
+
+        recommendation = JobRecommendation.objects.get(freelancer=freelancer, job=job)
+        assert recommendation.llm_score is None
+        assert recommendation.score == 2.5
+
+        get_job_score(freelancer, job)
+        recommendation.refresh_from_db()
+        assert recommendation.llm_score == 4
+        assert recommendation.score == 3.25
+
+        # stored scores are picked up again when the feed is rebuilt
+        refresh_freelancer_recommendations(freelancer)
+        assert JobRecommendation.objects.get(pk__isnull=False).score == 3.25
+
+    def test_recommended_jobs(
+        self,
+        api_client_auth,
+        freelancer_factory,
+        job_factory,
+        skill_factory,
+        llm_calls,
+    ):
+        skill = skill_factory()
+        freelancer = freelancer_factory()
+        freelancer.skills.add(skill)
+        for job in job_factory.create_batch(3):
+            job.skills.add(skill)
+
+        client = api_client_auth(user=freelancer.user)
+        resp = client.get(self.url, {"page_size": 2})
+        resp_data = resp.json()["data"]
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp_data["count"] == 3
+        assert len(resp_data["results"]) == 2
+        assert resp_data["results"][0]["job"]["skills"][0]["id"] == str(skill.id)
+        assert not llm_calls
+
+    def test_recommended_jobs_not_freelancer(self, api_client_auth, user):
+        client = api_client_auth(user=user)
+        resp = client.get(self.url)
+
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
@@ -1,109 +1,234 @@
+import hashlib
 import json
-import logging
+from concurrent.futures import ThreadPoolExecutor
 
 from django.conf import settings
-from openai import OpenAI
+from django.db import transaction
+from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 
-# openai.api_key = settings.OPEN_AI_KEY
-openai_key = settings.OPEN_AI_KEY
-client = OpenAI(api_key=openai_key)
+from apps.notifications.utils import fcm_notify
 
+from .backends import get_scoring_backend
+from .models import JobScore
 
-JOB_ANALYSIS_PROMPT = """
-    Given the following inputs:
 
-    Candidate Profile: A detailed description of the candidate's work experience,
-    technical skills, achievements, and behavioral traits.
+def get_job_score_json(freelancer_skills, job_description):
+    """Score a freelancer's skills against a job description with the configured backend"""
 
-    Job Description: A detailed outline of the job requirements,
-    necessary skills, desired experience, and information about company culture and values.
+    return get_scoring_backend().score(freelancer_skills, job_description)
 
-    Please evaluate and score the candidate across three categories (Technical Skills and Competency,
-    Cultural Fit and Behavioral Traits, and Experience and Potential), based on a 0-5 scale.
-    Use the following guidelines for each score:
 
-    Technical Skills and Competency:
-    Assess the alignment of the candidate’s technical skills with those required in the job description.
+def get_job_score_inputs(freelancer, job):
+    """Build the freelancer skills and job description sent to the LLM"""
 
-    Cultural Fit and Behavioral Traits:
-    Consider how well the candidate’s values, work style, and personality might fit with the
-    company’s culture and team dynamics. If there is not much information about these traits,
-    give the candidate a score of 2.5 in this area.
+    freelancer_skills = sorted(skill.name for skill in freelancer.skills.all())
+    return freelancer_skills, get_job_description(job)
 
-    Experience and Potential:
-    Evaluate the relevance and depth of the candidate's past experiences in relation to the job role,
-    as well as their potential for growth in the position.
 
-    After scoring each category, calculate the confidence_score as the average of these scores.
+def get_job_description(job):
+    return f"{job.description}. {job.responsibilities}. {job.experience}"
 
-    Output Format:
 
-    The output should be a JSON object in the following format:
+def get_content_hash(freelancer_skills, job_description):
+    """Fingerprint job score inputs. Changes whenever the skills or job text change"""
 
-    {
-        "Technical Skills and Competency": <score from 0-5>,
-        "Cultural Fit and Behavioral Traits": <score from 0-5>,
-        "Experience and Potential": <score from 0-5>,
-        "confidence_score": <average of the scores above>
-        "explanation": (a brief explanation of why this score was given)
-        "Probability of Job Success":  (percentage value based on confidence_score)
-    }
+    content = json.dumps([list(freelancer_skills), job_description])
+    return hashlib.sha256(content.encode()).hexdigest()
 
-"""
 
+def get_job_score(freelancer, job, refresh=False):
+    """
+    Get the job score of a freelancer for a job.
 
-def get_job_score_json(freelancer_skills, job_description):
-    # Define the prompt for JSON response
-    prompt = f"""
-    Rate the suitability of a job for a freelancer based on the freelancer's skills and the job description.
-
-    Freelancer's Skills:
-    {freelancer_skills}
-
-    Job Description:
-    {job_description}
-
-    Respond in JSON format with two fields:
-    {{
-        "score": (a number between 0 and 5 indicating the suitability),
-        "technical_skills_and_competency": <score from 0-5>,
-        "cultural_fit_and_behavioral_traits": <score from 0-5>,
-        "experience_and_potential": <score from 0-5>,
-        "confidence_score": <average of the scores above>,
-        "explanation": (a brief explanation of why this score was given)
-        "probability_of_job_success":  (percentage value based on confidence_score)
-    }}
-
-    JSON Response:
+    A stored score is returned when its inputs are unchanged, otherwise the score is
+    computed with the LLM and stored. `refresh` skips the stored score.
     """
+    freelancer_skills, job_description = get_job_score_inputs(freelancer, job)
+    content_hash = get_content_hash(freelancer_skills, job_description)
+
+    job_score = JobScore.objects.filter(freelancer=freelancer, job=job).first()
+    if job_score and job_score.is_fresh(content_hash) and not refresh:
+        return job_score.result
+
+    from .feed import apply_job_scores
+
+    result = get_job_score_json(freelancer_skills, job_description)
+    job_score, _ = JobScore.objects.update_or_create(
+        freelancer=freelancer,
+        job=job,
+        defaults={
+            "content_hash": content_hash,
+            "result": result,
+            "status": JobScore.Status.COMPLETED,
+            "error": "",
+        },
+    )
+    apply_job_scores([job_score])
+    return result
 
-    messages = [
-        {"role": "system", "content": JOB_ANALYSIS_PROMPT},
-        {"role": "user", "content": prompt},
-    ]
+
+def get_score_value(result):
+    """Numeric score of a job score result used for ranking"""
 
     try:
-        # Make the API call to OpenAI to generate the response
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # or "gpt-4" or "text-davinci-003" or "gpt-3.5-turbo"
-            messages=messages,
-            # max_tokens=100,  # Limit tokens to ensure we stay within JSON response range
-            temperature=0,  # Low temperature for consistency
-            response_format={"type": "json_object"},
+        return float(result.get("score"))
+    except (AttributeError, TypeError, ValueError):
+        return -1
+
+
+def score_freelancers(job, freelancers, refresh=False):
+    """
+    Score many freelancers against a job and rank them from best to worst.
+
+    Stored scores are reused unless `refresh` is set. The remaining LLM calls run
+    concurrently on a bounded thread pool so the total wall time is close to the slowest
+    single call. Only the LLM calls run in the pool, all database work stays on the
+    calling thread.
+    """
+    from .feed import apply_job_scores
+
+    freelancers = list(freelancers)
+    job_scores = {
+        job_score.freelancer_id: job_score
+        for job_score in JobScore.objects.filter(job=job, freelancer__in=freelancers)
+    }
+
+    results = {}
+    misses = []
+    for freelancer in freelancers:
+        freelancer_skills, job_description = get_job_score_inputs(freelancer, job)
+        content_hash = get_content_hash(freelancer_skills, job_description)
+        job_score = job_scores.get(freelancer.pk)
+
+        if job_score and job_score.is_fresh(content_hash) and not refresh:
+            results[freelancer.pk] = {"result": job_score.result, "cached": True}
+        else:
+            misses.append(
+                (freelancer, freelancer_skills, job_description, content_hash)
+            )
+
+    if misses:
+        max_workers = min(settings.RECOMMENDATIONS_MAX_WORKERS, len(misses))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(get_job_score_json, freelancer_skills, job_description)
+                for _, freelancer_skills, job_description, _ in misses
+            ]
+
+        to_create, to_update = [], []
+        for (freelancer, _, _, content_hash), future in zip(misses, futures):
+            try:
+                result = future.result()
+            except ValidationError as e:
+                results[freelancer.pk] = {"result": None, "error": e.detail}
+                continue
+
+            results[freelancer.pk] = {"result": result, "cached": False}
+            job_score = job_scores.get(freelancer.pk)
+            if job_score:
+                job_score.content_hash = content_hash
+                job_score.result = result
+                job_score.status = JobScore.Status.COMPLETED
+                job_score.error = ""
+                job_score.updated_at = timezone.now()
+                to_update.append(job_score)
+            else:
+                to_create.append(
+                    JobScore(
+                        freelancer=freelancer,
+                        job=job,
+                        content_hash=content_hash,
+                        result=result,
+                    )
+                )
+
+        # a concurrent request may have stored the same pair since the lookup
+        JobScore.objects.bulk_create(
+            to_create,
+            update_conflicts=True,
+            unique_fields=["freelancer", "job"],
+            update_fields=["content_hash", "result", "status", "error", "updated_at"],
+        )
+        JobScore.objects.bulk_update(
+            to_update, ["content_hash", "result", "status", "error", "updated_at"]
         )
-        raw_response = response.choices[0].message.content.strip()
-    except Exception as e:
-        logging.warning(e)
-        raise ValidationError({"message": e})
+        apply_job_scores(to_create + to_update)
+
+    ranked = [
+        {
+            "freelancer": freelancer.pk,
+            "cached": False,
+            "error": None,
+            **results[freelancer.pk],
+        }
+        for freelancer in freelancers
+    ]
+    ranked.sort(key=lambda item: get_score_value(item["result"]), reverse=True)
+    return ranked
+
+
+def request_job_score(freelancer, job, user=None, refresh=False):
+    """
+    Get or schedule the job score of a freelancer for a job.
+
+    A fresh stored score is returned as is unless `refresh` is set. Otherwise the score
+    is marked pending and a cloud task is queued to compute it once the current
+    transaction commits.
+    """
+    from apps.common.tasks import create_task
+
+    freelancer_skills, job_description = get_job_score_inputs(freelancer, job)
+    content_hash = get_content_hash(freelancer_skills, job_description)
+
+    job_score = JobScore.objects.filter(freelancer=freelancer, job=job).first()
+    if job_score and job_score.is_fresh(content_hash) and not refresh:
+        return job_score
+
+    job_score, _ = JobScore.objects.update_or_create(
+        freelancer=freelancer,
+        job=job,
+        defaults={
+            "content_hash": content_hash,
+            "result": {},
+            "status": JobScore.Status.PENDING,
+            "error": "",
+            "requested_by": user,
+        },
+    )
+
+    payload = {"job_score_id": str(job_score.pk)}
+    transaction.on_commit(lambda: create_task("compute-job-score", payload=payload))
+    return job_score
+
+
+def compute_job_score(job_score):
+    """Compute a pending job score and notify the user who requested it"""
+    from .feed import apply_job_scores
+
+    freelancer_skills, job_description = get_job_score_inputs(
+        job_score.freelancer, job_score.job
+    )
 
-    # Parse the response as JSON
     try:
-        # Attempt to parse the model's response as JSON
-        job_score_json = json.loads(raw_response)
-        return job_score_json
-    except json.JSONDecodeError:
-        # Handle JSON decoding errors gracefully
-        job_score_json = {"score": None, "explanation": "Could not parse JSON response"}
-        logging.warning(job_description)
-        raise ValidationError(job_score_json)
+        job_score.result = get_job_score_json(freelancer_skills, job_description)
+        job_score.status = JobScore.Status.COMPLETED
+        job_score.error = ""
+    except ValidationError as e:
+        job_score.status = JobScore.Status.FAILED
+        job_score.error = str(e.detail)
+
+    job_score.content_hash = get_content_hash(freelancer_skills, job_description)
+    job_score.save(
+        update_fields=["result", "status", "error", "content_hash", "updated_at"]
+    )
+    apply_job_scores([job_score])
+
+    user = job_score.requested_by
+    if user:
+        title = "Job Score Ready"
+        body = f"Job score for {job_score.job.title} is {job_score.status}"
+        data = {"job_score_id": str(job_score.pk), "status": job_score.status}
+        fcm_notify(user, title, body, custom_data=data)
+
+    return job_score
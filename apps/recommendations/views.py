@@ -1,13 +1,36 @@
+import json
+
+from django.db.models import Prefetch, Q
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
 from apps.common.pagination import DefaultPagination
+from apps.common.permissions import IsTask
+from apps.companies.models import Company
+from apps.freelancers.models import Freelancer
+from apps.jobs.models import Job
 
-from .serializers import JobScoreSerializer
-from .utils import get_job_score_json
+from .embeddings import shortlist_freelancers
+from .models import JobRecommendation, JobScore
+from .serializers import (
+    JobRecommendationSerializer,
+    JobScoreBatchSerializer,
+    JobScoreReadSerializer,
+    JobScoreSerializer,
+    JobShortlistSerializer,
+)
+from .utils import (
+    compute_job_score,
+    get_job_score,
+    request_job_score,
+    score_freelancers,
+)
 
 job_score_response_schema = openapi.Schema(
     type=openapi.TYPE_OBJECT,
@@ -21,6 +44,42 @@ job_score_response_schema = openapi.Schema(
     },
 )
 
+job_score_batch_response_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "job": openapi.Schema(type=openapi.TYPE_STRING),
+        "results": openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "freelancer": openapi.Schema(type=openapi.TYPE_STRING),
+                    "cached": openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                    "result": job_score_response_schema,
+                    "error": openapi.Schema(type=openapi.TYPE_OBJECT),
+                },
+            ),
+        ),
+    },
+)
+
+shortlist_response_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "job": openapi.Schema(type=openapi.TYPE_STRING),
+        "results": openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "freelancer": openapi.Schema(type=openapi.TYPE_STRING),
+                    "similarity": openapi.Schema(type=openapi.TYPE_NUMBER),
+                },
+            ),
+        ),
+    },
+)
+
 
 class AIView(ViewSet, DefaultPagination):
     @swagger_auto_schema(
@@ -40,9 +99,169 @@ class AIView(ViewSet, DefaultPagination):
         freelancer = serializer.validated_data.get("freelancer")
         job = serializer.validated_data.get("job")
 
-        freelancer_skills = freelancer.skills.values_list("name", flat=True)
-        job_description = f"{job.description}. {job.responsibilities}. {job.experience}"
+        refresh = serializer.validated_data.get("refresh")
 
-        res = get_job_score_json(freelancer_skills, job_description)
+        res = get_job_score(freelancer, job, refresh=refresh)
 
         return Response(res)
+
+    @swagger_auto_schema(
+        method="POST",
+        request_body=JobScoreSerializer,
+        responses={202: JobScoreReadSerializer},
+    )
+    @action(
+        detail=False,
+        methods=["POST"],
+        url_path="job-score-async",
+    )
+    def job_score_async(self, request):
+        """
+        Queue a job score and return immediately.
+        Poll `job-scores/<id>/` or wait for the push notification for the result.
+        """
+        serializer = JobScoreSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        freelancer = serializer.validated_data.get("freelancer")
+        job = serializer.validated_data.get("job")
+
+        refresh = serializer.validated_data.get("refresh")
+
+        job_score = request_job_score(
+            freelancer, job, user=request.user, refresh=refresh
+        )
+
+        res = JobScoreReadSerializer(job_score).data
+        return Response(res, status=status.HTTP_202_ACCEPTED)
+
+    @swagger_auto_schema(method="GET", responses={200: JobScoreReadSerializer})
+    @action(
+        detail=False,
+        methods=["GET"],
+        url_path=r"job-scores/(?P<job_score_id>[^/.]+)",
+    )
+    def job_score_detail(self, request, job_score_id=None):
+        user = request.user
+        qs = JobScore.objects.all()
+        if not (user.is_staff or user.role == user.Roles.ADMIN):
+            qs = qs.filter(Q(requested_by=user) | Q(freelancer__user=user))
+        job_score = get_object_or_404(qs, pk=job_score_id)
+
+        return Response(JobScoreReadSerializer(job_score).data)
+
+    @action(
+        detail=False,
+        methods=["POST"],
+        permission_classes=[IsTask],
+        url_path="compute-job-score",
+        url_name="compute-job-score",
+    )
+    def compute_job_score_task(self, request):
+        """
+        Endpoint used in conjuction with cloud task to compute queued job scores
+        """
+        body = json.loads(request.body.decode())
+
+        job_score = (
+            JobScore.objects.select_related("freelancer", "job", "requested_by")
+            .filter(pk=body["job_score_id"], status=JobScore.Status.PENDING)
+            .first()
+        )
+        if job_score:
+            compute_job_score(job_score)
+
+        return Response("OK", status=200)
+
+    @swagger_auto_schema(
+        method="POST",
+        request_body=JobScoreBatchSerializer,
+        responses={200: job_score_batch_response_schema},
+    )
+    @action(
+        detail=False,
+        methods=["POST"],
+        url_path="job-score-batch",
+    )
+    def job_score_batch(self, request):
+        """
+        Score a list of freelancers (or all applicants) for a job, best match first.
+        With `top_k` only the closest candidates by embedding similarity are scored.
+        """
+        serializer = JobScoreBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        job = serializer.validated_data.get("job")
+        top_k = serializer.validated_data.get("top_k")
+        freelancers = serializer.get_freelancers()
+
+        if top_k:
+            shortlist = shortlist_freelancers(job, freelancers, k=top_k)
+            freelancers = Freelancer.objects.prefetch_related("skills").filter(
+                pk__in=[pk for pk, _ in shortlist]
+            )
+
+        results = score_freelancers(
+            job, freelancers, refresh=serializer.validated_data.get("refresh")
+        )
+
+        return Response({"job": job.pk, "results": results})
+
+    @swagger_auto_schema(
+        method="POST",
+        request_body=JobShortlistSerializer,
+        responses={200: shortlist_response_schema},
+    )
+    @action(
+        detail=False,
+        methods=["POST"],
+        url_path="shortlist",
+    )
+    def shortlist(self, request):
+        """Closest freelancers to a job by embedding similarity. No LLM calls"""
+        serializer = JobShortlistSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        job = serializer.validated_data.get("job")
+        top_k = serializer.validated_data.get("top_k")
+        freelancers = serializer.get_freelancers()
+
+        shortlist = shortlist_freelancers(job, freelancers, k=top_k)
+        results = [
+            {"freelancer": pk, "similarity": similarity} for pk, similarity in shortlist
+        ]
+
+        return Response({"job": job.pk, "results": results})
+
+    @swagger_auto_schema(
+        method="GET", responses={200: JobRecommendationSerializer(many=True)}
+    )
+    @action(
+        detail=False,
+        methods=["GET"],
+        url_path="recommended-jobs",
+    )
+    def recommended_jobs(self, request):
+        """
+        Active jobs recommended to the current freelancer, best match first.
+        Reads the precomputed feed, nothing is scored at request time.
+        """
+        freelancer = Freelancer.objects.filter(user=request.user).first()
+        if not freelancer:
+            raise ValidationError({"message": "User is not a freelancer"})
+
+        qs = (
+            JobRecommendation.objects.filter(
+                freelancer=freelancer, job__status=Job.Status.ACTIVE
+            )
+            .select_related("job")
+            .prefetch_related(
+                Prefetch("job__company", queryset=Company.objects.with_details()),
+                "job__tags",
+                "job__skills",
+            )
+        )
+
+        page = self.paginate_queryset(qs, request)
+        serializer = JobRecommendationSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.2 on 2026-10-18 16:24
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+from apps.common.search import trigram_available
+
+INDEXES = [
+    (
+        "category",
+        django.contrib.postgres.indexes.GinIndex(
+            fields=["name"], name="users_category_name_trgm", opclasses=["gin_trgm_ops"]
+        ),
+    ),
+    (
+        "skill",
+        django.contrib.postgres.indexes.GinIndex(
+            fields=["name"], name="users_skill_name_trgm", opclasses=["gin_trgm_ops"]
+        ),
+    ),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # pg_trgm isn't shipped with every postgres build, autocomplete falls back to
+    # an in memory index without it
+    if not trigram_available(schema_editor.connection):
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for model_name, index in INDEXES:
+        schema_editor.add_index(apps.get_model("users", model_name), index)
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    for _, index in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{index.name}"')
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0005_delete_profile"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name=model_name, index=index)
+                for model_name, index in INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(create_trigram_indexes, drop_trigram_indexes)
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.2 on 2026-10-18 16:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0006_name_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["is_active", "deleted", "created_at"], name="user_active_idx"
+            ),
+        ),
+    ]
@@ -3,11 +3,14 @@ from django.contrib.auth.models import (
     BaseUserManager,
     PermissionsMixin,
 )
+from django.contrib.postgres.indexes import GinIndex
 from django.core.validators import RegexValidator
-from django.db import models
+from django.db import models, transaction
+from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 
 from apps.common import models as base_models
+from apps.common.cache import invalidate_tags
 
 phone_regex = RegexValidator(
     regex=r"^\+?1?\d{9,15}$",
@@ -71,6 +74,11 @@ class User(PermissionsMixin, base_models.BaseModel, AbstractBaseUser):
 
     class Meta:
         ordering = ("created_at",)
+        indexes = [
+            models.Index(
+                fields=["is_active", "deleted", "created_at"], name="user_active_idx"
+            )
+        ]
 
     USERNAME_FIELD = "email"
     EMAIL_FIELD = "email"
@@ -132,6 +140,16 @@ class Address(base_models.BaseModel):
 class Category(base_models.BaseModel):
     name = models.CharField(max_length=50)
 
+    class Meta:
+        # trigram index for autocomplete, see apps.common.typeahead
+        indexes = [
+            GinIndex(
+                fields=["name"],
+                name="users_category_name_trgm",
+                opclasses=["gin_trgm_ops"],
+            )
+        ]
+
     def __str__(self):
         return self.name
 
@@ -139,6 +157,16 @@ class Category(base_models.BaseModel):
 class Skill(base_models.BaseModel):
     name = models.CharField(max_length=50)
 
+    class Meta:
+        # trigram index for autocomplete, see apps.common.typeahead
+        indexes = [
+            GinIndex(
+                fields=["name"],
+                name="users_skill_name_trgm",
+                opclasses=["gin_trgm_ops"],
+            )
+        ]
+
     def __str__(self):
         return self.name
 
@@ -149,3 +177,13 @@ class Skill(base_models.BaseModel):
 # def create_profile(sender, instance, created, **kwargs):
 #     if created:
 #         Profile.objects.create(user=instance)
+
+
+@receiver([models.signals.post_save, models.signals.post_delete], sender=Category)
+def invalidate_categories_cache(sender, **kwargs):
+    transaction.on_commit(lambda: invalidate_tags("categories"))
+
+
+@receiver([models.signals.post_save, models.signals.post_delete], sender=Skill)
+def invalidate_skills_cache(sender, **kwargs):
+    transaction.on_commit(lambda: invalidate_tags("skills"))
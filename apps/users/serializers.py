@@ -202,7 +202,8 @@ class UserSerializer(serializers.ModelSerializer):
         serializer_or_field=CompanyBaseSerializer(),
     )
     def get_company(self, obj):
-        company = obj.company.first()
+        # read from the prefetched companies, first() would query again
+        company = next(iter(obj.company.all()), None)
         if company:
             return CompanyBaseSerializer(company).data
         else:
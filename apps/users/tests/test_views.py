@@ -349,3 +349,29 @@ class TestSkill:
 
         assert resp.status_code == status.HTTP_200_OK
         assert resp_data["id"] == str(skill.id)
+
+    def test_list_skill_cached(
+        self,
+        api_client,
+        api_client_auth,
+        admin,
+        skill_factory,
+        capture_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        url = reverse("api:skill-list")
+        skill_factory.create_batch(2)
+        api_client.get(url)
+
+        # served from the cache, only the etag aggregate hits the database
+        queries = capture_queries(api_client.get, url)
+        assert len([sql for sql in queries if sql.startswith("SELECT")]) == 1
+
+        # changes invalidate the cached list
+        client = api_client_auth(user=admin)
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(url, data={"name": "New Skill"})
+        client.logout()
+
+        resp = client.get(url)
+        assert len(resp.json()["data"]["results"]) == 3
@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
@@ -9,7 +10,12 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
 
+from apps.common.cache import CachedListMixin
 from apps.common.permissions import IsAdmin
+from apps.common.typeahead import TypeaheadMixin
+from apps.companies.models import Company
+from apps.freelancers.models import Freelancer, PortfolioItem, Service
+from apps.jobs.models import Job
 
 from .models import Address, Category, Skill
 from .serializers import (
@@ -47,8 +53,16 @@ class UserView(RetrieveModelMixin, UpdateModelMixin, ListModelMixin, GenericView
     """
 
     serializer_class = UserSerializer
-    queryset = User.objects.prefetch_related(
-        "company", "companies_managed", "freelancer"
+    queryset = User.objects.select_related("freelancer").prefetch_related(
+        Prefetch(
+            "company",
+            queryset=Company.objects.with_details().order_by("created_at"),
+        ),
+        "companies_managed",
+        "freelancer__skills",
+        "freelancer__work_experiences",
+        "freelancer__portfolio_item",
+        "freelancer__services",
     )
     filterset_fields = ["is_active", "deleted"]
     search_fields = [
@@ -170,11 +184,16 @@ class AddressView(ModelViewSet):
 #         return self.queryset.filter(user=user)
 
 
-class CategoryView(ModelViewSet):
+class CategoryView(CachedListMixin, TypeaheadMixin, ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     search_fields = ("name",)
     permission_classes = [AllowAny]
+    cache_tags = ("categories",)
+    typeahead_usages = (
+        (PortfolioItem, "category"),
+        (Service, "category"),
+    )
 
     http_method_names = [m for m in ModelViewSet.http_method_names if m not in ["put"]]
 
@@ -184,11 +203,16 @@ class CategoryView(ModelViewSet):
         return super().get_permissions()
 
 
-class SkillView(ModelViewSet):
+class SkillView(CachedListMixin, TypeaheadMixin, ModelViewSet):
     queryset = Skill.objects.all()
     serializer_class = SkillSerializer
     search_fields = ("name",)
     permission_classes = [AllowAny]
+    cache_tags = ("skills",)
+    typeahead_usages = (
+        (Freelancer.skills.through, "skill"),
+        (Job.skills.through, "skill"),
+    )
 
     http_method_names = [m for m in ModelViewSet.http_method_names if m not in ["put"]]
 
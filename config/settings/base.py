@@ -48,6 +48,7 @@ DJANGO_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "django.forms",
 ]
 
@@ -192,7 +193,7 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
-        "rest_framework.filters.SearchFilter",
+        "apps.common.search.FullTextSearchFilter",
         # "rest_framework.filters.OrderingFilter",
         "apps.common.utils.CustomOrderingFilter",
     ],
@@ -225,6 +226,33 @@ OPEN_EXCHANGE_RATES_URL = "https://openexchangerates.org/api/latest.json?symbols
 OPEN_EXCHANGE_RATES_APP_ID = env("APP_ID", default="")
 BASE_CURRENCY = "USD"
 SYMBOLS = "GHS,NGN,GBP,KES,ZAR,EUR,CAD,XRP"
+# Rates are refreshed by the update rates cron which also invalidates the cache
+EXCHANGE_RATE_CACHE_TIMEOUT = env.int("EXCHANGE_RATE_CACHE_TIMEOUT", default=60 * 60)
+
+
+# CACHES
+# ----------------------------------------------------------------------------
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "",
+    }
+}
+# Default ttl (seconds) of values stored with `apps.common.cache.get_or_set`
+CACHE_DEFAULT_TIMEOUT = env.int("CACHE_DEFAULT_TIMEOUT", default=60 * 15)
+# How long a recompute lock is held and how long other callers wait on it
+CACHE_LOCK_TIMEOUT = env.int("CACHE_LOCK_TIMEOUT", default=30)
+CACHE_LOCK_WAIT = env.float("CACHE_LOCK_WAIT", default=5)
+# Cache-Control max-age (seconds) of catalog responses e.g skills, countries
+CATALOG_CACHE_MAX_AGE = env.int("CATALOG_CACHE_MAX_AGE", default=60 * 5)
+
+
+# SEARCH
+# ----------------------------------------------------------------------------
+# Postgres text search configuration used for the job and freelancer search documents
+SEARCH_CONFIG = env.str("SEARCH_CONFIG", default="english")
+# Max age (seconds) of the in memory typeahead indexes used without Postgres
+TYPEAHEAD_INDEX_TTL = env.int("TYPEAHEAD_INDEX_TTL", default=60 * 5)
 
 
 # CORS
@@ -288,8 +316,14 @@ GAE_SERVICE = env("GAE_SERVICE", default="default")
 SECURE_REDIRECT_EXEMPT = [
     r"^api/notifications/send-email/$",
     r"^api/notifications/send-notification/$",
+    r"^api/notifications/notify-application/$",
     r"^api/notifications/send-sms/$",
     r"^api/extras/update-rates/$",
+    r"^api/extras/refill-wallet-pool/$",
+    r"^api/recommendations/compute-job-score/$",
+    r"^api/jobs/escrow-transactions/submit/$",
+    r"^api/jobs/escrow-transactions/confirm/$",
+    r"^api/jobs/escrow-transactions/reconcile/$",
 ]
 
 
@@ -302,3 +336,105 @@ XRP_MAIN_ACC = env("XRP_MAIN_ACC", default="")
 XRP_MAIN_SEED = env("XRP_MAIN_SEED", default="")
 XRP_SOURCE_TAG = env.int("XRP_SOURCE_TAG", default=54576093)
 OPEN_AI_KEY = env("OPEN_AI_KEY", default="")
+
+
+# XRPL
+# ------------------------------------------------------------------------------
+# rippled JSON-RPC servers, the next one is tried when a server is unreachable or busy
+XRPL_ENDPOINTS = env.list(
+    "XRPL_ENDPOINTS",
+    default=["https://xrplcluster.com/", "https://s2.ripple.com:51234/"]
+    if XRP_LIVE
+    else ["https://s.devnet.rippletest.net:51234/"],
+)
+# Per request timeout and retries (seconds), backoff doubles with jitter per retry
+XRPL_TIMEOUT = env.float("XRPL_TIMEOUT", default=10)
+XRPL_MAX_RETRIES = env.int("XRPL_MAX_RETRIES", default=3)
+XRPL_RETRY_BACKOFF = env.float("XRPL_RETRY_BACKOFF", default=0.5)
+# Max open connections kept alive per process
+XRPL_POOL_SIZE = env.int("XRPL_POOL_SIZE", default=10)
+# How long (seconds) account balances are cached, entries are dropped early when
+# this API submits a transaction for the account
+XRP_BALANCE_CACHE_TIMEOUT = env.int("XRP_BALANCE_CACHE_TIMEOUT", default=10)
+# Max concurrent account lookups for bulk balance requests
+XRP_BALANCE_MAX_WORKERS = env.int("XRP_BALANCE_MAX_WORKERS", default=8)
+# Payments sent in a group expire when not validated within
+# XRP_PAYMENT_LEDGER_OFFSET ledgers and are checked every XRP_PAYMENT_POLL_INTERVAL
+# seconds. Reserved sequence numbers are shared through the cache for
+# XRP_SEQUENCE_CACHE_TIMEOUT seconds
+XRP_PAYMENT_LEDGER_OFFSET = env.int("XRP_PAYMENT_LEDGER_OFFSET", default=20)
+XRP_PAYMENT_POLL_INTERVAL = env.float("XRP_PAYMENT_POLL_INTERVAL", default=1)
+XRP_SEQUENCE_CACHE_TIMEOUT = env.int("XRP_SEQUENCE_CACHE_TIMEOUT", default=60)
+# Seconds between checks of a submitted escrow transaction (about a ledger close)
+# and before resubmitting one that could not reach rippled
+ESCROW_CONFIRM_DELAY = env.int("ESCROW_CONFIRM_DELAY", default=4)
+ESCROW_RETRY_DELAY = env.int("ESCROW_RETRY_DELAY", default=15)
+# Company accounts whose history is read per batch by the escrow reconciliation
+LEDGER_RECONCILE_BATCH_SIZE = env.int("LEDGER_RECONCILE_BATCH_SIZE", default=50)
+# Funded wallets kept ready for new companies and freelancers. A refill task is
+# queued (at most once per WALLET_POOL_REFILL_TIMEOUT seconds) when fewer than
+# WALLET_POOL_MIN_SIZE are left and provisions WALLET_POOL_REFILL_BATCH_SIZE
+# wallets per run up to WALLET_POOL_SIZE. Live wallets are funded with
+# XRP_WALLET_FUNDING XRP from the main account, others by the faucet
+WALLET_PROVISIONER = env(
+    "WALLET_PROVISIONER",
+    default=(
+        "apps.extras.wallets.FundingProvisioner"
+        if XRP_LIVE
+        else "apps.extras.wallets.FaucetProvisioner"
+    ),
+)
+XRP_WALLET_FUNDING = env.int("XRP_WALLET_FUNDING", default=10)
+WALLET_POOL_SIZE = env.int("WALLET_POOL_SIZE", default=20)
+WALLET_POOL_MIN_SIZE = env.int("WALLET_POOL_MIN_SIZE", default=5)
+WALLET_POOL_REFILL_BATCH_SIZE = env.int("WALLET_POOL_REFILL_BATCH_SIZE", default=5)
+WALLET_POOL_REFILL_TIMEOUT = env.int("WALLET_POOL_REFILL_TIMEOUT", default=300)
+
+
+# NOTIFICATIONS
+# ------------------------------------------------------------------------------
+# Push notification backend. LocalBackend is an in memory stand-in for FCM used in
+# tests and benchmarks, with an optional artificial delay (seconds) per request
+NOTIFICATIONS_BACKEND = env.str(
+    "NOTIFICATIONS_BACKEND", default="apps.notifications.backends.FirebaseBackend"
+)
+NOTIFICATIONS_LOCAL_BACKEND_DELAY = env.float(
+    "NOTIFICATIONS_LOCAL_BACKEND_DELAY", default=0
+)
+# Seconds notifications are buffered for before being sent as one batch
+NOTIFICATIONS_BATCH_WINDOW = env.int("NOTIFICATIONS_BATCH_WINDOW", default=2)
+# Seconds after which notifications claimed by a task that died are sent again
+NOTIFICATIONS_CLAIM_TIMEOUT = env.int("NOTIFICATIONS_CLAIM_TIMEOUT", default=300)
+
+
+# RECOMMENDATIONS
+# ------------------------------------------------------------------------------
+# Job scoring backend. LocalScoringBackend is a rule based stand-in for tests and
+# benchmarks, with an optional artificial delay (seconds) per call
+RECOMMENDATIONS_SCORING_BACKEND = env.str(
+    "RECOMMENDATIONS_SCORING_BACKEND",
+    default="apps.recommendations.backends.OpenAIScoringBackend",
+)
+RECOMMENDATIONS_LOCAL_BACKEND_DELAY = env.float(
+    "RECOMMENDATIONS_LOCAL_BACKEND_DELAY", default=0
+)
+# Max concurrent LLM calls when scoring many freelancers for a job
+RECOMMENDATIONS_MAX_WORKERS = env.int("RECOMMENDATIONS_MAX_WORKERS", default=8)
+# Embedder used to pre-rank freelancers before LLM scoring and where the index is kept
+RECOMMENDATIONS_EMBEDDER = env.str(
+    "RECOMMENDATIONS_EMBEDDER",
+    default="apps.recommendations.embeddings.OpenAIEmbedder",
+)
+RECOMMENDATIONS_INDEX_PATH = env.str(
+    "RECOMMENDATIONS_INDEX_PATH", default=str(BASE_DIR / "freelancer_index.npz")
+)
+# Storage the index is published to so every instance can pull the same copy into
+# RECOMMENDATIONS_INDEX_PATH. Leave empty to only use the local file
+RECOMMENDATIONS_INDEX_STORAGE = env.str("RECOMMENDATIONS_INDEX_STORAGE", default="")
+RECOMMENDATIONS_INDEX_STORAGE_NAME = env.str(
+    "RECOMMENDATIONS_INDEX_STORAGE_NAME", default="recommendations/freelancer_index.npz"
+)
+# Seconds between checks of the published index for a newer copy
+RECOMMENDATIONS_INDEX_SYNC_INTERVAL = env.int(
+    "RECOMMENDATIONS_INDEX_SYNC_INTERVAL", default=300
+)
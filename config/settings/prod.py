@@ -31,7 +31,13 @@ DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)  # no
 
 # CACHES
 # ------------------------------------------------------------------------------
-
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": env("REDIS_URL"),
+        "KEY_PREFIX": "tugela",
+    }
+}
 
 # SECURITY
 # ------------------------------------------------------------------------------
@@ -62,6 +68,18 @@ GS_EXPIRATION = timedelta(days=7)
 # https://github.com/googleapis/python-storage/blob/b91e57d6ca314ac4feaec30bf355fcf7ac4468c0/google/cloud/storage/blob.py#L124
 GS_BLOB_CHUNK_SIZE = 8 * 1024 * 1024  # 8MB
 
+# RECOMMENDATIONS
+# ------------------------------------------------------------------------------
+# The app directory is read only on app engine, so each instance keeps its copy of
+# the freelancer index in /tmp and pulls it from the private bucket folder
+RECOMMENDATIONS_INDEX_PATH = env.str(
+    "RECOMMENDATIONS_INDEX_PATH", default="/tmp/freelancer_index.npz"
+)
+RECOMMENDATIONS_INDEX_STORAGE = env.str(
+    "RECOMMENDATIONS_INDEX_STORAGE",
+    default="apps.utils.storages.PrivateGoogleCloudStorage",
+)
+
 # STATIC
 # ------------------------
 # When hosting on app engine, app.yaml handles static files so no need to serve it from
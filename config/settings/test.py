@@ -28,6 +28,16 @@ TEMPLATES[-1]["OPTIONS"]["loaders"] = [  # type: ignore[index] # noqa F405
     )
 ]
 
+# CACHES
+# ------------------------------------------------------------------------------
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "",
+    }
+}
+CACHE_LOCK_WAIT = 0.5
+
 # EMAIL
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#email-backend
@@ -35,3 +45,15 @@ EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 
 # Your stuff...
 # ------------------------------------------------------------------------------
+XRPL_TIMEOUT = 5
+XRPL_RETRY_BACKOFF = 0
+XRP_PAYMENT_POLL_INTERVAL = 0
+WALLET_PROVISIONER = "apps.extras.wallets.LocalProvisioner"
+
+NOTIFICATIONS_BACKEND = "apps.notifications.backends.LocalBackend"
+NOTIFICATIONS_LOCAL_BACKEND_DELAY = 0
+NOTIFICATIONS_BATCH_WINDOW = 0
+
+RECOMMENDATIONS_SCORING_BACKEND = "apps.recommendations.backends.LocalScoringBackend"
+RECOMMENDATIONS_LOCAL_BACKEND_DELAY = 0
+RECOMMENDATIONS_EMBEDDER = "apps.recommendations.embeddings.HashingEmbedder"